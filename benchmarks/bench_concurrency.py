@@ -0,0 +1,115 @@
+"""
+Stress one Client shared by a growing number of threads against the fake
+server, which adds a fixed latency to every response. With no shared
+per-request state, throughput should grow linearly with the threads up to
+the connection pool size. Past it, requests still run in parallel, but the
+extra connections are opened and closed per request instead of reused. The
+fake server runs in this process and competes for the GIL, so the latency
+has to dwarf its CPU time for the scaling to show.
+
+Every request also checks for cross-talk between threads. A thread gets the
+deal it asked for, or NotFound for the ids missing on purpose. Each log record
+carries the URL and status of its own request.
+
+Usage:
+    python -m benchmarks.bench_concurrency [requests_per_thread] [pool_size] [latency]
+"""
+import logging
+import re
+import sys
+import threading
+import time
+
+from pipedrive.client import Client
+from pipedrive.exceptions import NotFound
+from pipedrive.rate_limit import RateLimiter
+
+from .fake_server import FakeServer
+
+DEALS = 1000
+# one request in eight asks for a deal that does not exist
+MISSING_EVERY = 8
+
+_DEAL_URL = re.compile(r"/deals/(\d+)\?")
+
+
+class _CrossTalkCheck(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__(logging.DEBUG)
+        self.records = 0
+        self.mismatches = 0
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        status = getattr(record, "http_status_code", None)
+        match = _DEAL_URL.search(getattr(record, "request_url", ""))
+        if status is None or match is None:
+            return
+        expected = 404 if int(match.group(1)) > DEALS else 200
+        with self._lock:
+            self.records += 1
+            self.mismatches += status != expected
+
+
+def _run(client: Client, threads: int, per_thread: int):
+    errors = []
+
+    def work(offset):
+        for index in range(per_thread):
+            deal_id = (offset * per_thread + index) % DEALS + 1
+            if index % MISSING_EVERY == 0:
+                deal_id += DEALS
+            try:
+                deal = client.deal.get_deal_by_id(deal_id)
+                if deal_id > DEALS or deal["id"] != deal_id:
+                    errors.append(deal_id)
+            except NotFound:
+                if deal_id <= DEALS:
+                    errors.append(deal_id)
+
+    workers = [threading.Thread(target=work, args=(offset,)) for offset in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started, errors
+
+
+def main(per_thread: int = 40, pool_size: int = 16, latency: float = 0.05):
+    logger = logging.getLogger("bench_concurrency")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    check = _CrossTalkCheck()
+    logger.addHandler(check)
+
+    with FakeServer(latency=latency) as server:
+        client = Client(
+            "token",
+            logger=logger,
+            pool_size=pool_size,
+            rate_limiter=RateLimiter(requests_per_window=10**9, window=1.0),
+        )
+        client.base_url = server.base_url
+        _run(client, 1, 10)
+
+        baseline = None
+        print(f"{per_thread} requests per thread, {latency * 1000:.0f} ms server latency, pool of {pool_size}")
+        for threads in (1, 2, 4, 8, 16, 32, 64):
+            if threads > pool_size * 4:
+                break
+            elapsed, errors = _run(client, threads, per_thread)
+            throughput = threads * per_thread / elapsed
+            baseline = baseline or throughput
+            print(
+                f"{threads:3} threads: {throughput:8.1f} req/s, speedup {throughput / baseline:5.2f}x "
+                f"(linear {threads}x), wrong results {len(errors)}"
+            )
+        client.close()
+
+    print(f"log records checked: {check.records}, carrying another request's status: {check.mismatches}")
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:4]
+    main(*(int(arg) for arg in arguments[:2]), *(float(arg) for arg in arguments[2:3]))
@@ -0,0 +1,69 @@
+"""
+Compare translating the custom fields of a batch of deals one lookup at a
+time through DealField with translating the whole batch with a
+CustomFieldResolver, and report the /dealFields downloads of each.
+
+Usage:
+    python -m benchmarks.bench_custom_fields [deals]
+"""
+import json
+import logging
+import re
+import sys
+import time
+
+from pipedrive.client import Client
+from pipedrive.rate_limit import RateLimiter
+
+from .data import make_deal
+from .fake_server import FakeServer
+
+_CUSTOM_FIELD_KEY = re.compile(r"^[0-9a-f]{40}$")
+
+
+def _per_deal(client: Client, deals: list):
+    deal_field = client.deal_field
+    results = []
+    for deal in deals:
+        result = {}
+        for key, value in deal.items():
+            field = deal_field.get_deal_field_by_key(key) if _CUSTOM_FIELD_KEY.match(key) else None
+            if field is None:
+                result[key] = value
+            elif field.get("field_type") == "set":
+                result[field["name"]] = [deal_field.get_label_of_deal_field_option(key, id) for id in value.split(",")]
+            elif field.get("field_type") == "enum":
+                result[field["name"]] = deal_field.get_label_of_deal_field_option(key, value)
+            else:
+                result[field["name"]] = value
+        results.append(result)
+    return results
+
+
+def main(count: int = 20000):
+    logging.disable(logging.CRITICAL)
+    # round trip through JSON, so both sides start from decoded API data
+    deals = json.loads(json.dumps([make_deal(deal_id) for deal_id in range(1, count + 1)]))
+
+    with FakeServer() as server:
+        scenarios = [
+            ("DealField, per lookup", lambda client: _per_deal(client, deals)),
+            ("CustomFieldResolver", lambda client: client.custom_fields.from_api_many(deals)),
+        ]
+        outputs = []
+        for name, translate in scenarios:
+            client = Client("token", rate_limiter=RateLimiter(requests_per_window=10**9, window=1.0))
+            client.base_url = server.base_url
+            before = server.stats()["requests"]
+            started = time.perf_counter()
+            outputs.append(translate(client))
+            elapsed = time.perf_counter() - started
+            downloads = server.stats()["requests"] - before
+            client.close()
+            print(f"{name:22}: {elapsed * 1000:8.1f} ms for {count} deals, {downloads} /dealFields downloads")
+
+    print(f"same output: {outputs[0] == outputs[1]}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
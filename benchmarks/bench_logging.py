@@ -0,0 +1,113 @@
+"""
+Measure the cost of request logging per POST with a body. Requests go to a
+transport returning a canned response, so the time left is the client's own
+work, logging included. Records go to a file, or to a slow sink standing in
+for a remote log collector, either from the request thread or from the
+background thread of an AsyncLogHandler.
+
+Usage:
+    python -m benchmarks.bench_logging [requests]
+"""
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from pipedrive.client import Client
+from pipedrive.logs import AsyncLogHandler
+from pipedrive.rate_limit import RateLimiter
+from pipedrive.transport import Transport
+
+# time the slow sink takes to ship a record
+SINK_LATENCY = 0.0001
+
+BODY = {"title": "Deal", "value": 1000, "currency": "USD", "person_id": 1, "org_id": 1, "stage_id": 1}
+
+
+class _CannedRequest:
+    method = "POST"
+    body = json.dumps(BODY).encode()
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+
+
+class _CannedResponse:
+    status_code = 201
+    headers = {}
+    content = json.dumps({"success": True, "data": {"id": 1, **BODY}}).encode()
+
+    def __init__(self, url: str) -> None:
+        self.request = _CannedRequest(url)
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _SlowHandler(logging.Handler):
+    def emit(self, record):
+        self.format(record)
+        time.sleep(SINK_LATENCY)
+
+
+class _CannedTransport(Transport):
+    def request(self, method, url, headers=None, params=None, json=None, stream=False):
+        return _CannedResponse(url)
+
+
+def _measure(client: Client, count: int):
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        client.post("/deals", BODY)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1e6, sum(timings) / count * 1e6
+
+
+def main(count: int = 20000):
+    directory = tempfile.mkdtemp()
+    formatter = logging.Formatter("%(asctime)s %(levelname)s %(message)s %(request_url)s")
+
+    scenarios = [
+        ("WARNING level", logging.WARNING, 1, False, False),
+        ("INFO, every request", logging.INFO, 1, False, False),
+        ("INFO, 1 in 100", logging.INFO, 100, False, False),
+        ("INFO, every request, async", logging.INFO, 1, True, False),
+        ("DEBUG, every request", logging.DEBUG, 1, False, False),
+        ("INFO, slow sink", logging.INFO, 1, False, True),
+        ("INFO, slow sink, 1 in 100", logging.INFO, 100, False, True),
+        ("INFO, slow sink, async", logging.INFO, 1, True, True),
+    ]
+
+    print(f"{count} POST requests against a canned transport")
+    for index, (name, level, sample_rate, asynchronous, slow) in enumerate(scenarios):
+        sink = _SlowHandler() if slow else logging.FileHandler(os.path.join(directory, "requests.log"))
+        sink.setFormatter(formatter)
+        # room for every record, so the async scenarios measure queueing instead of drops
+        handler = AsyncLogHandler(sink, queue_size=count * 2) if asynchronous else sink
+
+        logger = logging.getLogger(f"bench_logging.{index}")
+        logger.propagate = False
+        logger.setLevel(level)
+        logger.addHandler(handler)
+
+        client = Client(
+            "token",
+            logger=logger,
+            transport=_CannedTransport(),
+            rate_limiter=RateLimiter(requests_per_window=10**9, window=1.0),
+            log_sample_rate=sample_rate,
+        )
+        median, mean = _measure(client, count)
+        handler.close()
+        sink.close()
+
+        dropped = f", {handler.dropped} records dropped" if asynchronous else ""
+        print(f"{name:28}: p50 {median:6.1f} us, mean {mean:6.1f} us{dropped}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,75 @@
+"""
+Compare lookups by email, phone and title answered by the search endpoints
+of the fake server with the same lookups answered by a LocalMirror loaded
+from it.
+
+Usage:
+    python -m benchmarks.bench_mirror [lookups] [deals] [persons]
+"""
+import logging
+import random
+import statistics
+import sys
+import time
+
+from pipedrive.client import Client
+from pipedrive.mirror import LocalMirror
+from pipedrive.rate_limit import RateLimiter
+
+from .fake_server import FakePipedrive, FakeServer
+
+
+def _measure(func, arguments):
+    timings = []
+    for argument in arguments:
+        started = time.perf_counter()
+        func(argument)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return statistics.median(timings) * 1e6, timings[int(len(timings) * 0.99)] * 1e6
+
+
+def main(lookups: int = 2000, deals: int = 20000, persons: int = 5000):
+    logging.disable(logging.CRITICAL)
+    randomizer = random.Random(0)
+    person_ids = [randomizer.randint(1, persons) for _ in range(lookups)]
+    deal_ids = [randomizer.randint(1, deals) for _ in range(lookups)]
+
+    with FakeServer(api=FakePipedrive(deals=deals, persons=persons)) as server:
+        client = Client("token", rate_limiter=RateLimiter(requests_per_window=10**9, window=1.0))
+        client.base_url = server.base_url
+
+        mirror = LocalMirror()
+        started = time.perf_counter()
+        mirror.load(client)
+        load_time = time.perf_counter() - started
+
+        scenarios = [
+            ("email", lambda index: f"person{index}@example.org", person_ids, "person"),
+            ("phone", lambda index: f"5511{index:08d}", person_ids, "person"),
+            ("title", lambda index: f"Deal {index}", deal_ids, "deal"),
+        ]
+        # the fake search endpoints scan every record, so the API side is sampled
+        api_sample = max(1, lookups // 20)
+
+        print(f"{deals} deals and {persons} persons loaded in {load_time:.2f}s")
+        for name, term, ids, entity in scenarios:
+            terms = [term(index) for index in ids]
+            if entity == "person":
+                local = _measure(lambda value: mirror.search_person(value, exact_match=True), terms)
+                remote = _measure(
+                    lambda value: client.person.search_person(value, exact_match=True), terms[:api_sample]
+                )
+            else:
+                local = _measure(lambda value: mirror.search_deals(value), terms)
+                remote = _measure(lambda value: client.deal.search_deals(value), terms[:api_sample])
+            print(
+                f"{name:5}: mirror p50 {local[0]:8.1f} us, p99 {local[1]:8.1f} us | "
+                f"API p50 {remote[0]:8.1f} us, p99 {remote[1]:8.1f} us"
+            )
+        print(f"staleness: {mirror.staleness():.2f}s")
+        client.close()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
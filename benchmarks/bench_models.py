@@ -0,0 +1,64 @@
+"""
+Compare the memory held by N deals kept as plain dicts against N DealRecord
+objects built from the same data.
+
+Usage:
+    python -m benchmarks.bench_models [deals]
+
+The default of 100k deals keeps the dict side under 1 GB; pass 1000000 for the
+full-size run (about 9 GB of dicts).
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from pipedrive.models import DealRecord
+
+from .data import make_deal
+
+
+def _parsed_deal(deal_id):
+    # round trip through JSON, like the client does, so both sides start from decoded API data
+    return json.loads(json.dumps(make_deal(deal_id)))
+
+
+def _retained(build, count):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    held = build(count)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current, elapsed
+
+
+def main(count: int = 100000):
+    dicts, dicts_time = _retained(lambda n: [_parsed_deal(deal_id) for deal_id in range(1, n + 1)], count)
+    records, records_time = _retained(
+        lambda n: [DealRecord(_parsed_deal(deal_id)) for deal_id in range(1, n + 1)], count
+    )
+
+    print(
+        json.dumps(
+            {
+                "deals": count,
+                "dict_bytes": dicts,
+                "record_bytes": records,
+                "bytes_per_dict": dicts // count,
+                "bytes_per_record": records // count,
+                "saving": round(1 - records / dicts, 3),
+                "dict_seconds": round(dicts_time, 3),
+                "record_seconds": round(records_time, 3),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,138 @@
+"""
+Measure how a full /deals crawl scales with the worker processes of a
+ShardedRunner, against a single Client iterating the same pages.
+
+The stub server runs in its own process and serves pages encoded once up
+front, so it costs little CPU next to the decoding done by the clients. On a
+machine with fewer cores than workers the speedup flattens at the core count.
+The runner's parent process still unpickles every record it yields, so
+trimming records in the workers with fields scales further than full records.
+
+Usage:
+    python -m benchmarks.bench_sharding [deals] [max_processes]
+"""
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from pipedrive.client import Client
+from pipedrive.rate_limit import RateLimiter
+from pipedrive.sharding import ShardedRunner
+
+from .data import make_deal
+
+PAGE_SIZE = 500
+SHARD_SIZE = 5000
+FIELDS = ("id", "title", "value", "stage_id")
+
+
+def _serve(deals: int, connection):
+    records = [make_deal(deal_id) for deal_id in range(1, deals + 1)]
+    encoded = {}
+
+    def page(start: int, limit: int):
+        key = (start, limit)
+        if key not in encoded:
+            more = start + limit < deals
+            pagination = {"start": start, "limit": limit, "more_items_in_collection": more}
+            if more:
+                pagination["next_start"] = start + limit
+            body = {"success": True, "data": records[start : start + limit]}
+            body["additional_data"] = {"pagination": pagination}
+            encoded[key] = json.dumps(body).encode()
+        return encoded[key]
+
+    for start in range(0, deals, PAGE_SIZE):
+        page(start, PAGE_SIZE)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            query = {key: values[-1] for key, values in parse_qs(urlparse(self.path).query).items()}
+            content = page(int(query.get("start", 0)), int(query.get("limit", PAGE_SIZE)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    connection.send(httpd.server_address[1])
+    httpd.serve_forever()
+
+
+def _client(base_url: str, rate_limiter: RateLimiter):
+    client = Client("token", rate_limiter=rate_limiter, coalesce_requests=False)
+    client.base_url = base_url
+    return client
+
+
+def _unthrottled():
+    return RateLimiter(requests_per_window=10**9, window=1.0)
+
+
+def main(deals: int = 100000, max_processes: int = None):
+    logging.disable(logging.CRITICAL)
+    max_processes = max_processes or os.cpu_count() or 1
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    server = multiprocessing.Process(target=_serve, args=(deals, sender), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{receiver.recv()}/v1"
+    factory = functools.partial(_client, base_url)
+
+    try:
+        client = factory(_unthrottled())
+        started = time.perf_counter()
+        count = sum(1 for _ in client.iter_records("/deals", page_size=PAGE_SIZE))
+        single = time.perf_counter() - started
+        client.close()
+        print(f"{deals} deals, {os.cpu_count()} CPUs")
+        print(f"{'one client':23}: {count / single:9.0f} records/s")
+
+        for fields in (None, FIELDS):
+            processes = 1
+            baseline = None
+            while processes <= max_processes:
+                runner = ShardedRunner(
+                    processes=processes,
+                    shard_size=SHARD_SIZE,
+                    page_size=PAGE_SIZE,
+                    fields=fields,
+                    requests_per_window=10**9,
+                    window=1.0,
+                    client_factory=factory,
+                )
+                started = time.perf_counter()
+                count = sum(1 for _ in runner.run())
+                throughput = count / (time.perf_counter() - started)
+                baseline = baseline or throughput
+                stats = runner.stats()
+                label = f"{processes} processes, {'all' if fields is None else len(fields)} fields"
+                print(
+                    f"{label:23}: {throughput:9.0f} records/s, speedup {throughput / baseline:5.2f}x, "
+                    f"{count} records, {stats['duplicates']} duplicates dropped"
+                )
+                processes *= 2
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
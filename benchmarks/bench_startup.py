@@ -0,0 +1,58 @@
+"""
+Measure the cold start of the client: importing pipedrive.client, building a
+Client and sending its first request, each run in a fresh interpreter. The
+first request includes importing the HTTP stack, which is deferred until then.
+
+Usage:
+    python -m benchmarks.bench_startup [runs]
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+from .fake_server import FakeServer
+
+_PROBE = """
+import json, logging, sys, time
+logging.disable(logging.CRITICAL)
+started = time.perf_counter()
+from pipedrive.client import Client
+imported = time.perf_counter()
+client = Client("token")
+built = time.perf_counter()
+for _ in range(1000):
+    Client("token")
+construction = (time.perf_counter() - built) / 1000
+http_stack_loaded = "requests" in sys.modules
+client.base_url = sys.argv[1]
+requested = time.perf_counter()
+client.deal.get_deal_by_id(1)
+first_request = time.perf_counter() - requested
+print(json.dumps({
+    "import": imported - started,
+    "construction": construction,
+    "first_request": first_request,
+    "http_stack_loaded_before_request": http_stack_loaded,
+}))
+"""
+
+
+def _probe(base_url: str):
+    output = subprocess.run([sys.executable, "-c", _PROBE, base_url], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main(runs: int = 10):
+    with FakeServer() as server:
+        results = [_probe(server.base_url) for _ in range(runs)]
+
+    for name in ("import", "construction", "first_request"):
+        median = statistics.median(result[name] for result in results) * 1000
+        print(f"{name}: {median:.3f} ms (median of {runs} interpreters)")
+    loaded = any(result["http_stack_loaded_before_request"] for result in results)
+    print(f"requests imported before the first request: {loaded}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,48 @@
+"""
+Compare per-request latency of one-off requests.get calls against the pooled
+keep-alive transport of the Client.
+
+Usage:
+    python -m benchmarks.bench_transport [requests]
+"""
+import logging
+import statistics
+import sys
+import time
+
+import requests
+
+from pipedrive.client import Client
+from pipedrive.rate_limit import RateLimiter
+
+from .fake_server import FakeServer
+
+
+def _measure(func, count):
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main(count: int = 500):
+    logging.disable(logging.CRITICAL)
+
+    with FakeServer() as server:
+        url = f"{server.base_url}/deals/1"
+
+        unpooled = _measure(lambda: requests.get(url, headers={"Accept": "application/json"}), count)
+
+        # keep the token bucket out of the way, only the transport is compared here
+        with Client("token", rate_limiter=RateLimiter(requests_per_window=10**9, window=1.0)) as client:
+            client.base_url = server.base_url
+            pooled = _measure(lambda: client.get("/deals/1"), count)
+
+    print(f"requests.get per call: {unpooled:.3f} ms (median of {count})")
+    print(f"Client pooled session: {pooled:.3f} ms (median of {count})")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
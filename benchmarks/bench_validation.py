@@ -0,0 +1,98 @@
+"""
+Measure the per-payload cost of the schema validator against validating the
+same payloads field by field, raising on the first error, both with string
+patterns passed to re.match on every call (how Util used to validate) and with
+the compiled Util.validate_* methods.
+
+Usage:
+    python -m benchmarks.bench_validation [payloads]
+"""
+import re
+import sys
+import time
+
+from pipedrive.util import Util
+
+
+def _person(index):
+    person = {
+        "name": f"Person {index}",
+        "email": [{"value": f"person{index}@example.org"}],
+        "phone": [{"value": f"5511{index:08d}"}],
+        "owner_id": 1,
+        "visible_to": "3",
+        "marketing_status": "subscribed",
+    }
+    if index % 10 == 0:
+        # one row in ten carries two errors, so the cost of collecting every error is included
+        person["email"] = [{"value": "not-an-email"}]
+        person["visible_to"] = "2"
+    return person
+
+
+def _activity(index):
+    return {
+        "due_date": f"2023-07-{index % 28 + 1:02d}",
+        "due_time": "10:00",
+        "duration": "00:30",
+        "deal_id": index + 1,
+        "subject": f"Call {index}",
+        "user_id": 1,
+    }
+
+
+def _string_patterns(persons):
+    invalid = 0
+    for person in persons:
+        emails_ok = all(re.match(r"[^@]+@[^@]+\.[^@]+", email["value"]) for email in person["email"])
+        phones_ok = all(re.match(r"\d+", phone["value"]) for phone in person["phone"])
+        if not (emails_ok and phones_ok) or person["visible_to"] not in ["1", "3", "5", "7"]:
+            invalid += 1
+        elif person["marketing_status"] not in ["no_consent", "unsubscribed", "subscribed", "archived"]:
+            invalid += 1
+    return invalid
+
+
+def _field_by_field(util, persons):
+    invalid = 0
+    for person in persons:
+        try:
+            util.validate_email(person["email"])
+            util.validate_phone(person["phone"])
+            util.validate_visible_to(person["visible_to"])
+            util.validate_marketing_status(person["marketing_status"])
+        except ValueError:
+            invalid += 1
+    return invalid
+
+
+def _timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main(count: int = 200000):
+    util = Util()
+    persons = [_person(index) for index in range(count)]
+    activities = [_activity(index) for index in range(count)]
+
+    fields = ("email", "phone", "visible_to", "marketing_status")
+    same_fields = [{key: person[key] for key in fields} for person in persons]
+
+    invalid, string_patterns = _timed(lambda: _string_patterns(persons))
+    _, field_by_field = _timed(lambda: _field_by_field(util, persons))
+    _, schema_same_fields = _timed(lambda: util.validate_many("person", same_fields, partial=True))
+    errors, schema = _timed(lambda: util.validate_many("person", persons))
+    _, activity_schema = _timed(lambda: util.validate_many("activity", activities))
+
+    print(f"{count} payloads, {invalid} invalid persons")
+    print(f"person, re.match string patterns:    {string_patterns / count * 1e6:.2f} us/payload, first error only")
+    print(f"person, Util.validate_* per field:   {field_by_field / count * 1e6:.2f} us/payload, first error only")
+    print(f"person, validate_many, same fields:  {schema_same_fields / count * 1e6:.2f} us/payload, every error")
+    print(f"person, validate_many, full payload: {schema / count * 1e6:.2f} us/payload ({len(errors)} invalid)")
+    print(f"activity, validate_many:             {activity_schema / count * 1e6:.2f} us/payload")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,96 @@
+"""
+Compare the API read traffic of following a set of deals by polling them with
+following them through webhooks. Each round a share of the deals is updated on
+the fake server; in webhook mode every update is posted as a v1 webhook to a
+WebhookReceiver served over HTTP by wsgiref, and the client reads through the
+EntityStore it keeps current. Reads returning an outdated title are counted as
+stale.
+
+Usage:
+    python -m benchmarks.bench_webhooks [deals] [rounds]
+"""
+import logging
+import random
+import sys
+import threading
+import time
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import requests
+
+from pipedrive.client import Client
+from pipedrive.rate_limit import RateLimiter
+from pipedrive.webhooks import EntityStore, WebhookReceiver
+
+from .fake_server import FakeServer
+
+CHANGED_PER_ROUND = 0.05
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def _webhook(deal: dict):
+    micro = int(time.time() * 1e6)
+    return {
+        "v": 1,
+        "meta": {"v": 1, "action": "updated", "object": "deal", "id": deal["id"], "timestamp_micro": micro},
+        "current": dict(deal),
+        "previous": None,
+        "event": "updated.deal",
+    }
+
+
+def _follow(server: FakeServer, deal_ids: list, rounds: int, webhook_url: str = None, store: EntityStore = None):
+    client = Client("token", rate_limiter=RateLimiter(requests_per_window=10**9, window=1.0), entity_store=store)
+    client.base_url = server.base_url
+    sender = requests.Session()
+    randomizer = random.Random(0)
+    before = server.stats()["requests"]
+    stale = 0
+    started = time.perf_counter()
+
+    for round_index in range(rounds):
+        for deal_id in randomizer.sample(deal_ids, max(1, int(len(deal_ids) * CHANGED_PER_ROUND))):
+            _, body = server.api.update_deal({}, {"title": f"Deal {deal_id} r{round_index}"}, deal_id)
+            if webhook_url is not None:
+                sender.post(webhook_url, json=_webhook(body["data"])).raise_for_status()
+
+        for deal_id in deal_ids:
+            if client.deal.get_deal_by_id(deal_id)["title"] != server.api.deals[deal_id]["title"]:
+                stale += 1
+
+    elapsed = time.perf_counter() - started
+    client.close()
+    return server.stats()["requests"] - before, stale, elapsed
+
+
+def main(deals: int = 200, rounds: int = 20):
+    logging.disable(logging.CRITICAL)
+    deal_ids = list(range(1, deals + 1))
+
+    with FakeServer(latency=0.002) as server:
+        polled, polled_stale, polled_time = _follow(server, deal_ids, rounds)
+
+        store = EntityStore()
+        receiver = WebhookReceiver(store)
+        httpd = make_server("127.0.0.1", 0, receiver, handler_class=_QuietHandler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        try:
+            webhook_url = f"http://127.0.0.1:{httpd.server_port}/"
+            pushed, pushed_stale, pushed_time = _follow(server, deal_ids, rounds, webhook_url, store)
+        finally:
+            httpd.shutdown()
+
+    reads = deals * rounds
+    print(f"{deals} deals followed for {rounds} rounds, {CHANGED_PER_ROUND:.0%} changed per round, {reads} reads")
+    print(f"polling:  {polled} API requests, {polled_stale} stale reads, {polled_time:.2f}s")
+    print(f"webhooks: {pushed} API requests, {pushed_stale} stale reads, {pushed_time:.2f}s")
+    print(f"store: {store.stats()}, receiver: {receiver.stats()}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
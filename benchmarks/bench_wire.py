@@ -0,0 +1,83 @@
+"""
+Measure the bytes transferred and the time spent decoding them when reading
+deals with and without response compression, and the size of the records the
+caller ends up holding with and without a return_fields projection.
+
+Each scenario reads every deal page by page, a sample of deals one by one and
+a sample of title searches. Sizes come from RequestEvent.response_bytes, the
+body as received; decode time is the download of the body, which includes
+decompressing it, plus the JSON parsing.
+
+Usage:
+    python -m benchmarks.bench_wire [deals] [lookups]
+"""
+import json
+import logging
+import random
+import sys
+import time
+
+from pipedrive.client import Client
+from pipedrive.instrumentation import RequestHook
+from pipedrive.rate_limit import RateLimiter
+
+from .fake_server import FakePipedrive, FakeServer
+
+FIELDS = ("id", "stage_id", "value")
+
+
+class _WireStats(RequestHook):
+    def __init__(self) -> None:
+        self.requests = 0
+        self.received = 0
+        self.decode = 0.0
+
+    def after_response(self, event):
+        self.requests += 1
+        self.received += event.response_bytes
+        self.decode += event.download + event.parse
+
+
+def _read(client: Client, deal_ids: list, return_fields):
+    held = list(client.deal.iter_all(return_fields=return_fields))
+    held += [client.deal.get_deal_by_id(deal_id, return_fields=return_fields) for deal_id in deal_ids]
+    for deal_id in deal_ids[: len(deal_ids) // 10]:
+        held += client.deal.search_deals(f"Deal {deal_id}", return_fields=return_fields)["items"]
+    return held
+
+
+def main(deals: int = 5000, lookups: int = 500):
+    logging.disable(logging.CRITICAL)
+    deal_ids = random.Random(0).sample(range(1, deals + 1), lookups)
+    scenarios = [
+        ("identity, all fields", "identity", None),
+        ("identity, 3 fields", "identity", FIELDS),
+        ("compressed, all fields", None, None),
+        ("compressed, 3 fields", None, FIELDS),
+    ]
+
+    with FakeServer(api=FakePipedrive(deals=deals), compress=True) as server:
+        print(f"{deals} deals listed, {lookups} fetched by id, {lookups // 10} searches per scenario")
+        for name, encoding, return_fields in scenarios:
+            stats = _WireStats()
+            client = Client("token", rate_limiter=RateLimiter(requests_per_window=10**9, window=1.0), hooks=[stats])
+            client.base_url = server.base_url
+            if encoding is not None:
+                client.headers["Accept-Encoding"] = encoding
+
+            started = time.perf_counter()
+            held = _read(client, deal_ids, return_fields)
+            elapsed = time.perf_counter() - started
+            client.close()
+
+            held_bytes = len(json.dumps(held))
+            print(
+                f"{name:23}: {stats.received / 1e6:7.2f} MB received in {stats.requests} requests, "
+                f"decode {stats.decode * 1000:7.1f} ms, held {held_bytes / 1e6:6.2f} MB of JSON, "
+                f"total {elapsed:.2f}s"
+            )
+        print(f"Accept-Encoding sent when compressed: {Client('token').headers['Accept-Encoding']}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
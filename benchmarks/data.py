@@ -0,0 +1,134 @@
+"""
+Synthetic Pipedrive records shaped like the real API responses, shared by the
+fake server and the benchmarks.
+"""
+import hashlib
+
+STAGES = (1, 2, 3, 4, 5)
+STATUSES = ("open", "won", "lost")
+
+CUSTOM_FIELD_KEYS = tuple(hashlib.sha1(f"custom-field-{index}".encode()).hexdigest() for index in range(8))
+
+
+def make_deal(deal_id: int):
+    person_id = deal_id % 5000 + 1
+    org_id = deal_id % 700 + 1
+    deal = {
+        "id": deal_id,
+        "creator_user_id": {"id": 1, "name": "Owner", "email": "owner@example.org", "active_flag": True, "value": 1},
+        "user_id": {"id": 1, "name": "Owner", "email": "owner@example.org", "active_flag": True, "value": 1},
+        "person_id": {
+            "active_flag": True,
+            "name": f"Person {person_id}",
+            "email": [{"label": "work", "value": f"person{person_id}@example.org", "primary": True}],
+            "phone": [{"label": "work", "value": f"5511{person_id:08d}", "primary": True}],
+            "value": person_id,
+        },
+        "org_id": {"name": f"Org {org_id}", "people_count": 3, "owner_id": 1, "active_flag": True, "value": org_id},
+        "stage_id": STAGES[deal_id % len(STAGES)],
+        "title": f"Deal {deal_id}",
+        "value": deal_id * 10 % 100000,
+        "currency": "USD",
+        "add_time": "2023-01-01 10:00:00",
+        "update_time": f"2023-06-{deal_id % 28 + 1:02d} 12:00:00",
+        "stage_change_time": None,
+        "active": True,
+        "deleted": False,
+        "status": STATUSES[deal_id % len(STATUSES)],
+        "probability": None,
+        "next_activity_date": None,
+        "next_activity_time": None,
+        "next_activity_id": None,
+        "last_activity_id": None,
+        "last_activity_date": None,
+        "lost_reason": None,
+        "visible_to": "3",
+        "close_time": None,
+        "pipeline_id": 1,
+        "won_time": None,
+        "first_won_time": None,
+        "lost_time": None,
+        "products_count": 0,
+        "files_count": 0,
+        "notes_count": 0,
+        "followers_count": 1,
+        "email_messages_count": 0,
+        "activities_count": 2,
+        "done_activities_count": 1,
+        "undone_activities_count": 1,
+        "participants_count": 1,
+        "expected_close_date": None,
+        "last_incoming_mail_time": None,
+        "last_outgoing_mail_time": None,
+        "label": None,
+        "stage_order_nr": 0,
+        "person_name": f"Person {person_id}",
+        "org_name": f"Org {org_id}",
+        "next_activity_subject": None,
+        "next_activity_type": None,
+        "next_activity_duration": None,
+        "next_activity_note": None,
+        "formatted_value": f"US$ {deal_id * 10 % 100000}",
+        "weighted_value": deal_id * 10 % 100000,
+        "formatted_weighted_value": f"US$ {deal_id * 10 % 100000}",
+        "weighted_value_currency": "USD",
+        "rotten_time": None,
+        "owner_name": "Owner",
+        "cc_email": f"company+deal{deal_id}@pipedrivemail.com",
+        "org_hidden": False,
+        "person_hidden": False,
+    }
+    for index, key in enumerate(CUSTOM_FIELD_KEYS):
+        deal[key] = str(index + 1) if index % 2 else f"value {deal_id}"
+    return deal
+
+
+def make_person(person_id: int):
+    return {
+        "id": person_id,
+        "company_id": 1,
+        "owner_id": {"id": 1, "name": "Owner", "email": "owner@example.org", "active_flag": True, "value": 1},
+        "org_id": {"name": f"Org {person_id % 700 + 1}", "active_flag": True, "value": person_id % 700 + 1},
+        "name": f"Person {person_id}",
+        "first_name": "Person",
+        "last_name": str(person_id),
+        "open_deals_count": 1,
+        "closed_deals_count": 0,
+        "activities_count": 1,
+        "email": [{"label": "work", "value": f"person{person_id}@example.org", "primary": True}],
+        "phone": [{"label": "work", "value": f"5511{person_id:08d}", "primary": True}],
+        "add_time": "2023-01-01 10:00:00",
+        "update_time": f"2023-06-{person_id % 28 + 1:02d} 12:00:00",
+        "visible_to": "3",
+        "active_flag": True,
+        "label": None,
+        "org_name": f"Org {person_id % 700 + 1}",
+        "owner_name": "Owner",
+        "cc_email": "company@pipedrivemail.com",
+    }
+
+
+def make_activity(activity_id: int):
+    return {
+        "id": activity_id,
+        "company_id": 1,
+        "user_id": 1,
+        "done": activity_id % 2 == 0,
+        "type": "call",
+        "due_date": f"2023-07-{activity_id % 28 + 1:02d}",
+        "due_time": "10:00",
+        "duration": "00:30",
+        "add_time": "2023-01-01 10:00:00",
+        "update_time": f"2023-06-{activity_id % 28 + 1:02d} 12:00:00",
+        "marked_as_done_time": "",
+        "subject": f"Call {activity_id}",
+        "deal_id": activity_id % 100000 + 1,
+        "person_id": activity_id % 5000 + 1,
+        "org_id": activity_id % 700 + 1,
+        "note": None,
+        "active_flag": True,
+        "deal_title": f"Deal {activity_id % 100000 + 1}",
+        "person_name": f"Person {activity_id % 5000 + 1}",
+        "org_name": f"Org {activity_id % 700 + 1}",
+        "owner_name": "Owner",
+    }
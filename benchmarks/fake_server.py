@@ -0,0 +1,367 @@
+"""
+In-process stand-in for the Pipedrive v1 API, used by the benchmarks.
+
+It serves /deals, /persons, /activities, /dealFields, the search endpoints and
+/recents from synthetic in-memory data, with pagination, configurable latency
+429 injection and optional gzip or brotli response compression.
+"""
+import gzip
+import json
+import random
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .data import CUSTOM_FIELD_KEYS, make_activity, make_deal, make_person
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MAX_PAGE_SIZE = 500
+# smaller bodies are sent as they are, like most servers do
+MIN_COMPRESSED_SIZE = 1024
+
+
+class FakePipedrive:
+    """FakePipedrive()
+
+    In-memory dataset and request handling of the fake API, independent of HTTP.
+    """
+
+    def __init__(self, deals: int = 1000, persons: int = 500, activities: int = 1000) -> None:
+        self.lock = threading.Lock()
+        self.deals = {deal_id: make_deal(deal_id) for deal_id in range(1, deals + 1)}
+        self.persons = {person_id: make_person(person_id) for person_id in range(1, persons + 1)}
+        self.activities = {activity_id: make_activity(activity_id) for activity_id in range(1, activities + 1)}
+        self.deal_fields = _make_deal_fields()
+        self.routes = [
+            ("GET", re.compile(r"^/deals$"), self.list_deals),
+            ("POST", re.compile(r"^/deals$"), self.create_deal),
+            ("GET", re.compile(r"^/deals/search$"), self.search_deals),
+            ("GET", re.compile(r"^/deals/(\d+)$"), self.get_deal),
+            ("PUT", re.compile(r"^/deals/(\d+)$"), self.update_deal),
+            ("GET", re.compile(r"^/deals/(\d+)/activities$"), self.deal_activities),
+            ("GET", re.compile(r"^/persons$"), self.list_persons),
+            ("POST", re.compile(r"^/persons$"), self.create_person),
+            ("GET", re.compile(r"^/persons/search$"), self.search_persons),
+            ("GET", re.compile(r"^/persons/(\d+)$"), self.get_person),
+            ("PUT", re.compile(r"^/persons/(\d+)$"), self.update_person),
+            ("GET", re.compile(r"^/activities$"), self.list_activities),
+            ("POST", re.compile(r"^/activities$"), self.create_activity),
+            ("PUT", re.compile(r"^/activities/(\d+)$"), self.update_activity),
+            ("GET", re.compile(r"^/dealFields$"), self.list_deal_fields),
+            ("GET", re.compile(r"^/dealFields/(\d+)$"), self.get_deal_field),
+            ("GET", re.compile(r"^/recents$"), self.recents),
+        ]
+
+    def handle(self, method: str, path: str, query: dict, body: dict):
+        """
+        Returns:
+            tuple: The status code and the JSON body of the response.
+        """
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                return handler(query, body, *(int(group) for group in match.groups()))
+        return 404, {"success": False, "error": "Unknown endpoint"}
+
+    def list_deals(self, query, body):
+        deals = self.__filtered(self.deals.values(), query, ("status", "stage_id", "user_id"))
+        return self.__page(deals, query)
+
+    def get_deal(self, query, body, deal_id):
+        return self.__get(self.deals, deal_id)
+
+    def create_deal(self, query, body):
+        return self.__create(self.deals, make_deal, body)
+
+    def update_deal(self, query, body, deal_id):
+        return self.__update(self.deals, deal_id, body)
+
+    def search_deals(self, query, body):
+        return self.__search(self.deals.values(), query, "deal", ("title",))
+
+    def deal_activities(self, query, body, deal_id):
+        if deal_id not in self.deals:
+            return 404, {"success": False, "error": "Deal not found"}
+        activities = [activity for activity in self.activities.values() if activity["deal_id"] == deal_id]
+        return self.__page(activities, query)
+
+    def list_persons(self, query, body):
+        return self.__page(list(self.persons.values()), query)
+
+    def get_person(self, query, body, person_id):
+        return self.__get(self.persons, person_id)
+
+    def create_person(self, query, body):
+        return self.__create(self.persons, make_person, body)
+
+    def update_person(self, query, body, person_id):
+        return self.__update(self.persons, person_id, body)
+
+    def search_persons(self, query, body):
+        return self.__search(self.persons.values(), query, "person", ("name", "email", "phone"))
+
+    def list_activities(self, query, body):
+        return self.__page(self.__filtered(self.activities.values(), query, ("user_id", "type")), query)
+
+    def create_activity(self, query, body):
+        return self.__create(self.activities, make_activity, body)
+
+    def update_activity(self, query, body, activity_id):
+        return self.__update(self.activities, activity_id, body)
+
+    def list_deal_fields(self, query, body):
+        return self.__page(self.deal_fields, query)
+
+    def get_deal_field(self, query, body, deal_field_id):
+        for deal_field in self.deal_fields:
+            if deal_field["id"] == deal_field_id:
+                return 200, {"success": True, "data": deal_field}
+        return 404, {"success": False, "error": "Field not found"}
+
+    def recents(self, query, body):
+        since = query.get("since_timestamp", "1970-01-01 00:00:00")
+        collections = {"deal": self.deals, "person": self.persons, "activity": self.activities}
+        entities = query.get("items", "deal,person,activity").split(",")
+        with self.lock:
+            changes = [
+                {"item": entity, "id": record["id"], "data": record}
+                for entity in entities
+                for record in collections[entity].values()
+                if record["update_time"] >= since
+            ]
+        changes.sort(key=lambda change: (change["data"]["update_time"], change["id"]))
+        return self.__page(changes, query)
+
+    def __page(self, records, query):
+        start = int(query.get("start", 0))
+        limit = min(int(query.get("limit", 100)), MAX_PAGE_SIZE)
+        records = list(records)
+        page = records[start : start + limit]
+        more = start + limit < len(records)
+        pagination = {"start": start, "limit": limit, "more_items_in_collection": more}
+        if more:
+            pagination["next_start"] = start + limit
+        return 200, {"success": True, "data": page, "additional_data": {"pagination": pagination}}
+
+    def __filtered(self, records, query, keys):
+        records = list(records)
+        for key in keys:
+            if key in query:
+                records = [record for record in records if str(_value_of(record.get(key))) == query[key]]
+        return records
+
+    def __search(self, records, query, item_type, keys):
+        term = query.get("term", "").lower()
+        exact = query.get("exact_match", "false").lower() == "true"
+        items = []
+        for record in records:
+            for key in keys:
+                value = record.get(key)
+                texts = [entry.get("value", "") for entry in value] if isinstance(value, list) else [str(value)]
+                if any((text.lower() == term) if exact else (term in text.lower()) for text in texts):
+                    item = {"id": record["id"], "type": item_type, **_summary(record)}
+                    items.append({"result_score": 1.0, "item": item})
+                    break
+        status, page = self.__page(items, query)
+        page["data"] = {"items": page["data"]}
+        return status, page
+
+    def __get(self, collection, record_id):
+        record = collection.get(record_id)
+        if record is None:
+            return 404, {"success": False, "error": "Not found"}
+        return 200, {"success": True, "data": record}
+
+    def __create(self, collection, factory, body):
+        with self.lock:
+            record_id = max(collection, default=0) + 1
+            record = factory(record_id)
+            record.update(body or {})
+            record["id"] = record_id
+            record["update_time"] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+            collection[record_id] = record
+        return 201, {"success": True, "data": record}
+
+    def __update(self, collection, record_id, body):
+        with self.lock:
+            record = collection.get(record_id)
+            if record is None:
+                return 404, {"success": False, "error": "Not found"}
+            record.update(body or {})
+            record["update_time"] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        return 200, {"success": True, "data": record}
+
+
+class FakeServer:
+    """FakeServer()
+
+    Local HTTP/1.1 server exposing a FakePipedrive under /v1. Meant to be used
+    as a context manager.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_rate: float = 0.0,
+        throttle_reset: float = 1.0,
+        rate_limit: int = None,
+        api: FakePipedrive = None,
+        compress: bool = False,
+    ) -> None:
+        """
+        Args:
+            host (str, optional): Interface to listen on. Default is 127.0.0.1.
+            port (int, optional): Port to listen on, 0 picks a free one. Default is 0.
+            latency (float, optional): Seconds added to every response. Default is 0.
+            jitter (float, optional): Random extra seconds, up to this value, added to every response. Default is 0.
+            throttle_rate (float, optional): Fraction of requests answered with 429. Default is 0.
+            throttle_reset (float, optional): Seconds until the window resets, reported with each 429.
+                Default is 1.
+            rate_limit (int, optional): Value reported in the x-ratelimit-limit header, which the client
+                adopts as its burst budget. Default is None, no header.
+            api (FakePipedrive, optional): The dataset to serve. Default is FakePipedrive().
+            compress (bool, optional): Compress bodies of at least MIN_COMPRESSED_SIZE bytes with
+                brotli or gzip, the first the request accepts. Default is False.
+        """
+        self.api = api if api is not None else FakePipedrive()
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.throttle_reset = throttle_reset
+        self.rate_limit = rate_limit
+        self.compress = compress
+        self.requests = 0
+        self.throttled = 0
+        self.bytes_sent = 0
+        self._counter_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _handler_for(self))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def stats(self):
+        with self._counter_lock:
+            return {"requests": self.requests, "throttled": self.throttled, "bytes_sent": self.bytes_sent}
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def _handler_for(server: FakeServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def _reply(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length)) if length else None
+
+            url = urlparse(self.path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            path = url.path[3:] if url.path.startswith("/v1") else url.path
+
+            delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+            if delay:
+                time.sleep(delay)
+
+            throttled = server.throttle_rate and random.random() < server.throttle_rate
+            if throttled:
+                status, payload = 429, {"success": False, "error": "Request over limit"}
+            else:
+                status, payload = server.api.handle(self.command, path, query, body)
+
+            content = json.dumps(payload).encode()
+            encoding = self._encoding(content)
+            if encoding == "br":
+                content = brotli.compress(content)
+            elif encoding == "gzip":
+                content = gzip.compress(content, compresslevel=6)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            if encoding is not None:
+                self.send_header("Content-Encoding", encoding)
+            self.send_header("Content-Length", str(len(content)))
+            if server.rate_limit is not None:
+                self.send_header("x-ratelimit-limit", str(server.rate_limit))
+            if throttled:
+                self.send_header("x-ratelimit-remaining", "0")
+                self.send_header("x-ratelimit-reset", str(server.throttle_reset))
+            self.end_headers()
+            self.wfile.write(content)
+
+            with server._counter_lock:
+                server.requests += 1
+                server.throttled += 1 if throttled else 0
+                server.bytes_sent += len(content)
+
+        def _encoding(self, content: bytes):
+            if not server.compress or len(content) < MIN_COMPRESSED_SIZE:
+                return None
+            accepted = {coding.split(";")[0].strip() for coding in self.headers.get("Accept-Encoding", "").split(",")}
+            if brotli is not None and "br" in accepted:
+                return "br"
+            if "gzip" in accepted:
+                return "gzip"
+            return None
+
+        do_GET = _reply
+        do_POST = _reply
+        do_PUT = _reply
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def _make_deal_fields():
+    deal_fields = [
+        {"id": 1, "key": "title", "name": "Title", "field_type": "varchar", "edit_flag": False},
+        {"id": 2, "key": "value", "name": "Value", "field_type": "monetary", "edit_flag": False},
+        {"id": 3, "key": "stage_id", "name": "Stage", "field_type": "stage", "edit_flag": False},
+    ]
+    for index, key in enumerate(CUSTOM_FIELD_KEYS):
+        deal_field = {"id": 100 + index, "key": key, "name": f"Custom {index}", "edit_flag": True}
+        if index % 2:
+            deal_field["field_type"] = "enum" if index % 4 == 1 else "set"
+            deal_field["options"] = [{"id": option_id, "label": f"Option {option_id}"} for option_id in range(1, 10)]
+        else:
+            deal_field["field_type"] = "varchar"
+        deal_fields.append(deal_field)
+    return deal_fields
+
+
+def _value_of(value):
+    return value.get("value") if isinstance(value, dict) else value
+
+
+def _summary(record: dict):
+    return {key: _value_of(record.get(key)) for key in ("title", "name", "status", "value") if key in record}
@@ -0,0 +1,232 @@
+"""
+Load benchmarks of the client against the local fake Pipedrive server.
+
+Every scenario reports throughput, p50/p99 latency per operation and the peak
+Python memory allocated while it ran (measured in a second, traced pass so
+tracing does not skew the timings). Results are printed as JSON, so they can
+be stored and compared between releases.
+
+Usage:
+    python -m benchmarks.run [--requests N] [--concurrency N] [--latency SECONDS] [--jitter SECONDS]
+                             [--throttle-rate RATE] [--rate-limit N] [--deals N] [--scenario NAME ...]
+                             [--no-memory] [--output FILE]
+"""
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
+
+from pipedrive.async_client import AsyncClient
+from pipedrive.client import Client
+from pipedrive.instrumentation import RequestHook
+from pipedrive.rate_limit import RateLimiter
+
+from .fake_server import FakePipedrive, FakeServer
+
+
+def percentile(timings: list, fraction: float):
+    if not timings:
+        return None
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _unthrottled_limiter():
+    # the fake server is local, the client side budget would only measure the token bucket
+    return RateLimiter(requests_per_window=10**9, window=1.0)
+
+
+class _LatencyHook(RequestHook):
+    def __init__(self, timings: list) -> None:
+        self.timings = timings
+
+    def after_response(self, event):
+        self.timings.append(event.total)
+
+
+def _client(server: FakeServer, options, hooks=None):
+    client = Client("token", rate_limiter=_unthrottled_limiter(), pool_size=max(10, options.concurrency), hooks=hooks)
+    client.base_url = server.base_url
+    return client
+
+
+def _timed(func, timings: list):
+    started = time.perf_counter()
+    result = func()
+    timings.append(time.perf_counter() - started)
+    return result
+
+
+def sync_get(server, options, timings):
+    """Sequential get_deal_by_id calls over one pooled Client."""
+    with _client(server, options) as client:
+        for index in range(options.requests):
+            _timed(lambda: client.deal.get_deal_by_id(index % options.deals + 1), timings)
+    return options.requests
+
+
+def threaded_get(server, options, timings):
+    """get_deal_by_id calls from a thread pool sharing one Client, failed calls excluded."""
+    with _client(server, options) as client:
+        with ThreadPoolExecutor(max_workers=options.concurrency) as executor:
+            futures = []
+            for index in range(options.requests):
+                get = functools.partial(client.deal.get_deal_by_id, index % options.deals + 1)
+                futures.append(executor.submit(_timed, get, timings))
+    return sum(1 for future in futures if future.exception() is None)
+
+
+def async_get(server, options, timings):
+    """get_deal_by_id calls over an AsyncClient with concurrency requests in flight."""
+
+    async def run():
+        client = AsyncClient(
+            "token",
+            rate_limiter=_unthrottled_limiter(),
+            pool_size=options.concurrency,
+            max_in_flight=options.concurrency,
+        )
+        client.base_url = server.base_url
+        semaphore = asyncio.Semaphore(options.concurrency)
+
+        async def one(deal_id):
+            async with semaphore:
+                started = time.perf_counter()
+                await client.deal.get_deal_by_id(deal_id)
+                timings.append(time.perf_counter() - started)
+
+        async with client:
+            await asyncio.gather(*(one(index % options.deals + 1) for index in range(options.requests)))
+
+    asyncio.run(run())
+    return options.requests
+
+
+def pagination(server, options, timings):
+    """Full iteration of /deals with iter_all, latency measured per page."""
+    with _client(server, options, hooks=[_LatencyHook(timings)]) as client:
+        return sum(1 for _ in client.deal.iter_all(page_size=500))
+
+
+def bulk_create(server, options, timings):
+    """Deal creation through bulk_create, latency measured per request."""
+    payloads = [{"title": f"Bulk deal {index}", "value": str(index)} for index in range(options.requests)]
+    with _client(server, options, hooks=[_LatencyHook(timings)]) as client:
+        results = client.deal.bulk_create(payloads, max_workers=options.concurrency)
+    return sum(1 for item in results if item.ok)
+
+
+SCENARIOS = {
+    "sync_get": sync_get,
+    "threaded_get": threaded_get,
+    "async_get": async_get,
+    "pagination": pagination,
+    "bulk_create": bulk_create,
+}
+
+
+def run_scenario(name: str, server: FakeServer, options):
+    scenario = SCENARIOS[name]
+    if name == "async_get":
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            return {"skipped": "aiohttp is not installed"}
+
+    timings = []
+    requests_before = server.stats()
+    started = time.perf_counter()
+    operations = scenario(server, options, timings)
+    elapsed = time.perf_counter() - started
+    requests_after = server.stats()
+
+    result = {
+        "operations": operations,
+        "seconds": round(elapsed, 6),
+        "throughput": round(operations / elapsed, 2) if elapsed else None,
+        "p50_ms": _ms(percentile(timings, 0.50)),
+        "p99_ms": _ms(percentile(timings, 0.99)),
+        "http_requests": requests_after["requests"] - requests_before["requests"],
+        "throttled": requests_after["throttled"] - requests_before["throttled"],
+        "bytes_received": requests_after["bytes_sent"] - requests_before["bytes_sent"],
+    }
+
+    if options.memory:
+        tracemalloc.start()
+        try:
+            scenario(server, options, [])
+            result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return result
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def _package_version():
+    try:
+        return metadata.version("pipedrive-wrapper")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500, help="Operations per scenario.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Workers or requests in flight.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the fake server adds to every response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra seconds added to every response.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of responses that are 429s.")
+    parser.add_argument("--rate-limit", type=int, help="x-ratelimit-limit header sent by the fake server.")
+    parser.add_argument("--deals", type=int, default=5000, help="Deals served by the fake server.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Only run these scenarios.")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Skip the traced memory pass.")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = _parse_args(sys.argv[1:] if argv is None else argv)
+    logging.disable(logging.CRITICAL)
+
+    api = FakePipedrive(deals=options.deals)
+    server_options = {
+        "latency": options.latency,
+        "jitter": options.jitter,
+        "throttle_rate": options.throttle_rate,
+        "rate_limit": options.rate_limit,
+    }
+    report = {
+        "version": _package_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "options": vars(options),
+        "scenarios": {},
+    }
+
+    with FakeServer(api=api, **server_options) as server:
+        for name in options.scenario or SCENARIOS:
+            report["scenarios"][name] = run_scenario(name, server, options)
+
+    output = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
-from .util import Util
+from .constants import DEFAULT_MAX_WORKERS, DEFAULT_PAGE_SIZE
+from .models import ActivityRecord
+from .util import SHARED_UTIL
 
 
 class Activity:
     def __init__(self, client):
         self._client = client
-        self._util = Util()
+        self._util = SHARED_UTIL
 
     def create_activity(
         self,
@@ -54,20 +56,11 @@ class Activity:
             dict: The created activity information as a dictionary.
 
         Raises:
-            ValueError: If there are any validation errors for the fields.
+            ValidationError: If any field is invalid and the client validates payloads.
 
         """
         url_context = "/activities"
 
-        # # Validate fields
-        # self._util.validate_due_date(due_date)
-        # self._util.validate_due_time(due_time)
-        # self._util.validate_duration(duration)
-        # if participants is not None:
-        #     self._util.validate_participants(participants)
-        # if attendees is not None:
-        #     self._util.validate_attendees(attendees)
-        due_date = due_date.replace("-", "/")
         payload = {
             "due_date": due_date,
             # "due_time": due_time,
@@ -89,13 +82,159 @@ class Activity:
             # "done": done,
         }
 
+        if self._client.validate_payloads:
+            self._util.validate_payload("activity", payload)
+        payload["due_date"] = due_date.replace("-", "/")
+
         return self._client.post(url_context, payload)
 
+    def bulk_create(self, payloads, max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None):
+        """
+        Create many activities concurrently. A failing item does not abort the others.
+
+        Args:
+            payloads (Iterable[dict]): Keyword arguments of create_activity for each activity.
+            max_workers (int, optional): Number of concurrent requests. Default is 8.
+            on_progress (callable, optional): Called as on_progress(completed, failed, total) after each item.
+
+        Returns:
+            list[BulkItemResult]: One result per payload, in input order, holding either the created activity
+                or the error.
+
+        """
+        return self._client.run_bulk(self.create_activity, payloads, max_workers=max_workers, on_progress=on_progress)
+
+    def iter_all(
+        self,
+        user_id: int = None,
+        filter_id: int = None,
+        type: str = None,
+        start_date: str = None,
+        end_date: str = None,
+        done: bool = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = False,
+        model: bool = False,
+        return_fields=None,
+    ):
+        """
+        Lazily iterate over every activity, page by page.
+
+        Args:
+            user_id (int): Only activities assigned to this user.
+            filter_id (int): The ID of the filter to use.
+            type (str): Only activities of this type.
+            start_date (str): Only activities due on or after this date. Format: YYYY-MM-DD.
+            end_date (str): Only activities due on or before this date. Format: YYYY-MM-DD.
+            done (bool): Only done or only undone activities.
+            page_size (int): Items fetched per request. Default is 500.
+            prefetch (bool): Fetch the next page in the background. Default is False.
+            model (bool): Yield compact ActivityRecord objects instead of dictionaries. Default is False.
+            return_fields (Iterable[str]): Only return these fields of each activity,
+                e.g. ("id", "done", "due_date"). Default is None, every field.
+
+        Yields:
+            dict: Each activity.
+
+        """
+        url_context = "/activities"
+        params = {
+            "user_id": user_id,
+            "filter_id": filter_id,
+            "type": type,
+            "start_date": start_date,
+            "end_date": end_date,
+            "done": None if done is None else int(done),
+        }
+
+        return self._client.iter_records(
+            url_context,
+            params,
+            page_size=page_size,
+            prefetch=prefetch,
+            record_class=ActivityRecord if model else None,
+            fields=return_fields,
+        )
+
     def update_acitity(self, activity_id: int, done: bool = False):
+        return self.update_activity(activity_id, done=done)
+
+    def update_activity(
+        self,
+        activity_id: int,
+        done: bool = None,
+        subject: str = None,
+        due_date: str = None,
+        due_time: str = None,
+        duration: str = None,
+        type: str = None,
+        note: str = None,
+        deal_id: int = None,
+        person_id: int = None,
+        org_id: int = None,
+        user_id: int = None,
+        busy_flag: bool = None,
+    ):
+        """
+        Update an activity. Only the fields given are changed.
+
+        Args:
+            activity_id (int): The ID of the activity to update.
+            done (bool): Whether the activity is done or not.
+            subject (str): The subject of the activity.
+            due_date (str): The due date of the activity. Format: YYYY-MM-DD.
+            due_time (str): The due time of the activity in UTC. Format: HH:MM.
+            duration (str): The duration of the activity. Format: HH:MM.
+            type (str): The type of the activity.
+            note (str): The note of the activity (HTML format).
+            deal_id (int): The ID of the deal this activity is associated with.
+            person_id (int): The ID of the person this activity is associated with.
+            org_id (int): The ID of the organization this activity is associated with.
+            user_id (int): The ID of the user whom the activity is assigned to.
+            busy_flag (bool): Set the activity as 'Busy' or 'Free'.
+
+        Returns:
+            dict: The updated activity information as a dictionary.
+
+        Raises:
+            ValidationError: If any field is invalid and the client validates payloads.
+
+        """
         url_context = f"/activities/{activity_id}"
 
-        payload = {}
-        if done is not None:
-            payload['done'] = int(done)
+        payload = {
+            "done": None if done is None else int(done),
+            "subject": subject,
+            "due_date": due_date,
+            "due_time": due_time,
+            "duration": duration,
+            "type": type,
+            "note": note,
+            "deal_id": deal_id,
+            "person_id": person_id,
+            "org_id": org_id,
+            "user_id": user_id,
+            "busy_flag": busy_flag,
+        }
+
+        if self._client.validate_payloads:
+            self._util.validate_payload("activity", payload, partial=True)
 
-        return self._client._post(url_context, payload)
+        return self._client.put(url_context, payload)
+
+    def bulk_update(self, payloads, max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None):
+        """
+        Update many activities concurrently. A failing item does not abort the others.
+
+        Args:
+            payloads (Iterable[dict]): Keyword arguments of update_activity for each activity, including
+                activity_id. Only the fields given are changed.
+            max_workers (int, optional): Number of concurrent requests. Default is 8.
+            on_progress (callable, optional): Called as on_progress(completed, failed, total) after each item.
+
+        Returns:
+            list[BulkItemResult]: One result per payload, in input order, holding either the updated activity
+                or the error.
+
+        """
+        return self._client.run_bulk(self.update_activity, payloads, max_workers=max_workers, on_progress=on_progress)
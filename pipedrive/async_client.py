@@ -0,0 +1,336 @@
+import asyncio
+import logging
+from logging import Logger
+
+from .activity import Activity
+from .bulk import DEFAULT_MAX_WORKERS, afetch_by_ids, arun_bulk
+from .deal import Deal
+from .deal_field import DealField, _option_id
+from .exceptions import BadRequest, Forbidden, InternalServerError, NotFound, TooManyRequests, Unauthorized
+from .logs import RequestLogger
+from .pagination import DEFAULT_PAGE_SIZE, aiter_records
+from .person import Person
+from .projection import normalize_fields, project, projector
+from .rate_limit import RateLimiter
+from .transport import accept_encoding
+from .util import lazy_attribute
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+class AsyncDeal(Deal):
+    """AsyncDeal()
+
+    Deal resource bound to an AsyncClient. Every method has the same signature
+    as in Deal and returns an awaitable, except that stream=True is not
+    supported and raises ValueError.
+    """
+
+
+class AsyncPerson(Person):
+    """AsyncPerson()
+
+    Person resource bound to an AsyncClient. Every method has the same signature
+    as in Person and returns an awaitable.
+    """
+
+
+class AsyncActivity(Activity):
+    """AsyncActivity()
+
+    Activity resource bound to an AsyncClient. Every method has the same signature
+    as in Activity and returns an awaitable.
+    """
+
+
+class AsyncDealField(DealField):
+    """AsyncDealField()
+
+    DealField resource bound to an AsyncClient. Every method has the same signature
+    as in DealField and returns an awaitable.
+    """
+
+    async def get_all_deal_fields(self):
+        return [deal_field async for deal_field in self.client.iter_records("/dealFields")]
+
+    async def get_deal_field_by_key(self, deal_field_key: str):
+        return (await self.schema()).fields_by_key.get(deal_field_key)
+
+    async def get_label_of_deal_field_option(self, field_key: str, option_id: int):
+        return ((await self.schema()).labels.get(field_key) or {}).get(_option_id(option_id))
+
+    async def schema(self):
+        return self._cached_schema() or self._store_schema(await self.get_all_deal_fields())
+
+    async def refresh(self, deal_fields: list = None, seen=None):
+        if deal_fields is None:
+            schema = self._schema
+            if seen is not None and schema is not None and schema is not seen:
+                return schema
+            deal_fields = await self.get_all_deal_fields()
+        return self._store_schema(deal_fields)
+
+
+class AsyncClient:
+    def __init__(
+        self,
+        token: str,
+        logger: Logger = logging,
+        pool_size: int = 100,
+        max_in_flight: int = 100,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        rate_limiter: RateLimiter = None,
+        validate_payloads: bool = False,
+        log_sample_rate: int = 1,
+    ) -> None:
+        """
+        Asyncio counterpart of Client. Requires the optional aiohttp dependency
+        (pip install pipedrive-wrapper[async]).
+
+        Args:
+            token (str): The Pipedrive API token.
+            logger (Logger, optional): Logger used for request logs. Default is the logging module.
+            pool_size (int, optional): Maximum number of connections in the shared connection pool. Default is 100.
+            max_in_flight (int, optional): Maximum number of requests awaiting a response at once. Default is 100.
+            connect_timeout (float, optional): Connect timeout in seconds. Default is 5.0.
+            read_timeout (float, optional): Read timeout in seconds. Default is 30.0.
+            rate_limiter (RateLimiter, optional): Scheduler throttling and retrying requests. When None, a
+                RateLimiter with Pipedrive's default burst budget is created. Default is None.
+            validate_payloads (bool, optional): Validate create and update payloads before sending them,
+                raising ValidationError with every invalid field. Default is False.
+            log_sample_rate (int, optional): Log the successful requests one in every log_sample_rate.
+                Retries and errors are always logged. Default is 1, every request.
+
+        Raises:
+            ImportError: If aiohttp is not installed.
+
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncClient requires aiohttp, install it with: pip install pipedrive-wrapper[async]")
+
+        self.base_url = "https://api.pipedrive.com/v1"
+        self.token = token
+        self.headers = {"Accept": "application/json", "Accept-Encoding": accept_encoding()}
+        self.pool_size = pool_size
+        self.max_in_flight = max_in_flight
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.validate_payloads = validate_payloads
+        self.logger = logger
+        self.request_log = RequestLogger(logger, log_sample_rate)
+        self._session = None
+        self._semaphore = None
+
+    @lazy_attribute
+    def activity(self):
+        return AsyncActivity(self)
+
+    @lazy_attribute
+    def person(self):
+        return AsyncPerson(self)
+
+    @lazy_attribute
+    def deal(self):
+        return AsyncDeal(self)
+
+    @lazy_attribute
+    def deal_field(self):
+        return AsyncDealField(self)
+
+    async def post(self, url_context: str, body: dict):
+        result = await self.__request("POST", url_context, body=body)
+        return result.get("data")
+
+    async def put(self, url_context: str, body: dict):
+        result = await self.__request("PUT", url_context, body=body)
+        return result.get("data")
+
+    async def get(
+        self, url_context: str, params: dict = None, record_class: type = None, fields=None, stream: bool = False
+    ):
+        """
+        Awaitable counterpart of Client.get. The response is always read whole.
+
+        Raises:
+            ValueError: If stream is True. Use iter_records to process a large collection page by page.
+        """
+        if stream:
+            raise ValueError("AsyncClient does not support stream=True, use iter_records instead")
+
+        result = await self.get_page(url_context, params, fields)
+        data = result.get("data")
+        if record_class is None or data is None:
+            return data
+
+        if isinstance(data, list):
+            return [record_class(item) for item in data]
+        return record_class(data)
+
+    async def get_page(self, url_context: str, params: dict = None, fields=None):
+        """
+        Awaitable counterpart of Client.get_page.
+        """
+        result = await self.__request("GET", url_context, params=params)
+        fields = normalize_fields(fields)
+        if fields is not None:
+            result["data"] = project(result.get("data"), fields)
+        return result
+
+    def iter_records(
+        self,
+        url_context: str,
+        params: dict = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = False,
+        record_class: type = None,
+        fields=None,
+    ):
+        """
+        Async iterator over every record of a paginated GET endpoint.
+        See pipedrive.pagination.aiter_records.
+
+        Records built from record_class cannot resolve custom field names, since
+        the DealField lookups of this client are coroutines.
+        """
+        return aiter_records(
+            self,
+            url_context,
+            params,
+            page_size=page_size,
+            prefetch=prefetch,
+            record_factory=projector(normalize_fields(fields), record_class),
+        )
+
+    def run_bulk(self, func, payloads, max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None):
+        """
+        Await a resource method once per payload with bounded concurrency.
+        See pipedrive.bulk.arun_bulk.
+        """
+        return arun_bulk(func, payloads, max_workers=max_workers, on_progress=on_progress)
+
+    def fetch_by_ids(self, func, id_argument: str, ids, max_workers: int = DEFAULT_MAX_WORKERS, **kwargs):
+        """
+        Fetch many records by id with bounded concurrency, each distinct id once, in input order.
+        See pipedrive.bulk.afetch_by_ids.
+        """
+        return afetch_by_ids(func, id_argument, ids, max_workers=max_workers, **kwargs)
+
+    async def close(self):
+        """
+        Close the shared connection pool.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def __request(self, method: str, url_context: str, params: dict = None, body: dict = None):
+        url_to_request = self.__generate_url_to_request(url_context)
+
+        if isinstance(params, dict):
+            params = self.__check_values_of_dict(params)
+
+        extra_log = self.request_log.context(method, url_to_request, query_params=params)
+
+        if body is not None:
+            body = self.__check_values_of_dict(body)
+            self.request_log.debug('Body content at extras', extra_log, body=body)
+
+        self.request_log.info('Sending request', extra_log)
+
+        session = self.__get_session()
+        attempt = 0
+        async with self._semaphore:
+            while True:
+                await self.rate_limiter.acquire_async()
+
+                async with session.request(
+                    method,
+                    url_to_request,
+                    headers=self.headers,
+                    params=self.__encode_params(params),
+                    json=body,
+                ) as response:
+                    self.rate_limiter.observe(response.status, response.headers)
+
+                    if not self.rate_limiter.should_retry(method, response.status, attempt):
+                        self.__raise_for_status(response, extra_log)
+                        result = await response.json(content_type=None)
+                        break
+
+                    delay = self.rate_limiter.retry_delay(attempt, response.headers)
+
+                self.request_log.warning(
+                    f'Retrying request in {delay:.2f}s',
+                    extra_log,
+                    response.request_info,
+                    http_status_code=response.status,
+                    attempt=attempt + 1,
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+        return result
+
+    def __get_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._session
+
+    def __generate_url_to_request(self, url_context: str):
+        url_to_request = f"{self.base_url}{url_context}?api_token={self.token}"
+        return url_to_request
+
+    def __check_values_of_dict(self, params: dict):
+        return {key: value for key, value in params.items() if value is not None}
+
+    def __encode_params(self, params: dict):
+        # aiohttp only accepts str, int and float query values
+        if not params:
+            return None
+        return {key: str(value).lower() if isinstance(value, bool) else value for key, value in params.items()}
+
+    def __raise_for_status(self, response, extra_log: dict):
+        status_code = response.status
+
+        if 300 > status_code >= 200:
+            if extra_log is not None:
+                extra_log['http_status_code'] = status_code
+                self.request_log.info('Successful request', extra_log)
+            return
+
+        self.request_log.error(
+            'Error when performing request, see extra for details',
+            extra_log,
+            response.request_info,
+            http_status_code=status_code,
+        )
+
+        if status_code == 400:
+            raise BadRequest()
+
+        if status_code == 401:
+            raise Unauthorized()
+
+        if status_code == 403:
+            raise Forbidden()
+
+        if status_code == 404:
+            raise NotFound()
+
+        if status_code == 429:
+            raise TooManyRequests()
+
+        if status_code >= 500:
+            raise InternalServerError()
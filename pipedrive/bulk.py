@@ -0,0 +1,172 @@
+from .constants import DEFAULT_MAX_WORKERS
+from .exceptions import NotFound
+
+
+class BulkItemResult:
+    """BulkItemResult()
+
+    Outcome of one payload of a bulk operation: either the API result or the
+    exception raised while sending it.
+    """
+
+    __slots__ = ("index", "payload", "result", "error")
+
+    def __init__(self, index: int, payload: dict, result=None, error: Exception = None) -> None:
+        self.index = index
+        self.payload = payload
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"BulkItemResult(index={self.index}, {status})"
+
+
+def run_bulk(func, payloads, max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None):
+    """
+    Call func(**payload) for every payload over a bounded thread pool.
+
+    Errors are collected per item instead of aborting the whole batch. At most
+    max_workers payloads are pulled from the iterable ahead of completion, so
+    large generators are not materialized up front.
+
+    Args:
+        func (callable): The resource method to call, e.g. client.deal.create_deal.
+        payloads (Iterable[dict]): Keyword arguments for each call.
+        max_workers (int, optional): Number of concurrent requests. Default is 8.
+        on_progress (callable, optional): Called as on_progress(completed, failed, total) after
+            each item. total is None when payloads has no len(). Default is None.
+
+    Returns:
+        list[BulkItemResult]: One result per payload, in input order.
+
+    """
+    # imported on first use, concurrent.futures and asyncio are costly at import time and most clients never need them
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    total = len(payloads) if hasattr(payloads, "__len__") else None
+    results = []
+    failed = 0
+
+    def call(index, payload):
+        try:
+            return BulkItemResult(index, payload, result=func(**payload))
+        except Exception as error:
+            return BulkItemResult(index, payload, error=error)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for index, payload in enumerate(payloads):
+            if len(pending) >= max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                failed += _collect(done, results, failed, total, on_progress)
+            pending.add(executor.submit(call, index, payload))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            failed += _collect(done, results, failed, total, on_progress)
+
+    results.sort(key=lambda item: item.index)
+    return results
+
+
+async def arun_bulk(func, payloads, max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None):
+    """
+    Async counterpart of run_bulk: await func(**payload) for every payload with
+    at most max_workers calls in flight.
+
+    Returns:
+        list[BulkItemResult]: One result per payload, in input order.
+
+    """
+    import asyncio
+
+    total = len(payloads) if hasattr(payloads, "__len__") else None
+    results = []
+    counters = {"failed": 0}
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def call(index, payload):
+        try:
+            item = BulkItemResult(index, payload, result=await func(**payload))
+        except Exception as error:
+            item = BulkItemResult(index, payload, error=error)
+        finally:
+            semaphore.release()
+
+        results.append(item)
+        if not item.ok:
+            counters["failed"] += 1
+        if on_progress is not None:
+            on_progress(len(results), counters["failed"], total)
+
+    tasks = []
+    for index, payload in enumerate(payloads):
+        await semaphore.acquire()
+        tasks.append(asyncio.ensure_future(call(index, payload)))
+    await asyncio.gather(*tasks)
+
+    results.sort(key=lambda item: item.index)
+    return results
+
+
+def fetch_by_ids(func, id_argument: str, ids, max_workers: int = DEFAULT_MAX_WORKERS, **kwargs):
+    """
+    Fetch many records by id concurrently, requesting each distinct id once.
+
+    Args:
+        func (callable): The getter to call, e.g. client.deal.get_deal_by_id.
+        id_argument (str): The name of the id argument of func, e.g. "deal_id".
+        ids (Iterable[int]): The ids to fetch. Duplicates are allowed.
+        max_workers (int, optional): Number of concurrent requests. Default is 8.
+        **kwargs: Extra keyword arguments passed to every call.
+
+    Returns:
+        list: The records in the order of ids, with None for ids that do not exist.
+
+    Raises:
+        HTTPException: The first error other than NotFound.
+
+    """
+    ids = list(ids)
+    unique_ids = list(dict.fromkeys(ids))
+    results = run_bulk(func, [{id_argument: id, **kwargs} for id in unique_ids], max_workers=max_workers)
+    return _in_input_order(ids, unique_ids, results)
+
+
+async def afetch_by_ids(func, id_argument: str, ids, max_workers: int = DEFAULT_MAX_WORKERS, **kwargs):
+    """
+    Async counterpart of fetch_by_ids.
+    """
+    ids = list(ids)
+    unique_ids = list(dict.fromkeys(ids))
+    results = await arun_bulk(func, [{id_argument: id, **kwargs} for id in unique_ids], max_workers=max_workers)
+    return _in_input_order(ids, unique_ids, results)
+
+
+def _in_input_order(ids: list, unique_ids: list, results: list):
+    by_id = {}
+    for id, item in zip(unique_ids, results):
+        if item.ok:
+            by_id[id] = item.result
+        elif isinstance(item.error, NotFound):
+            by_id[id] = None
+        else:
+            raise item.error
+    return [by_id[id] for id in ids]
+
+
+def _collect(done, results, failed, total, on_progress):
+    newly_failed = 0
+    for future in done:
+        item = future.result()
+        results.append(item)
+        if not item.ok:
+            newly_failed += 1
+        if on_progress is not None:
+            on_progress(len(results), failed + newly_failed, total)
+    return newly_failed
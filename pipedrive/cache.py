@@ -0,0 +1,326 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# listings of another collection holding records of a collection, by the field of the record linking them
+_RELATED_LISTINGS = {"/activities": (("deal_id", "/deals/{}/activities"),)}
+
+
+class CacheEntry:
+    """CacheEntry()
+
+    A cached GET response body, kept serialized so callers can never mutate
+    the cached copy.
+    """
+
+    __slots__ = ("path", "body", "expires_at", "etag", "last_modified")
+
+    def __init__(self, path: str, body: bytes, expires_at: float, etag: str = None, last_modified: str = None):
+        self.path = path
+        self.body = body
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+    @property
+    def revalidatable(self):
+        return self.etag is not None or self.last_modified is not None
+
+
+class CacheBackend:
+    """CacheBackend()
+
+    Storage interface of the ResponseCache. Implementations must be thread-safe
+    and report evictions through the on_evict callback.
+    """
+
+    on_evict = None
+
+    def get(self, key: str):
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry):
+        raise NotImplementedError
+
+    def delete_path(self, path: str, subpaths: bool = True):
+        """
+        Delete every entry cached for path and, unless subpaths is False, for any of its sub-paths.
+
+        Returns:
+            int: Number of deleted entries.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def _evicted(self, count: int = 1):
+        if self.on_evict is not None and count:
+            self.on_evict(count)
+
+
+class MemoryCache(CacheBackend):
+    """MemoryCache()
+
+    In-process LRU backend.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self._evicted(evicted)
+
+    def delete_path(self, path: str, subpaths: bool = True):
+        with self._lock:
+            keys = [
+                key
+                for key, entry in self._entries.items()
+                if entry.path == path or (subpaths and _matches(entry.path, path))
+            ]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """SQLiteCache()
+
+    On-disk backend stored in a local sqlite database, so the cache survives
+    restarts and can be shared by processes on the same machine. Least recently
+    used entries are evicted past max_entries.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000) -> None:
+        import sqlite3
+
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, path TEXT NOT NULL, body BLOB NOT NULL, expires_at REAL NOT NULL,"
+            " etag TEXT, last_modified TEXT, used_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_path ON responses (path)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT path, body, expires_at, etag, last_modified FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE responses SET used_at = ? WHERE key = ?", (time.time(), key))
+        return CacheEntry(*row)
+
+    def set(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, entry.path, entry.body, entry.expires_at, entry.etag, entry.last_modified, time.time()),
+            )
+            evicted = self._connection.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        self._evicted(evicted)
+
+    def delete_path(self, path: str, subpaths: bool = True):
+        with self._lock:
+            if not subpaths:
+                return self._connection.execute("DELETE FROM responses WHERE path = ?", (path,)).rowcount
+            return self._connection.execute(
+                "DELETE FROM responses WHERE path = ? OR substr(path, 1, ?) = ?",
+                (path, len(path) + 1, path + "/"),
+            ).rowcount
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class ResponseCache:
+    """ResponseCache()
+
+    Opt-in cache for the GET requests of a Client. Entries expire after a TTL
+    chosen per endpoint; expired entries that carried an ETag or Last-Modified
+    header are revalidated with a conditional request. A successful POST or PUT
+    evicts the cached responses it made stale, see invalidate.
+    """
+
+    def __init__(self, backend: CacheBackend = None, default_ttl: float = 60, ttls: dict = None) -> None:
+        """
+        Args:
+            backend (CacheBackend, optional): Where entries are stored. Default is MemoryCache().
+            default_ttl (float, optional): TTL in seconds of endpoints not listed in ttls. Default is 60.
+            ttls (dict, optional): TTL in seconds per endpoint path prefix, e.g. {"/dealFields": 3600}.
+                The longest matching prefix wins, and a TTL of 0 disables caching for it. Default is None.
+        """
+        self.backend = backend if backend is not None else MemoryCache()
+        self.backend.on_evict = self.__count_evictions
+        self.default_ttl = default_ttl
+        self.ttls = sorted((ttls or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0, "invalidations": 0}
+
+    def ttl_for(self, url_context: str):
+        for prefix, ttl in self.ttls:
+            if _matches(url_context, prefix):
+                return ttl
+        return self.default_ttl
+
+    def key_for(self, url_context: str, params: dict = None):
+        if not params:
+            return url_context
+        return f"{url_context}?{json.dumps(params, sort_keys=True, default=str)}"
+
+    def lookup(self, key: str):
+        """
+        Returns:
+            CacheEntry: The cached entry, fresh or stale, or None if there is none.
+        """
+        entry = self.backend.get(key)
+        self.__increment("hits" if entry is not None and entry.fresh else "misses")
+        return entry
+
+    def store(self, key: str, url_context: str, body: bytes, headers):
+        ttl = self.ttl_for(url_context)
+        if ttl <= 0:
+            return
+        entry = CacheEntry(
+            url_context,
+            body,
+            time.time() + ttl,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+        self.backend.set(key, entry)
+
+    def refresh(self, key: str, entry: CacheEntry):
+        """
+        Extend the life of a stale entry the server reported as not modified.
+        """
+        self.__increment("revalidated")
+        entry.expires_at = time.time() + self.ttl_for(entry.path)
+        self.backend.set(key, entry)
+
+    def invalidate(self, url_context: str, method: str = "PUT", records=()):
+        """
+        Evict the responses a successful write made stale.
+
+        A POST to a collection, e.g. "/deals", evicts its listings and its search results, but
+        not the records cached under it. A PUT or DELETE of a record, e.g. "/deals/1", evicts the
+        record and its sub-paths, like "/deals/1/activities", its parent listing and the listings
+        and search results of its collection, "/deals" and "/deals/search".
+
+        A write to an activity also evicts the activities of the deals it belongs to, e.g.
+        "/deals/3/activities", found in the request body, the returned activity and the cached
+        copy of the activity, for a deal it was moved away from.
+
+        Args:
+            url_context (str): The path written to.
+            method (str, optional): "POST", "PUT" or "DELETE". Default is "PUT".
+            records (Iterable[dict], optional): The request body and the returned record. Default is ().
+        """
+        path = url_context.rstrip("/")
+        parent = path.rsplit("/", 1)[0]
+        collection = "/" + path.lstrip("/").split("/", 1)[0]
+
+        related = set()
+        if collection in _RELATED_LISTINGS:
+            if method != "POST":
+                records = [*records, self.__cached_record(path)]
+            related = self.__related_listings(collection, records)
+        if method == "POST":
+            count = self.backend.delete_path(path, subpaths=False)
+        else:
+            count = self.backend.delete_path(path)
+        for stale in ({parent, collection, f"{collection}/search"} | related) - {"", path}:
+            count += self.backend.delete_path(stale, subpaths=False)
+        self.__increment("invalidations", count)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hits, misses, revalidated entries, LRU evictions, invalidated entries and current size.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["size"] = len(self.backend)
+        return stats
+
+    def __cached_record(self, path: str):
+        entry = self.backend.get(path)
+        if entry is None:
+            return None
+        try:
+            return json.loads(entry.body).get("data")
+        except (ValueError, AttributeError):
+            return None
+
+    def __related_listings(self, collection: str, records: list):
+        listings = set()
+        for field, listing in _RELATED_LISTINGS[collection]:
+            for record in records:
+                value = record.get(field) if isinstance(record, dict) else None
+                if isinstance(value, dict):
+                    value = value.get("value", value.get("id"))
+                if value is not None:
+                    listings.add(listing.format(value))
+        return listings
+
+    def __count_evictions(self, count: int):
+        self.__increment("evictions", count)
+
+    def __increment(self, counter: str, amount: int = 1):
+        with self._lock:
+            self._stats[counter] += amount
+
+
+def _matches(path: str, prefix: str):
+    return path == prefix or path.startswith(prefix.rstrip("/") + "/")
@@ -1,119 +1,592 @@
-import requests
-
-from .activity import Activity
-from .deal import Deal
-from .deal_field import DealField
+from .constants import API, DEFAULT_MAX_WORKERS, DEFAULT_PAGE_SIZE
 from .exceptions import BadRequest, Forbidden, InternalServerError, NotFound, TooManyRequests, Unauthorized
-from .person import Person
+from .models import DealRecord
+from .util import lazy_attribute
+import json
 import logging
+import re
+import time
 from logging import Logger
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import requests
+
+    from .cache import ResponseCache
+    from .instrumentation import RequestEvent, RequestHook
+    from .rate_limit import RateLimiter
+    from .transport import Transport
+    from .webhooks import EntityStore
+
+_RECORD_PATH = re.compile(r"^(/deals|/persons|/activities)(?:/(\d+))?$")
+_ENTITY_OF_PATH = {"/deals": "deal", "/persons": "person", "/activities": "activity"}
 
 
 class Client:
-    def __init__(self, token: str, logger: Logger = logging) -> None:
-        self.extra_log = None
+    def __init__(
+        self,
+        token: str,
+        logger: Logger = logging,
+        transport: "Transport" = None,
+        pool_size: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        rate_limiter: "RateLimiter" = None,
+        cache: "ResponseCache" = None,
+        hooks: list = None,
+        coalesce_requests: bool = True,
+        validate_payloads: bool = False,
+        entity_store: "EntityStore" = None,
+        log_sample_rate: int = 1,
+    ) -> None:
+        """
+        Args:
+            token (str): The Pipedrive API token.
+            logger (Logger, optional): Logger used for request logs. Default is the logging module.
+            transport (Transport, optional): HTTP transport to send requests through. When None, a
+                SessionTransport owned by this client is created. Default is None.
+            pool_size (int, optional): Maximum number of keep-alive connections of the default transport. Default is 10.
+            connect_timeout (float, optional): Connect timeout in seconds of the default transport. Default is 5.0.
+            read_timeout (float, optional): Read timeout in seconds of the default transport. Default is 30.0.
+            rate_limiter (RateLimiter, optional): Scheduler throttling and retrying requests. When None, a
+                RateLimiter with Pipedrive's default burst budget is created. Default is None.
+            cache (ResponseCache, optional): Cache for GET responses. Default is None, no caching.
+            hooks (list[RequestHook], optional): Middlewares notified before each request, after each
+                response and on errors, e.g. a MetricsAggregator. Default is None.
+            coalesce_requests (bool, optional): Let concurrent identical GET requests share one
+                in-flight request. Default is True.
+            validate_payloads (bool, optional): Validate create and update payloads before sending them,
+                raising ValidationError with every invalid field. Default is False.
+            entity_store (EntityStore, optional): Local copy of deals, persons and activities kept current
+                by a WebhookReceiver. The records fetched, created or updated are stored in it, and GETs of a
+                single record are served from it until a webhook changes the record. Default is None.
+            log_sample_rate (int, optional): Log the successful requests one in every log_sample_rate.
+                Retries and errors are always logged. Default is 1, every request.
+        """
+        # the subsystems are imported here and in the methods using them, so importing this module stays cheap
+        from .logs import RequestLogger
+        from .rate_limit import RateLimiter
+        from .singleflight import SingleFlight
+        from .transport import SessionTransport, accept_encoding
+
         self.base_url = "https://api.pipedrive.com/v1"
         self.token = token
-        self.headers = {"Accept": "application/json"}
-        self.activity = Activity(self)
-        self.person = Person(self)
-        self.deal = Deal(self)
-        self.deal_field = DealField(self)
+        self.headers = {"Accept": "application/json", "Accept-Encoding": accept_encoding()}
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = SessionTransport(
+                pool_maxsize=pool_size,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+            )
+        self.transport = transport
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.cache = cache
+        self.hooks = list(hooks or [])
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        self.validate_payloads = validate_payloads
+        self.entity_store = entity_store
         self.logger = logger
+        self.request_log = RequestLogger(logger, log_sample_rate)
+
+    @lazy_attribute
+    def activity(self):
+        from .activity import Activity
+
+        return Activity(self)
+
+    @lazy_attribute
+    def person(self):
+        from .person import Person
+
+        return Person(self)
+
+    @lazy_attribute
+    def deal(self):
+        from .deal import Deal
+
+        return Deal(self)
+
+    @lazy_attribute
+    def deal_field(self):
+        from .deal_field import DealField
+
+        return DealField(self)
+
+    @lazy_attribute
+    def custom_fields(self):
+        from .custom_fields import CustomFieldResolver
+
+        return CustomFieldResolver(self)
 
     def post(self, url_context: str, body: dict):
         url_to_request = self.__generate_url_to_request(url_context)
 
-        self.extra_log = {'request_url': url_to_request, 'http_method': 'POST'}
+        extra_log = self.request_log.context('POST', url_to_request)
 
         body = self.__check_values_of_dict(body)
 
-        response = requests.post(
-            url=url_to_request,
-            headers=self.headers,
-            json=body,
-        )
+        event = self.__start_event("POST", url_context)
+        try:
+            response = self.__send("POST", url_to_request, extra_log, json=body, event=event)
+
+            self.request_log.debug('Body content at extras', extra_log, body=body)
+
+            self.request_log.info('Sending request', extra_log)
 
-        extra_log_body_content = self.extra_log.copy()
-        extra_log_body_content['body'] = body
-        self.logger.debug('Body content at extras', extra=extra_log_body_content)
+            self.__raise_for_status(response, extra_log)
 
-        self.logger.info('Sending request', extra=self.extra_log)
+            result = self.__parse_response(response, event)
 
-        self.__raise_for_status(response)
+            if self.cache is not None:
+                self.cache.invalidate(url_context, "POST", (body, result.get("data")))
+        except Exception as error:
+            self.__emit_error(event, error)
+            raise
 
-        result = self.__parse_response(response)
+        self.__emit_response(event)
+
+        if self.entity_store is not None:
+            self.__fill_entity_store(url_context, result.get("data"))
 
         return result.get("data")
 
     def put(self, url_context: str, body: dict):
         url_to_request = self.__generate_url_to_request(url_context)
 
-        self.extra_log = {'request_url': url_to_request, 'http_method': 'PUT'}
+        extra_log = self.request_log.context('PUT', url_to_request)
 
         body = self.__check_values_of_dict(body)
 
-        self.logger.info('Sending request', extra=self.extra_log)
+        self.request_log.info('Sending request', extra_log)
 
-        extra_log_body_content = self.extra_log.copy()
-        extra_log_body_content['body'] = body
-        self.logger.debug('Body content at extras', extra=extra_log_body_content)
+        self.request_log.debug('Body content at extras', extra_log, body=body)
 
-        response = requests.put(
-            url=url_to_request,
-            headers=self.headers,
-            json=body,
-        )
+        event = self.__start_event("PUT", url_context)
+        try:
+            response = self.__send("PUT", url_to_request, extra_log, json=body, event=event)
+
+            self.__raise_for_status(response, extra_log)
 
-        self.__raise_for_status(response)
+            result = self.__parse_response(response, event)
 
-        result = self.__parse_response(response)
+            if self.cache is not None:
+                self.cache.invalidate(url_context, "PUT", (body, result.get("data")))
+        except Exception as error:
+            self.__emit_error(event, error)
+            raise
+
+        self.__emit_response(event)
+
+        if self.entity_store is not None:
+            self.__fill_entity_store(url_context, result.get("data"))
 
         return result.get("data")
 
-    def get(self, url_context: str, params: dict = None):
-        url_to_request = self.__generate_url_to_request(url_context)
+    def get(
+        self,
+        url_context: str,
+        params: dict = None,
+        record_class: type = None,
+        stream: bool = False,
+        fields=None,
+    ):
+        """
+        Perform a GET request and return the data of the response.
+
+        Args:
+            url_context (str): The endpoint path, e.g. "/deals".
+            params (dict, optional): The query parameters. Default is None.
+            record_class (type, optional): A pipedrive.models.Record subclass to build from the data. Default is None.
+            stream (bool, optional): Return a StreamedResponse that parses the body incrementally and
+                yields each element of data as soon as it is read. The response cache is bypassed. Default is False.
+            fields (Iterable[str] | str, optional): Only keep these fields of each record, see get_page.
+                Default is None.
+
+        Returns:
+            The data of the response, or a StreamedResponse when stream is True.
+
+        """
+        from .projection import normalize_fields
+
+        if stream:
+            return self.__get_stream(url_context, params, record_class, normalize_fields(fields))
+
+        data = self.get_page(url_context, params, fields).get("data")
+        if record_class is None or data is None:
+            return data
+
+        record_factory = self.__record_factory(record_class)
+        if isinstance(data, list):
+            return [record_factory(item) for item in data]
+        return record_factory(data)
+
+    def get_page(self, url_context: str, params: dict = None, fields=None):
+        """
+        Perform a GET request and return the whole response body, including
+        the additional_data block with the pagination details.
+
+        Args:
+            url_context (str): The endpoint path, e.g. "/deals".
+            params (dict, optional): The query parameters. Default is None.
+            fields (Iterable[str] | str, optional): Only keep these fields of each record, or of each
+                search result item. Records are trimmed right after parsing, so the response cache
+                holds the trimmed body. Default is None, every field.
+
+        Returns:
+            dict: The parsed response body.
+
+        """
+        from .projection import normalize_fields, project
 
-        self.extra_log = {'request_url': url_to_request, 'http_method': 'GET'}
+        url_to_request = self.__generate_url_to_request(url_context)
 
         if isinstance(params, dict):
             params = self.__check_values_of_dict(params)
 
-        self.extra_log['query_params'] = params
-
-        self.logger.info('Sending request', extra=self.extra_log)
+        fields = normalize_fields(fields)
+
+        extra_log = self.request_log.context('GET', url_to_request, query_params=params)
+
+        if self.entity_store is not None and not params:
+            record = self.__lookup_entity_store(url_context, extra_log)
+            if record is not None:
+                record["data"] = project(record["data"], fields)
+                return record
+
+        if self.single_flight is None:
+            result = self.__fetch_page(url_context, url_to_request, params, fields, extra_log)
+        else:
+            flight_key = (url_context, json.dumps(params, sort_keys=True, default=str), fields)
+            result = self.single_flight.do(
+                flight_key, lambda: self.__fetch_page(url_context, url_to_request, params, fields, extra_log)
+            )
+
+        # a trimmed record would shadow the whole one in the store
+        if self.entity_store is not None and not params and fields is None:
+            self.__fill_entity_store(url_context, result.get("data"))
+
+        return result
+
+    def __fetch_page(self, url_context: str, url_to_request: str, params: dict, fields: tuple, extra_log: dict):
+        event = self.__start_event("GET", url_context)
+        try:
+            cache_key = cache_entry = None
+            if self.cache is not None:
+                cache_params = params if fields is None else {**(params or {}), "fields": fields}
+                cache_key = self.cache.key_for(url_context, cache_params)
+                cache_entry = self.cache.lookup(cache_key)
+                if cache_entry is not None and cache_entry.fresh:
+                    self.request_log.debug('Serving response from cache', extra_log)
+                    if event is not None:
+                        event.from_cache = True
+                    result = self.__parse_body(cache_entry.body, event)
+                    self.__emit_response(event)
+                    return result
+
+            self.request_log.info('Sending request', extra_log)
+
+            response = self.__send(
+                "GET",
+                url_to_request,
+                extra_log,
+                params=params,
+                headers=self.__conditional_headers(cache_entry),
+                event=event,
+            )
+
+            if cache_entry is not None and response.status_code == 304:
+                self.request_log.info('Cached response revalidated', extra_log)
+                self.cache.refresh(cache_key, cache_entry)
+                result = self.__parse_body(cache_entry.body, event)
+            else:
+                self.__raise_for_status(response, extra_log)
+
+                result = self.__parse_response(response, event)
+
+                if fields is None:
+                    body = response.content
+                else:
+                    from .projection import project
+
+                    result["data"] = project(result.get("data"), fields)
+                    body = json.dumps(result).encode() if self.cache is not None else None
+
+                if self.cache is not None:
+                    self.cache.store(cache_key, url_context, body, response.headers)
+        except Exception as error:
+            self.__emit_error(event, error)
+            raise
+
+        self.__emit_response(event)
+
+        return result
+
+    def __get_stream(self, url_context: str, params: dict = None, record_class: type = None, fields: tuple = None):
+        from .projection import projector
+        from .streaming import StreamedResponse
 
-        response = requests.get(
-            url=url_to_request,
-            headers=self.headers,
-            params=params,
-        )
+        url_to_request = self.__generate_url_to_request(url_context)
 
-        self.__raise_for_status(response)
+        if isinstance(params, dict):
+            params = self.__check_values_of_dict(params)
 
-        result = self.__parse_response(response)
+        extra_log = self.request_log.context('GET', url_to_request, stream=True, query_params=params)
+
+        event = self.__start_event("GET", url_context)
+        try:
+            self.request_log.info('Sending request', extra_log)
+
+            response = self.__send("GET", url_to_request, extra_log, params=params, event=event, stream=True)
+
+            self.__raise_for_status(response, extra_log)
+        except Exception as error:
+            self.__emit_error(event, error)
+            raise
+
+        def finish(streamed):
+            if event is None:
+                return
+            # the body is decoded while it is downloaded, so both phases are reported as download
+            event.download = time.perf_counter() - event.started_at - event.wait
+            event.response_bytes = getattr(response.raw, "tell", lambda: 0)()
+            self.__emit_response(event)
+
+        record_factory = projector(fields, self.__record_factory(record_class))
+        return StreamedResponse(response, record_factory=record_factory, on_finish=finish)
+
+    def iter_records(
+        self,
+        url_context: str,
+        params: dict = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = False,
+        record_class: type = None,
+        fields=None,
+    ):
+        """
+        Lazily iterate over every record of a paginated GET endpoint.
+        See pipedrive.pagination.iter_records. With fields, each record only
+        keeps these fields before it is yielded.
+        """
+        from .pagination import iter_records
+        from .projection import normalize_fields, projector
+
+        return iter_records(
+            self,
+            url_context,
+            params,
+            page_size=page_size,
+            prefetch=prefetch,
+            record_factory=projector(normalize_fields(fields), self.__record_factory(record_class)),
+        )
 
-        return result.get("data")
+    def run_bulk(self, func, payloads, max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None):
+        """
+        Call a resource method once per payload over a bounded thread pool.
+        See pipedrive.bulk.run_bulk.
+        """
+        from .bulk import run_bulk
+
+        return run_bulk(func, payloads, max_workers=max_workers, on_progress=on_progress)
+
+    def fetch_by_ids(self, func, id_argument: str, ids, max_workers: int = DEFAULT_MAX_WORKERS, **kwargs):
+        """
+        Fetch many records by id concurrently, each distinct id once, in input order.
+        See pipedrive.bulk.fetch_by_ids.
+        """
+        from .bulk import fetch_by_ids
+
+        return fetch_by_ids(func, id_argument, ids, max_workers=max_workers, **kwargs)
+
+    def close(self):
+        """
+        Release the connections held by the transport, if this client created it.
+        """
+        if self._owns_transport:
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_hook(self, hook: "RequestHook"):
+        """
+        Register a middleware notified before each request, after each response and on errors.
+        """
+        self.hooks.append(hook)
+
+    def __send(
+        self,
+        method: str,
+        url_to_request: str,
+        extra_log: dict,
+        params: dict = None,
+        json: dict = None,
+        headers: dict = None,
+        event: "RequestEvent" = None,
+        stream: bool = False,
+    ):
+        headers = {**self.headers, **headers} if headers else self.headers
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+
+            sent_at = time.perf_counter()
+            response = self.transport.request(
+                method,
+                url=url_to_request,
+                headers=headers,
+                params=params,
+                json=json,
+                stream=True,
+            )
+            received_at = time.perf_counter()
+
+            self.rate_limiter.observe(response.status_code, response.headers)
+            retry = self.rate_limiter.should_retry(method, response.status_code, attempt)
+
+            content = b""
+            if not stream or retry or not 300 > response.status_code >= 200:
+                # read the body now so the connection goes back to the pool even on errors
+                content = response.content
+
+            if event is not None:
+                event.attempts = attempt + 1
+                event.status_code = response.status_code
+                event.wait = received_at - sent_at
+                event.download = time.perf_counter() - received_at
+                event.request_bytes = len(response.request.body or b"")
+                event.response_bytes = _received_bytes(response, content)
+
+            if not retry:
+                return response
+
+            delay = self.rate_limiter.retry_delay(attempt, response.headers)
+            self.request_log.warning(
+                f'Retrying request in {delay:.2f}s',
+                extra_log,
+                response.request,
+                http_status_code=response.status_code,
+                attempt=attempt + 1,
+            )
+            time.sleep(delay)
+            attempt += 1
+
+    def __lookup_entity_store(self, url_context: str, extra_log: dict):
+        match = _RECORD_PATH.match(url_context)
+        if match is None or match.group(2) is None:
+            return None
+
+        # webhook payloads do not have the shape returned by the API, e.g. person_id is a bare id
+        record = self.entity_store.get(_ENTITY_OF_PATH[match.group(1)], int(match.group(2)), source=API)
+        if record is None:
+            return None
+
+        event = self.__start_event("GET", url_context)
+        self.request_log.debug('Serving record from entity store', extra_log)
+        if event is not None:
+            event.from_cache = True
+        self.__emit_response(event)
+        return {"success": True, "data": record}
+
+    def __fill_entity_store(self, url_context: str, data):
+        match = _RECORD_PATH.match(url_context)
+        if match is not None and isinstance(data, dict):
+            self.entity_store.fill(_ENTITY_OF_PATH[match.group(1)], data)
+
+    def __record_factory(self, record_class: type):
+        if record_class is None:
+            return None
+
+        # dealFields only names the custom fields of deals, persons and activities keep their hash keys
+        field_lookup = self.deal_field.get_deal_field_by_key if issubclass(record_class, DealRecord) else None
+        return lambda data: record_class(data, field_lookup)
+
+    def __conditional_headers(self, cache_entry):
+        if cache_entry is None or not cache_entry.revalidatable:
+            return None
+
+        headers = {}
+        if cache_entry.etag is not None:
+            headers["If-None-Match"] = cache_entry.etag
+        if cache_entry.last_modified is not None:
+            headers["If-Modified-Since"] = cache_entry.last_modified
+        return headers
 
     def __generate_url_to_request(self, url_context: str):
         url_to_request = f"{self.base_url}{url_context}?api_token={self.token}"
         return url_to_request
 
-    def __parse_response(self, response: requests.Response):
-        return response.json()
+    def __parse_response(self, response: "requests.Response", event: "RequestEvent" = None):
+        if event is None:
+            return response.json()
+
+        started_at = time.perf_counter()
+        result = response.json()
+        event.parse = time.perf_counter() - started_at
+        return result
+
+    def __parse_body(self, body: bytes, event: "RequestEvent" = None):
+        started_at = time.perf_counter()
+        result = json.loads(body)
+        if event is not None:
+            event.parse = time.perf_counter() - started_at
+        return result
+
+    def __start_event(self, method: str, url_context: str):
+        if not self.hooks:
+            return None
+
+        from .instrumentation import RequestEvent
+
+        event = RequestEvent(method, url_context)
+        for hook in self.hooks:
+            self.__call_hook(hook.before_request, event)
+        return event
+
+    def __emit_response(self, event: "RequestEvent"):
+        if event is None:
+            return
+
+        event.finished_at = time.perf_counter()
+        for hook in self.hooks:
+            self.__call_hook(hook.after_response, event)
+
+    def __emit_error(self, event: "RequestEvent", error: Exception):
+        if event is None:
+            return
+
+        event.finished_at = time.perf_counter()
+        for hook in self.hooks:
+            self.__call_hook(hook.on_error, event, error)
+
+    def __call_hook(self, callback, event: "RequestEvent", *args):
+        try:
+            callback(event, *args)
+        except Exception:
+            self.request_log.exception('Request hook failed', endpoint=event.endpoint, http_method=event.method)
 
     def __check_values_of_dict(self, params: dict):
         return {key: value for key, value in params.items() if value is not None}
 
-    def __raise_for_status(self, response: requests.Response):
+    def __raise_for_status(self, response: "requests.Response", extra_log: dict):
         status_code = response.status_code
-        self.extra_log['http_status_code'] = status_code
 
         if 300 > status_code >= 200:
-            self.logger.info('Successful request', extra=self.extra_log)
+            if extra_log is not None:
+                extra_log['http_status_code'] = status_code
+                self.request_log.info('Successful request', extra_log)
             return
 
-        self.logger.error(f'Error when performing request, see extra for details', extra=self.extra_log)
+        self.request_log.error(
+            'Error when performing request, see extra for details',
+            extra_log,
+            response.request,
+            http_status_code=status_code,
+        )
 
         if status_code == 400:
             raise BadRequest()
@@ -132,3 +605,9 @@ class Client:
 
         if status_code >= 500:
             raise InternalServerError()
+
+
+def _received_bytes(response: "requests.Response", content: bytes):
+    # the body size on the wire, before the content coding is decoded
+    tell = getattr(getattr(response, "raw", None), "tell", None)
+    return tell() if tell is not None and content else len(content)
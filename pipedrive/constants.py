@@ -0,0 +1,9 @@
+# kept apart from the modules defining them so that importing pipedrive.client does not load those modules
+
+# sources of the records kept by an EntityStore
+WEBHOOK = "webhook"
+API = "api"
+
+DEFAULT_PAGE_SIZE = 500
+
+DEFAULT_MAX_WORKERS = 8
@@ -0,0 +1,237 @@
+import re
+import time
+
+from .deal_field import FieldSchema, _option_id
+from .exceptions import ValidationError
+
+# a custom field key, optionally followed by the subfield suffix of monetary or address fields
+_CUSTOM_FIELD_KEY = re.compile(r"^([0-9a-f]{40})(_.+)?$")
+
+
+class CustomFieldResolver:
+    """CustomFieldResolver()
+
+    Translates deal custom fields between their API form, 40 character hash keys
+    and option ids, and their human form, field names and option labels. Every
+    lookup is served from the snapshot of the dealFields schema cached by
+    client.deal_field, the same one its key and option lookups use, so it
+    expires with its cache_ttl and invalidate_cache() drops it for both. The
+    snapshot is also downloaded again when a key, name or option missing from
+    it shows up, at most once every min_refresh_interval seconds.
+
+    The *_many methods translate a whole batch with one plan per distinct key,
+    and refresh the snapshot at most once for the batch.
+    """
+
+    def __init__(self, client=None, deal_fields: list = None, min_refresh_interval: float = 10.0) -> None:
+        """
+        Args:
+            client (Client, optional): The client whose deal_field caches the schema. Default is None, the
+                resolver keeps its own snapshot of deal_fields, which is never refreshed.
+            deal_fields (list, optional): The dealFields to build the first snapshot from, e.g. the result
+                of an AsyncClient's deal_field.get_all_deal_fields(). Default is None, downloaded on first use.
+            min_refresh_interval (float, optional): Minimum age in seconds of the snapshot before an
+                unknown key triggers a new download. Default is 10.
+        """
+        if client is None and deal_fields is None:
+            raise ValueError("Either client or deal_fields is required")
+
+        self.client = client
+        self.min_refresh_interval = min_refresh_interval
+        self._schema = None
+        self._refreshes = 0
+        if client is None:
+            self._schema = FieldSchema(deal_fields)
+        elif deal_fields is not None:
+            client.deal_field.refresh(deal_fields)
+
+    @property
+    def schema(self):
+        if self.client is None:
+            return self._schema
+        return self.client.deal_field.schema()
+
+    def refresh(self, deal_fields: list = None):
+        """
+        Replace the snapshot, with deal_fields when given or by downloading the schema.
+        """
+        if self.client is None:
+            self._schema = FieldSchema(deal_fields)
+            self._refreshes += 1
+        else:
+            self.client.deal_field.refresh(deal_fields)
+
+    def to_api(self, fields: dict):
+        """
+        Translate custom fields to the form the API accepts on create and update.
+
+        Args:
+            fields (dict): Values by field name or key. Enum values may be an option label or id, set
+                values a list of them or a comma separated string.
+
+        Returns:
+            dict: The values by field key, with option ids, e.g. to pass as personalized_fields.
+
+        Raises:
+            ValidationError: With every unknown field name or option.
+        """
+        return self.to_api_many([fields])[0]
+
+    def to_api_many(self, payloads):
+        """
+        Translate the custom fields of many payloads, see to_api.
+
+        Returns:
+            list[dict]: The translated payloads, in input order.
+
+        Raises:
+            ValidationError: With every unknown field name or option, prefixed by the index of its payload.
+        """
+        payloads = list(payloads)
+        results, errors = self.__run(self.__to_api_batch, payloads)
+        if errors:
+            if len(payloads) == 1:
+                raise ValidationError([(field, message) for _, field, message in errors])
+            raise ValidationError([(f"[{index}].{field}", message) for index, field, message in errors])
+        return results
+
+    def from_api(self, deal: dict):
+        """
+        Translate the custom fields of a deal as returned by the API.
+
+        Returns:
+            dict: A copy of deal with custom field keys replaced by the field names, enum option ids by
+                their label and set option ids by the list of their labels. A key whose name is shared by
+                another field or key of the deal, or which is still unknown after a refresh, is kept.
+        """
+        return self.from_api_many([deal])[0]
+
+    def from_api_many(self, deals):
+        """
+        Translate the custom fields of many deals, see from_api.
+
+        Returns:
+            list[dict]: The translated deals, in input order.
+        """
+        results, _ = self.__run(self.__from_api_batch, list(deals))
+        return results
+
+    def stats(self):
+        """
+        Returns:
+            dict: Number of snapshots downloaded or given, and the age in seconds of the current one.
+        """
+        if self.client is not None:
+            deal_field = self.client.deal_field
+            return {"refreshes": deal_field.cache_stats()["misses"], "age": deal_field.schema_age()}
+        return {"refreshes": self._refreshes, "age": time.monotonic() - self._schema.loaded_at}
+
+    def __run(self, translate, items: list):
+        schema = self.schema
+        results, unknown = translate(schema, items)
+        if unknown:
+            refreshed = self.__refresh_if_due(schema)
+            if refreshed is not None:
+                results, unknown = translate(refreshed, items)
+        return results, unknown
+
+    def __refresh_if_due(self, seen: FieldSchema):
+        if self.client is None:
+            return None
+        if time.monotonic() - seen.loaded_at < self.min_refresh_interval:
+            # too young to download again, unless another thread already did
+            schema = self.client.deal_field.schema()
+            return schema if schema is not seen else None
+        return self.client.deal_field.refresh(seen=seen)
+
+    def __to_api_batch(self, schema: FieldSchema, payloads: list):
+        results = []
+        errors = []
+        for index, fields in enumerate(payloads):
+            result = {}
+            for name, value in (fields or {}).items():
+                key = name if name in schema.fields_by_key else schema.keys_by_name.get(name)
+                if key is None:
+                    message = "Ambiguous deal field name, use its key." if name in schema.keys_by_name else None
+                    errors.append((index, name, message or "Unknown deal field."))
+                    continue
+                option_ids = schema.option_ids.get(key)
+                if option_ids is None or value is None:
+                    result[key] = value
+                    continue
+                if schema.field_type(key) == "set":
+                    options = value.split(",") if isinstance(value, str) else value
+                    if not isinstance(options, (list, tuple, set)):
+                        options = [options]
+                    ids = [self.__option_id(schema, key, option, errors, index, name) for option in options]
+                    result[key] = ",".join(str(option_id) for option_id in ids if option_id is not None)
+                else:
+                    result[key] = self.__option_id(schema, key, value, errors, index, name)
+            results.append(result)
+        return results, errors
+
+    def __option_id(self, schema: FieldSchema, key: str, option, errors: list, index: int, name: str):
+        if isinstance(option, str):
+            option = option.strip()
+        option_id = _option_id(option)
+        if option_id in schema.labels[key]:
+            return option_id
+        option_id = schema.option_ids[key].get(option)
+        if option_id is None:
+            errors.append((index, name, f"Unknown option {option!r}."))
+        return option_id
+
+    def __from_api_batch(self, schema: FieldSchema, deals: list):
+        keys = set()
+        for deal in deals:
+            keys.update(deal)
+
+        plan = {}
+        unknown = []
+        for key in keys:
+            match = _CUSTOM_FIELD_KEY.match(key)
+            if match is None:
+                continue
+            field = schema.fields_by_key.get(match.group(1))
+            if field is None:
+                unknown.append(key)
+                continue
+            name = field.get("name")
+            if not name or schema.keys_by_name.get(name) is None:
+                continue
+            name += match.group(2) or ""
+            if name in keys:
+                continue
+            labels = schema.labels.get(match.group(1)) if match.group(2) is None else None
+            plan[key] = (name, labels, field.get("field_type") == "set")
+
+        results = []
+        for deal in deals:
+            result = {}
+            for key, value in deal.items():
+                entry = plan.get(key)
+                if entry is None:
+                    result[key] = value
+                    continue
+                name, labels, is_set = entry
+                if labels is not None and value is not None and value != "":
+                    value = _labels_of(labels, value, unknown) if is_set else _label_of(labels, value, unknown)
+                result[name] = value
+            results.append(result)
+        return results, unknown
+
+
+def _label_of(labels: dict, option, unknown: list):
+    label = labels.get(_option_id(option))
+    if label is None:
+        unknown.append(option)
+        return option
+    return label
+
+
+def _labels_of(labels: dict, options, unknown: list):
+    if isinstance(options, str):
+        options = options.split(",")
+    elif not isinstance(options, list):
+        options = [options]
+    return [_label_of(labels, option.strip() if isinstance(option, str) else option, unknown) for option in options]
@@ -1,10 +1,12 @@
-from .util import Util
+from .constants import DEFAULT_MAX_WORKERS, DEFAULT_PAGE_SIZE
+from .models import ActivityRecord, DealRecord
+from .util import SHARED_UTIL
 
 
 class Deal:
     def __init__(self, client) -> None:
         self.client = client
-        self._util = Util()
+        self._util = SHARED_UTIL
 
     def create_deal(
         self,
@@ -46,6 +48,9 @@ class Deal:
         Returns:
             The created deal object.
 
+        Raises:
+            ValidationError: If any field is invalid and the client validates payloads.
+
         """
         url = "/deals"
 
@@ -68,6 +73,9 @@ class Deal:
 
         payload.update(personalized_fields)
 
+        if self.client.validate_payloads:
+            self._util.validate_payload("deal", payload)
+
         result = self.client.post(url_context=url, body=payload)
 
         return result
@@ -109,20 +117,52 @@ class Deal:
             "add_time": add_time,
         }
 
-        for key, value in payload:
-            if value is None:
-                del payload[key]
+        if self.client.validate_payloads:
+            self._util.validate_payload("deal", payload, partial=True)
 
-        result = self.client.put(url_context=url_context,  body=payload)
+        result = self.client.put(url_context=url_context, body=payload)
 
         return result
 
-    def get_deal_by_id(self, deal_id: int):
+    def bulk_create(self, payloads, max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None):
+        """
+        Creates many deals concurrently. A failing item does not abort the others.
+
+        Args:
+            payloads (Iterable[dict]): Keyword arguments of create_deal for each deal.
+            max_workers (int, optional): Number of concurrent requests. Default is 8.
+            on_progress (callable, optional): Called as on_progress(completed, failed, total) after each item.
+
+        Returns:
+            list[BulkItemResult]: One result per payload, in input order, holding either the created deal or the error.
+
+        """
+        return self.client.run_bulk(self.create_deal, payloads, max_workers=max_workers, on_progress=on_progress)
+
+    def bulk_update(self, payloads, max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None):
+        """
+        Updates many deals concurrently. A failing item does not abort the others.
+
+        Args:
+            payloads (Iterable[dict]): Keyword arguments of update_deal for each deal, including deal_id.
+            max_workers (int, optional): Number of concurrent requests. Default is 8.
+            on_progress (callable, optional): Called as on_progress(completed, failed, total) after each item.
+
+        Returns:
+            list[BulkItemResult]: One result per payload, in input order, holding either the updated deal or the error.
+
+        """
+        return self.client.run_bulk(self.update_deal, payloads, max_workers=max_workers, on_progress=on_progress)
+
+    def get_deal_by_id(self, deal_id: int, model: bool = False, return_fields=None):
         """
         Retrieve a deal by its ID.
 
         Args:
             deal_id (int): The ID of the deal to retrieve.
+            model (bool, optional): Return a compact DealRecord instead of a dictionary. Default is False.
+            return_fields (Iterable[str], optional): Only return these fields of the deal,
+                e.g. ("id", "stage_id", "value"). Default is None, every field.
 
         Returns:
             dict: The deal information as a dictionary.
@@ -133,7 +173,33 @@ class Deal:
         """
         url_context = f"/deals/{deal_id}"
 
-        return self.client.get(url_context)
+        return self.client.get(url_context, record_class=DealRecord if model else None, fields=return_fields)
+
+    def get_deals_by_ids(
+        self, deal_ids, max_workers: int = DEFAULT_MAX_WORKERS, model: bool = False, return_fields=None
+    ):
+        """
+        Retrieve many deals by their IDs concurrently. Each distinct ID is requested once.
+
+        Args:
+            deal_ids (Iterable[int]): The IDs of the deals to retrieve. Duplicates are allowed.
+            max_workers (int, optional): Number of concurrent requests. Default is 8.
+            model (bool, optional): Return compact DealRecord objects instead of dictionaries. Default is False.
+            return_fields (Iterable[str], optional): Only return these fields of each deal,
+                e.g. ("id", "stage_id", "value"). Default is None, every field.
+
+        Returns:
+            list: The deals in the order of deal_ids, with None for deals that do not exist.
+
+        """
+        return self.client.fetch_by_ids(
+            self.get_deal_by_id,
+            "deal_id",
+            deal_ids,
+            max_workers=max_workers,
+            model=model,
+            return_fields=return_fields,
+        )
 
     def search_deals(
         self,
@@ -145,6 +211,7 @@ class Deal:
         include_fields: str = None,
         start: int = None,
         limit: int = None,
+        return_fields=None,
     ):
         """
         Performs a search for deals based on the provided parameters.
@@ -158,6 +225,8 @@ class Deal:
             include_fields (str, optional): The fields to be included in the search response. Default is None.
             start (int, optional): The starting index for paginating the results. Default is None.
             limit (int, optional): The maximum number of results to be returned. Default is None.
+            return_fields (Iterable[str], optional): Only return these fields of each deal found,
+                e.g. ("id", "stage_id", "value"). Default is None, every field.
 
         Returns:
             The search result.
@@ -176,13 +245,107 @@ class Deal:
             "limit": limit,
         }
 
-        result = self.client.get(url_context=url, params=params)
+        result = self.client.get(url_context=url, params=params, fields=return_fields)
 
         return result
 
-    def get_activities_associated_with_deal(self, deal_id):
+    def iter_search(
+        self,
+        term: str,
+        exact_match: bool = True,
+        person_id: int = None,
+        organization_id: int = None,
+        status: str = None,
+        include_fields: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = False,
+        return_fields=None,
+    ):
+        """
+        Lazily iterates over every deal matching the search, page by page.
+
+        Args:
+            term (str): The search term to filter the deals.
+            exact_match (bool, optional): Indicates whether the search should be an exact match. Default is True.
+            person_id (int, optional): The ID of the person associated with the deals to be searched. Default is None.
+            organization_id (int, optional): The ID of the organization associated with the deals to be searched. Default is None.
+            status (str, optional): The status of the deals to be searched. Default is None.
+            include_fields (str, optional): The fields to be included in the search response. Default is None.
+            page_size (int, optional): The number of results fetched per request. Default is 500.
+            prefetch (bool, optional): Fetch the next page in the background. Default is False.
+            return_fields (Iterable[str], optional): Only return these fields of each deal found,
+                e.g. ("id", "stage_id", "value"). Default is None, every field.
+
+        Yields:
+            dict: Each search result item.
+
+        """
+        url = "/deals/search"
+
+        params = {
+            "term": term,
+            "exact_match": exact_match,
+            "person_id": person_id,
+            "organization_id": organization_id,
+            "status": status,
+            "include_fields": include_fields,
+        }
+
+        return self.client.iter_records(url, params, page_size=page_size, prefetch=prefetch, fields=return_fields)
+
+    def iter_all(
+        self,
+        user_id: int = None,
+        filter_id: int = None,
+        stage_id: int = None,
+        status: str = None,
+        sort: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = False,
+        model: bool = False,
+        return_fields=None,
+    ):
+        """
+        Lazily iterates over every deal of the account, page by page.
+
+        Args:
+            user_id (int, optional): Only deals owned by this user. Default is None.
+            filter_id (int, optional): The ID of the filter to use. Default is None.
+            stage_id (int, optional): Only deals in this stage. Default is None.
+            status (str, optional): Only deals with this status. Default is None.
+            sort (str, optional): The field names and sorting mode, e.g. "update_time DESC". Default is None.
+            page_size (int, optional): The number of deals fetched per request. Default is 500.
+            prefetch (bool, optional): Fetch the next page in the background. Default is False.
+            model (bool, optional): Yield compact DealRecord objects instead of dictionaries. Default is False.
+            return_fields (Iterable[str], optional): Only return these fields of each deal,
+                e.g. ("id", "stage_id", "value"). Default is None, every field.
+
+        Yields:
+            dict: Each deal.
+
+        """
+        url = "/deals"
+
+        params = {
+            "user_id": user_id,
+            "filter_id": filter_id,
+            "stage_id": stage_id,
+            "status": status,
+            "sort": sort,
+        }
+
+        return self.client.iter_records(
+            url,
+            params,
+            page_size=page_size,
+            prefetch=prefetch,
+            record_class=DealRecord if model else None,
+            fields=return_fields,
+        )
+
+    def get_activities_associated_with_deal(self, deal_id, model: bool = False, stream: bool = False):
         url = f'/deals/{deal_id}/activities'
 
-        result = self.client.get(url_context=url)
+        result = self.client.get(url_context=url, record_class=ActivityRecord if model else None, stream=stream)
 
         return result
@@ -1,10 +1,55 @@
-from .util import Util
+import threading
+import time
+
+from .util import SHARED_UTIL
+
+
+class FieldSchema:
+    """FieldSchema()
+
+    Lookup tables built once from a snapshot of the dealFields schema: fields by
+    key, keys by name, and option labels and ids of enum and set fields.
+    """
+
+    def __init__(self, deal_fields: list) -> None:
+        self.fields_by_key = {}
+        # None marks a name shared by several fields, which only their keys can tell apart
+        self.keys_by_name = {}
+        self.labels = {}
+        self.option_ids = {}
+        for deal_field in deal_fields or []:
+            key = deal_field.get("key")
+            if not key:
+                continue
+            self.fields_by_key[key] = deal_field
+            name = deal_field.get("name")
+            if name:
+                self.keys_by_name[name] = key if self.keys_by_name.get(name, key) == key else None
+            options = deal_field.get("options") or []
+            if options:
+                self.labels[key] = {_option_id(option.get("id")): option.get("label") for option in options}
+                self.option_ids[key] = {option.get("label"): _option_id(option.get("id")) for option in options}
+        self.loaded_at = time.monotonic()
+
+    def field_type(self, key: str):
+        return (self.fields_by_key.get(key) or {}).get("field_type")
 
 
 class DealField:
-    def __init__(self, client) -> None:
+    def __init__(self, client, cache_ttl: float = 300) -> None:
+        """
+        Args:
+            client (Client): The client used to perform the requests.
+            cache_ttl (float, optional): Seconds the dealFields schema used by the key and option
+                lookups is kept before being downloaded again. Default is 300.
+        """
         self.client = client
-        self._util = Util()
+        self._util = SHARED_UTIL
+        self.cache_ttl = cache_ttl
+        self._schema = None
+        self._cache_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._cache_stats = {"hits": 0, "misses": 0}
 
     def get_deal_field_by_id(self, deal_field_id: int):
         """
@@ -20,27 +65,122 @@ class DealField:
             Exception: If there is an error while retrieving the deal.
 
         """
-        url_context = f"/dealsFields/{deal_field_id}"
+        url_context = f"/dealFields/{deal_field_id}"
 
         return self.client.get(url_context)
 
     def get_all_deal_fields(self):
-        url_context = f"/dealFields"
+        """
+        Retrieve every dealField, following the pagination of the endpoint.
 
-        return self.client.get(url_context)
+        Returns:
+            list[dict]: The dealFields.
+
+        """
+        return list(self.client.iter_records("/dealFields"))
 
     def get_deal_field_by_key(self, deal_field_key: str):
-        all_deal_fields = self.get_all_deal_fields()
+        """
+        Retrieve a dealField by its key, using the cached schema.
+
+        Args:
+            deal_field_key (str): The key of the dealField, e.g. a 40 character custom field hash.
 
-        for deal_field in all_deal_fields:
-            if deal_field.get("key") == deal_field_key:
-                return deal_field
+        Returns:
+            dict: The dealField information as a dictionary, or None if there is no such field.
+
+        """
+        return self.schema().fields_by_key.get(deal_field_key)
 
     def get_label_of_deal_field_option(self, field_key: str, option_id: int):
-        deal_field = self.get_deal_field_by_key(field_key)
+        """
+        Retrieve the label of an option of an enum or set dealField, using the cached schema.
+
+        Args:
+            field_key (str): The key of the dealField.
+            option_id (int): The ID of the option.
+
+        Returns:
+            str: The label of the option, or None if there is no such option.
+
+        """
+        return (self.schema().labels.get(field_key) or {}).get(_option_id(option_id))
+
+    def schema(self):
+        """
+        Returns:
+            FieldSchema: The cached snapshot of the dealFields schema, downloaded when there is none or it
+                is older than cache_ttl. CustomFieldResolver and the key and option lookups share it.
+        """
+        schema = self._cached_schema()
+        if schema is not None:
+            return schema
+
+        with self._load_lock:
+            # another thread may have refreshed the schema while we waited
+            return self._cached_schema() or self._store_schema(self.get_all_deal_fields())
+
+    def refresh(self, deal_fields: list = None, seen: FieldSchema = None):
+        """
+        Replace the cached schema, with deal_fields when given or by downloading it.
+
+        Args:
+            deal_fields (list, optional): The dealFields to build the snapshot from. Default is None, downloaded.
+            seen (FieldSchema, optional): The snapshot found out of date. When the cached one was replaced
+                since, it is kept instead of downloading the schema again. Default is None.
+
+        Returns:
+            FieldSchema: The cached snapshot.
+        """
+        if deal_fields is not None:
+            return self._store_schema(deal_fields)
+
+        with self._load_lock:
+            schema = self._schema
+            if seen is not None and schema is not None and schema is not seen:
+                return schema
+            return self._store_schema(self.get_all_deal_fields())
+
+    def invalidate_cache(self):
+        """
+        Drop the cached schema so the next lookup downloads it again.
+        """
+        with self._cache_lock:
+            self._schema = None
+
+    def cache_stats(self):
+        """
+        Returns:
+            dict: Number of lookups served from the cached schema (hits) and of schema downloads (misses).
+        """
+        with self._cache_lock:
+            return dict(self._cache_stats)
+
+    def schema_age(self):
+        """
+        Returns:
+            float: Seconds since the cached schema was downloaded or given, or None if there is none.
+        """
+        schema = self._schema
+        return time.monotonic() - schema.loaded_at if schema is not None else None
+
+    def _cached_schema(self):
+        with self._cache_lock:
+            schema = self._schema
+            if schema is not None and time.monotonic() - schema.loaded_at < self.cache_ttl:
+                self._cache_stats["hits"] += 1
+                return schema
+
+    def _store_schema(self, all_deal_fields: list):
+        schema = FieldSchema(all_deal_fields)
+        with self._cache_lock:
+            self._cache_stats["misses"] += 1
+            self._schema = schema
+            return schema
 
-        options = deal_field.get("options")
 
-        for option in options:
-            if option.get("id") == option_id:
-                return option.get("label")
+def _option_id(option_id):
+    # deals return option ids as strings, the schema as integers
+    if isinstance(option_id, str) and option_id.isdigit():
+        return int(option_id)
+    return option_id
@@ -54,3 +54,15 @@ class InternalServerError(HTTPException):
     """
 
     pass
+
+
+class ValidationError(ValueError):
+    """ValidationError()
+
+    Exception raised when a payload fails validation before being sent. errors
+    holds every (field, message) problem found, not only the first one.
+    """
+
+    def __init__(self, errors: list) -> None:
+        self.errors = errors
+        super().__init__("; ".join(f"{field}: {message}" if field else message for field, message in errors))
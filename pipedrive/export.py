@@ -0,0 +1,463 @@
+import csv
+import json
+import os
+import re
+
+from .constants import DEFAULT_PAGE_SIZE
+
+DEFAULT_ROW_GROUP_SIZE = 10000
+
+ENTITIES = {"deal": "/deals", "person": "/persons", "activity": "/activities"}
+
+_CUSTOM_FIELD_COLUMN = re.compile(r"^([0-9a-f]{40})(_.+)?$")
+_FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".csv": "csv"}
+_ARROW_TYPES = ("int", "float", "bool", "string")
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+# money columns hold whole amounts on many accounts, so inferring them from the first row group would make them int
+_DEFAULT_COLUMN_TYPES = {"deal": {"value": "float", "weighted_value": "float"}}
+# type of the deal custom field columns per DealField field_type, the other field types are strings
+_CUSTOM_FIELD_TYPES = {"double": "float", "monetary": "float", "int": "int", "user": "int", "org": "int", "people": "int"}
+
+
+def flatten_record(record: dict):
+    """
+    Flatten one API record into a single level of scalar columns.
+
+    Related objects such as person_id or org_id become their id under the
+    original key, plus one key_<attribute> column per scalar attribute, e.g.
+    person_id_name. Lists of {"value": ...} objects, like emails and phones,
+    become their primary value. Any other list or object is JSON-encoded.
+
+    Returns:
+        dict: The flat row.
+
+    """
+    row = {}
+    for key, value in record.items():
+        if type(value) in _SCALAR_TYPES:
+            row[key] = value
+        elif isinstance(value, dict):
+            if "value" in value:
+                row[key] = _scalar(value["value"])
+            for attribute, attribute_value in value.items():
+                if attribute != "value":
+                    row[f"{key}_{attribute}"] = _scalar(attribute_value)
+        else:
+            row[key] = _scalar(value)
+    return row
+
+
+def export_records(
+    client,
+    entity: str,
+    path: str,
+    format: str = None,
+    params: dict = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    columns: list = None,
+    column_types: dict = None,
+    resolve_custom_fields: bool = True,
+    records=None,
+):
+    """
+    Stream every deal, person or activity into a Parquet, Arrow IPC or CSV file.
+
+    Records are flattened as they arrive and accumulated column by column. Every
+    row_group_size rows the batch is written out as one row group and dropped,
+    so memory stays bounded by one row group whatever the size of the export.
+
+    Deal custom field columns are typed after the field_type of their DealField,
+    e.g. double and monetary fields are floats. The value and weighted_value
+    columns of deals are always floats. Other column types are inferred from
+    the first row group holding the column. A column first seen in a later row
+    group is added to the file, and an inferred int column that later holds a
+    fraction, like 99.5, becomes float. Either change copies the row groups
+    already written into a file with the new schema, one row group at a time.
+
+    Args:
+        client (Client): The client used to perform the requests.
+        entity (str): One of "deal", "person" or "activity".
+        path (str): The file to write.
+        format (str, optional): "parquet", "arrow" or "csv". Default is None, guessed from the
+            extension of path, falling back to CSV.
+        params (dict, optional): Filters of the list endpoint, e.g. {"status": "open"}. Default is None.
+        row_group_size (int, optional): Rows per row group. Default is 10000.
+        page_size (int, optional): Items fetched per request. Default is 500.
+        columns (list[str], optional): The columns to export, in order, named as in the output, e.g. after
+            the custom field they hold. Default is None, every column.
+        column_types (dict, optional): Arrow type per column, one of "int", "float", "bool" or "string".
+            Default is None, inferred, except for the money and custom field columns of deals.
+        resolve_custom_fields (bool, optional): Name deal custom field columns after the field
+            instead of its hash key. Default is True.
+        records (Iterable[dict], optional): The records to export instead of listing them with client,
+            e.g. ShardedRunner(token, entity).run() to fetch them with several processes. Default is None.
+
+    Returns:
+        dict: The path, format, exported columns and the number of rows and row groups written.
+
+    Raises:
+        ImportError: If the format is parquet or arrow and pyarrow is not installed.
+        ValueError: If a value does not fit the type of its column, e.g. a fraction in a column given as
+            "int" or a string in a float column.
+
+    """
+    if entity not in ENTITIES:
+        raise ValueError(f"Invalid entity {entity!r}. Allowed values are: {', '.join(ENTITIES)}.")
+
+    format = format or _FORMATS.get(path[path.rfind(".") :].lower(), "csv")
+    if format not in ("parquet", "arrow", "csv"):
+        raise ValueError(f"Invalid format {format!r}. Allowed values are: parquet, arrow, csv.")
+
+    rename = _CustomFieldNames(client) if resolve_custom_fields and entity == "deal" else None
+    if records is None:
+        records = client.iter_records(ENTITIES[entity], params, page_size=page_size, prefetch=True)
+    column_types = {**_DEFAULT_COLUMN_TYPES.get(entity, {}), **(column_types or {})}
+    writer = _ArrowWriter(path, format, column_types) if format != "csv" else _CsvWriter(path)
+
+    rows = 0
+    typed = set() if client is not None and entity == "deal" else None
+    try:
+        for batch, size in _column_batches(records, row_group_size):
+            custom_types = _custom_field_types(client, batch, typed) if typed is not None else {}
+            if rename is not None:
+                batch = rename(batch)
+            for column, arrow_type in custom_types.items():
+                column_types.setdefault(rename.name_of(column) if rename is not None else column, arrow_type)
+            if columns is not None:
+                batch = {column: batch.get(column) or [None] * size for column in columns}
+            writer.write(batch)
+            rows += size
+    finally:
+        writer.close()
+
+    return {
+        "path": path,
+        "format": format,
+        "columns": writer.columns or [],
+        "rows": rows,
+        "row_groups": writer.row_groups,
+    }
+
+
+def export_deals(client, path: str, **options):
+    """
+    Export every deal. See export_records for the options.
+    """
+    return export_records(client, "deal", path, **options)
+
+
+def export_persons(client, path: str, **options):
+    """
+    Export every person. See export_records for the options.
+    """
+    return export_records(client, "person", path, **options)
+
+
+def export_activities(client, path: str, **options):
+    """
+    Export every activity. See export_records for the options.
+    """
+    return export_records(client, "activity", path, **options)
+
+
+def _column_batches(records, row_group_size: int):
+    # keys missing from the columns of the first row group are appended to the columns of the batch
+    columns = None
+    batch = None
+    size = 0
+    for record in records:
+        row = flatten_record(record)
+
+        if columns is None:
+            # the first row group decides the columns, so keep every key seen until it is complete
+            if batch is None:
+                batch = {}
+            for key in row:
+                if key not in batch:
+                    batch[key] = [None] * size
+        else:
+            if batch is None:
+                batch = {key: [] for key in columns}
+            if not row.keys() <= batch.keys():
+                for key in row:
+                    if key not in batch:
+                        batch[key] = [None] * size
+        for key, values in batch.items():
+            values.append(row.get(key))
+
+        size += 1
+        if size == row_group_size:
+            yield batch, size
+            columns = list(batch)
+            batch = None
+            size = 0
+
+    if size:
+        yield batch, size
+
+
+def _custom_field_types(client, batch: dict, typed: set):
+    # the type of the custom field columns not seen in the previous batches, keyed by hash key
+    types = {}
+    for column in batch:
+        if column in typed:
+            continue
+        typed.add(column)
+        match = _CUSTOM_FIELD_COLUMN.match(column)
+        # key_<attribute> columns of user, org and people fields are not the field value
+        if match is None or match.group(2):
+            continue
+        field = client.deal_field.get_deal_field_by_key(match.group(1))
+        if field:
+            types[column] = _CUSTOM_FIELD_TYPES.get(field.get("field_type"), "string")
+    return types
+
+
+class _CustomFieldNames:
+    """
+    Renames the custom field columns of a batch after the deal field names,
+    keeping the hash key when the name is taken by another column.
+    """
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self.names = {}
+        self.taken = set()
+
+    def __call__(self, batch: dict):
+        new = [column for column in batch if column not in self.taken]
+        if new:
+            # columns of the first batch, then the ones first seen later
+            self.taken.update(new)
+            for column in new:
+                name = self.__field_name(column)
+                if name != column and name not in self.taken:
+                    self.names[column] = name
+                    self.taken.add(name)
+        return {self.names.get(column, column): values for column, values in batch.items()}
+
+    def name_of(self, column: str):
+        return self.names.get(column, column)
+
+    def __field_name(self, column: str):
+        match = _CUSTOM_FIELD_COLUMN.match(column)
+        if match:
+            field = self.client.deal_field.get_deal_field_by_key(match.group(1))
+            if field and field.get("name"):
+                return field["name"] + (match.group(2) or "")
+        return column
+
+
+def _scalar(value):
+    if isinstance(value, list):
+        if value and all(isinstance(item, dict) and "value" in item for item in value):
+            primary = next((item for item in value if item.get("primary")), value[0])
+            return _scalar(primary["value"])
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return value
+
+
+class _CsvWriter:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.columns = None
+        self.row_groups = 0
+
+    def write(self, batch: dict):
+        if self.columns is None:
+            self.columns = list(batch)
+            self.writer.writerow(self.columns)
+        elif len(batch) > len(self.columns):
+            self.__add_columns(list(batch))
+        self.writer.writerows(zip(*batch.values()))
+        self.row_groups += 1
+
+    def close(self):
+        self.file.close()
+
+    def __add_columns(self, columns: list):
+        # the header is the first line, so the rows already written are copied under the new one
+        self.file.close()
+        previous = f"{self.path}.previous"
+        os.replace(self.path, previous)
+        self.file = open(self.path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        padding = [""] * (len(columns) - len(self.columns))
+        with open(previous, newline="", encoding="utf-8") as file:
+            rows = csv.reader(file)
+            next(rows)
+            self.writer.writerow(columns)
+            self.writer.writerows(row + padding for row in rows)
+        os.remove(previous)
+        self.columns = columns
+
+
+class _ArrowWriter:
+    def __init__(self, path: str, format: str, column_types: dict = None) -> None:
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError(
+                f"Exporting to {format} requires pyarrow, install it with: pip install pipedrive-wrapper[export]"
+            ) from None
+
+        self.pa = pyarrow
+        self.path = path
+        self.format = format
+        self.column_types = column_types if column_types is not None else {}
+        self.columns = None
+        self.schema = None
+        self.writer = None
+        self.row_groups = 0
+
+    def write(self, batch: dict):
+        if self.schema is None:
+            self.columns = list(batch)
+            self.schema = self.pa.schema(
+                [(column, self.__arrow_type(column, values)) for column, values in batch.items()]
+            )
+            self.writer = self.__open()
+        else:
+            schema = self.__evolve(batch)
+            if schema is not None:
+                self.__rewrite(schema)
+
+        arrays = []
+        for field in self.schema:
+            values = batch[field.name]
+            if field.type == self.pa.string():
+                values = [value if value is None or isinstance(value, str) else str(value) for value in values]
+            elif field.type == self.pa.int64():
+                values = _whole_numbers(field.name, values)
+            try:
+                arrays.append(self.pa.array(values, type=field.type))
+            except (self.pa.ArrowInvalid, self.pa.ArrowTypeError, OverflowError) as error:
+                raise ValueError(
+                    f"Column {field.name!r} does not fit its {field.type} type, "
+                    f"pass column_types={{{field.name!r}: ...}}: {error}"
+                ) from error
+
+        self.__write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+        self.row_groups += 1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    def __open(self):
+        if self.format == "parquet":
+            import pyarrow.parquet
+
+            return pyarrow.parquet.ParquetWriter(self.path, self.schema)
+        return self.pa.ipc.new_file(self.path, self.schema)
+
+    def __write_table(self, table):
+        if self.format == "parquet":
+            self.writer.write_table(table, row_group_size=table.num_rows)
+        else:
+            self.writer.write_table(table)
+
+    def __evolve(self, batch: dict):
+        # the schema with the new columns of the batch, and inferred int columns holding fractions made float
+        fields = []
+        changed = False
+        for field in self.schema:
+            if (
+                field.type == self.pa.int64()
+                and field.name not in self.column_types
+                and _fraction(batch[field.name]) is not None
+            ):
+                field = field.with_type(self.pa.float64())
+                changed = True
+            fields.append(field)
+
+        known = set(self.columns)
+        for column, values in batch.items():
+            if column not in known:
+                fields.append(self.pa.field(column, self.__arrow_type(column, values)))
+                changed = True
+
+        return self.pa.schema(fields) if changed else None
+
+    def __rewrite(self, schema):
+        # the schema of a file is fixed once it is opened, so the row groups already written are copied into
+        # a new file, one at a time, with the new columns null
+        self.writer.close()
+        previous = f"{self.path}.previous"
+        os.replace(self.path, previous)
+        self.schema = schema
+        self.columns = schema.names
+        self.writer = self.__open()
+        for table in self.__read_row_groups(previous):
+            arrays = [
+                table.column(field.name).cast(field.type)
+                if field.name in table.column_names
+                else self.pa.nulls(table.num_rows, field.type)
+                for field in schema
+            ]
+            self.__write_table(self.pa.Table.from_arrays(arrays, schema=schema))
+        os.remove(previous)
+
+    def __read_row_groups(self, path: str):
+        with open(path, "rb") as source:
+            if self.format == "parquet":
+                import pyarrow.parquet
+
+                file = pyarrow.parquet.ParquetFile(source)
+                for index in range(file.num_row_groups):
+                    yield file.read_row_group(index)
+            else:
+                reader = self.pa.ipc.open_file(source)
+                for index in range(reader.num_record_batches):
+                    yield self.pa.Table.from_batches([reader.get_batch(index)])
+
+    def __arrow_type(self, column: str, values: list):
+        name = self.column_types.get(column)
+        if name is None:
+            name = _infer_type(values)
+        elif name not in _ARROW_TYPES:
+            raise ValueError(
+                f"Invalid type {name!r} for column {column!r}. Allowed values are: {', '.join(_ARROW_TYPES)}."
+            )
+        return {
+            "int": self.pa.int64(),
+            "float": self.pa.float64(),
+            "bool": self.pa.bool_(),
+            "string": self.pa.string(),
+        }[name]
+
+
+def _whole_numbers(column: str, values: list):
+    # pyarrow silently truncates floats put in an int64 array
+    if float not in set(map(type, values)):
+        return values
+    fraction = _fraction(values)
+    if fraction is not None:
+        raise ValueError(
+            f"Column {column!r} holds {fraction!r}, which does not fit its int64 type, "
+            f"pass column_types={{{column!r}: 'float'}}"
+        )
+    return [int(value) if isinstance(value, float) else value for value in values]
+
+
+def _fraction(values: list):
+    return next((value for value in values if isinstance(value, float) and not value.is_integer()), None)
+
+
+def _infer_type(values: list):
+    seen = set()
+    for value in values:
+        if value is not None:
+            seen.add(type(value))
+    if seen == {bool}:
+        return "bool"
+    if seen == {int}:
+        return "int"
+    if seen and seen <= {int, float}:
+        return "float"
+    return "string"
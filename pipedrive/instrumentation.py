@@ -0,0 +1,248 @@
+import bisect
+import re
+import threading
+import time
+
+_ID_SEGMENT = re.compile(r"/(\d+|[0-9a-f]{40})(?=/|$)")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def normalize_endpoint(url_context: str):
+    """
+    Collapse ids and custom field hashes in a path so that metrics are grouped
+    per endpoint, e.g. "/deals/42/activities" becomes "/deals/{id}/activities".
+    """
+    return _ID_SEGMENT.sub("/{id}", url_context)
+
+
+class RequestEvent:
+    """RequestEvent()
+
+    Timings and sizes of one Client request, handed to every RequestHook.
+
+    Phases, in seconds:
+        wait: from sending the request until the response headers arrive. This
+            includes opening a connection when none is free in the pool, which
+            requests does not report separately.
+        download: reading the response body.
+        parse: decoding the JSON body.
+
+    Sizes, in bytes:
+        request_bytes: the request body.
+        response_bytes: the response body as received, still compressed when
+            the server applied a content coding.
+    """
+
+    __slots__ = (
+        "method",
+        "url_context",
+        "endpoint",
+        "started_at",
+        "finished_at",
+        "attempts",
+        "status_code",
+        "request_bytes",
+        "response_bytes",
+        "wait",
+        "download",
+        "parse",
+        "from_cache",
+    )
+
+    def __init__(self, method: str, url_context: str) -> None:
+        self.method = method
+        self.url_context = url_context
+        self.endpoint = normalize_endpoint(url_context)
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+        self.attempts = 0
+        self.status_code = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.wait = 0.0
+        self.download = 0.0
+        self.parse = 0.0
+        self.from_cache = False
+
+    @property
+    def total(self):
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    def as_dict(self):
+        result = {name: getattr(self, name) for name in self.__slots__}
+        result["total"] = self.total
+        return result
+
+
+class RequestHook:
+    """RequestHook()
+
+    Base class for request middlewares registered with Client(hooks=[...]) or
+    Client.add_hook(). Every method is a no-op by default.
+    """
+
+    def before_request(self, event: RequestEvent):
+        pass
+
+    def after_response(self, event: RequestEvent):
+        pass
+
+    def on_error(self, event: RequestEvent, error: Exception):
+        pass
+
+
+class _EndpointStats:
+    __slots__ = ("buckets", "count", "errors", "cached", "total", "wait", "download", "parse", "sent", "received")
+
+    def __init__(self, bucket_count: int) -> None:
+        self.buckets = [0] * (bucket_count + 1)
+        self.count = 0
+        self.errors = 0
+        self.cached = 0
+        self.total = 0.0
+        self.wait = 0.0
+        self.download = 0.0
+        self.parse = 0.0
+        self.sent = 0
+        self.received = 0
+
+
+class MetricsAggregator(RequestHook):
+    """MetricsAggregator()
+
+    In-process hook keeping a latency histogram and counters per method and
+    endpoint. Read it with snapshot() or expose it to Prometheus with
+    to_prometheus().
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS) -> None:
+        self.bucket_bounds = tuple(sorted(buckets))
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def after_response(self, event: RequestEvent):
+        with self._lock:
+            stats = self.__stats_for(event)
+            if event.from_cache:
+                stats.cached += 1
+                return
+            self.__record(stats, event)
+
+    def on_error(self, event: RequestEvent, error: Exception):
+        with self._lock:
+            stats = self.__stats_for(event)
+            stats.errors += 1
+            self.__record(stats, event)
+
+    def percentile(self, method: str, endpoint: str, quantile: float):
+        """
+        Estimate a latency percentile from the histogram.
+
+        Args:
+            method (str): The HTTP method, e.g. "GET".
+            endpoint (str): The normalized endpoint, e.g. "/deals/{id}".
+            quantile (float): Between 0 and 1, e.g. 0.99.
+
+        Returns:
+            float: The upper bound of the bucket holding the percentile, or None without data.
+
+        """
+        with self._lock:
+            stats = self._stats.get((method, endpoint))
+            if stats is None or not stats.count:
+                return None
+            rank = quantile * stats.count
+            seen = 0
+            for index, count in enumerate(stats.buckets):
+                seen += count
+                if seen >= rank:
+                    return self.bucket_bounds[index] if index < len(self.bucket_bounds) else float("inf")
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Per "METHOD endpoint" counters, summed phase timings, byte counts and
+                cumulative histogram buckets.
+        """
+        with self._lock:
+            result = {}
+            for (method, endpoint), stats in self._stats.items():
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(self.bucket_bounds + (float("inf"),), stats.buckets):
+                    cumulative += count
+                    buckets[bound] = cumulative
+                result[f"{method} {endpoint}"] = {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "cached": stats.cached,
+                    "seconds": {
+                        "total": stats.total,
+                        "wait": stats.wait,
+                        "download": stats.download,
+                        "parse": stats.parse,
+                    },
+                    "bytes": {"sent": stats.sent, "received": stats.received},
+                    "buckets": buckets,
+                }
+            return result
+
+    def to_prometheus(self, prefix: str = "pipedrive_client"):
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        families = {
+            "request_duration_seconds": ("histogram", []),
+            "phase_seconds_total": ("counter", []),
+            "request_errors_total": ("counter", []),
+            "cache_hits_total": ("counter", []),
+            "bytes_total": ("counter", []),
+        }
+
+        for key, stats in self.snapshot().items():
+            method, endpoint = key.split(" ", 1)
+            labels = f'method="{method}",endpoint="{endpoint}"'
+
+            samples = families["request_duration_seconds"][1]
+            for bound, count in stats["buckets"].items():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                samples.append(f'_bucket{{{labels},le="{le}"}} {count}')
+            samples.append(f"_sum{{{labels}}} {stats['seconds']['total']}")
+            samples.append(f"_count{{{labels}}} {stats['count']}")
+
+            for phase in ("wait", "download", "parse"):
+                families["phase_seconds_total"][1].append(f'{{{labels},phase="{phase}"}} {stats["seconds"][phase]}')
+            families["request_errors_total"][1].append(f"{{{labels}}} {stats['errors']}")
+            families["cache_hits_total"][1].append(f"{{{labels}}} {stats['cached']}")
+            for direction, count in stats["bytes"].items():
+                families["bytes_total"][1].append(f'{{{labels},direction="{direction}"}} {count}')
+
+        lines = []
+        for name, (metric_type, samples) in families.items():
+            lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+            lines.extend(f"{prefix}_{name}{sample}" for sample in samples)
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def __stats_for(self, event: RequestEvent):
+        key = (event.method, event.endpoint)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _EndpointStats(len(self.bucket_bounds))
+        return stats
+
+    def __record(self, stats: _EndpointStats, event: RequestEvent):
+        total = event.total
+        stats.buckets[bisect.bisect_left(self.bucket_bounds, total)] += 1
+        stats.count += 1
+        stats.total += total
+        stats.wait += event.wait
+        stats.download += event.download
+        stats.parse += event.parse
+        stats.sent += event.request_bytes
+        stats.received += event.response_bytes
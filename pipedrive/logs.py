@@ -0,0 +1,128 @@
+import itertools
+import logging
+import queue
+from logging import Logger
+from logging.handlers import QueueHandler, QueueListener
+
+
+class RequestLogger:
+    """RequestLogger()
+
+    Emits the request logs of Client and AsyncClient. The extra dict of a
+    request is only built when its records will be emitted. Successful requests
+    can be sampled, one in every sample_rate, while retries and errors are
+    always logged.
+    """
+
+    def __init__(self, logger: Logger = logging, sample_rate: int = 1) -> None:
+        """
+        Args:
+            logger (Logger, optional): Where records go. Default is the logging module, i.e. the root logger.
+            sample_rate (int, optional): Log the info and debug records of one request in every sample_rate.
+                Default is 1, every request.
+        """
+        if sample_rate < 1:
+            raise ValueError("sample_rate must be at least 1")
+
+        self.logger = logger
+        self.sample_rate = sample_rate
+        # the logging module has the logging functions of a Logger, but not isEnabledFor
+        self._level_check = getattr(logger, "isEnabledFor", None) or logging.getLogger().isEnabledFor
+        self._counter = itertools.count()
+
+    def enabled(self, level: int):
+        return self._level_check(level)
+
+    def context(self, method: str, url: str, **fields):
+        """
+        Start the logs of a request.
+
+        Returns:
+            dict: The extra of its info records, or None when they are not emitted, because INFO
+                is disabled or the request was not sampled.
+        """
+        if not self._level_check(logging.INFO):
+            return None
+        if self.sample_rate > 1 and next(self._counter) % self.sample_rate:
+            return None
+        return {'request_url': url, 'http_method': method, **fields}
+
+    def debug(self, message: str, context: dict, **fields):
+        if context is not None and self._level_check(logging.DEBUG):
+            self.logger.debug(message, extra={**context, **fields})
+
+    def info(self, message: str, context: dict, **fields):
+        if context is not None:
+            self.logger.info(message, extra={**context, **fields} if fields else context)
+
+    def warning(self, message: str, context: dict, request=None, **fields):
+        """
+        Log a retry. request is the sent request, which an unsampled one is described from.
+        """
+        if self._level_check(logging.WARNING):
+            self.logger.warning(message, extra={**(context or _context_of(request)), **fields})
+
+    def error(self, message: str, context: dict, request=None, **fields):
+        if self._level_check(logging.ERROR):
+            self.logger.error(message, extra={**(context or _context_of(request)), **fields})
+
+    def exception(self, message: str, **fields):
+        if self._level_check(logging.ERROR):
+            self.logger.exception(message, extra=fields)
+
+
+def _context_of(request):
+    if request is None:
+        return {}
+    # the URL as sent, so query parameters are part of it instead of a query_params field
+    return {'request_url': str(request.url), 'http_method': request.method}
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # wait for a free slot, the records before the sentinel are still handled
+        self.queue.put(self._sentinel)
+
+
+class AsyncLogHandler(QueueHandler):
+    """AsyncLogHandler()
+
+    Logging handler that only puts records on a bounded queue. A background
+    thread passes them to the wrapped handlers, so file or network I/O never
+    blocks the threads sending requests. When the queue is full, records are
+    dropped and counted instead of waiting. close() stops the thread once the
+    queued records are handled.
+    """
+
+    def __init__(self, *handlers: logging.Handler, queue_size: int = 10000, respect_handler_level: bool = True):
+        """
+        Args:
+            *handlers (logging.Handler): The handlers that do the I/O, e.g. a FileHandler.
+            queue_size (int, optional): Maximum number of records waiting. Default is 10000.
+            respect_handler_level (bool, optional): Only pass each handler the records of its level
+                and above. Default is True.
+        """
+        super().__init__(queue.Queue(queue_size))
+        self.dropped = 0
+        self.listener = _Listener(self.queue, *handlers, respect_handler_level=respect_handler_level)
+        self.listener.start()
+
+    def prepare(self, record: logging.LogRecord):
+        # the wrapped handlers format the record in the listener thread, only the arguments
+        # are merged now as they may change before then
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        super().close()
@@ -0,0 +1,589 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from .projection import normalize_fields, project
+from .sync import DELETE, Cursor, CursorStore, SyncEngine
+
+ENTITIES = ("deal", "person")
+
+_WORD = re.compile(r"\w+")
+_NOT_DIGIT = re.compile(r"\D")
+_TOKEN_END = "\U0010ffff"
+_MAX_IDS_PER_QUERY = 900
+_MAX_CANDIDATES = 200
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS deals ("
+    " id INTEGER PRIMARY KEY, status TEXT, stage_id INTEGER, person_id INTEGER, org_id INTEGER,"
+    " update_time TEXT, record TEXT NOT NULL, item TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS deals_person_id ON deals (person_id)",
+    "CREATE INDEX IF NOT EXISTS deals_org_id ON deals (org_id)",
+    "CREATE INDEX IF NOT EXISTS deals_stage_id ON deals (stage_id, status)",
+    "CREATE TABLE IF NOT EXISTS persons ("
+    " id INTEGER PRIMARY KEY, org_id INTEGER, update_time TEXT, record TEXT NOT NULL, item TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS persons_org_id ON persons (org_id)",
+    # one row per searchable token: the whole normalized value of a field, and the words it starts with
+    "CREATE TABLE IF NOT EXISTS search_terms (entity TEXT NOT NULL, field TEXT NOT NULL, token TEXT NOT NULL,"
+    " record_id INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS search_terms_token ON search_terms (entity, field, token)",
+    "CREATE INDEX IF NOT EXISTS search_terms_record ON search_terms (entity, record_id)",
+    "CREATE TABLE IF NOT EXISTS mirror_state (entity TEXT PRIMARY KEY, synced_at REAL, update_time TEXT, id INTEGER)",
+)
+
+# load() fills copies of the tables kept in the temp schema of the connection, then swaps them in at once
+_STAGING = tuple(
+    statement.replace("CREATE TABLE IF NOT EXISTS ", "CREATE TEMP TABLE IF NOT EXISTS staged_")
+    for statement in _SCHEMA
+    if statement.startswith("CREATE TABLE IF NOT EXISTS ") and "mirror_state" not in statement
+) + ("CREATE INDEX IF NOT EXISTS temp.staged_search_terms_record ON staged_search_terms (entity, record_id)",)
+
+_TABLES = {"deal": "deals", "person": "persons"}
+_SEARCH_FIELDS = {"deal": ("title",), "person": ("name", "email", "phone")}
+
+
+class LocalMirror(CursorStore):
+    """LocalMirror()
+
+    Local sqlite copy of the deals and persons of an account, for lookups that
+    would otherwise each be a search request. Titles, names, emails and phones
+    are indexed for search, and deals also by person, organization and stage.
+    search_deals and search_person take the arguments of their Deal and Person
+    counterparts and return the same shape, {"items": [{"result_score", "item"}]}.
+
+    The mirror is filled by load(), from the list endpoints, and kept current
+    by sync(), from the /recents endpoint. It is its own cursor store, so the
+    changes of a page and the cursor past them are committed together.
+    staleness() tells how long ago each entity was last brought up to date.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """
+        Args:
+            path (str, optional): The sqlite database file. Default is ":memory:".
+        """
+        # every use of the connection holds _lock; writers also hold _write_lock for their whole
+        # transaction, which may span requests, so lookups are not blocked by the network meanwhile
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+
+    def load(self, client, entities: tuple = ENTITIES, page_size: int = 500):
+        """
+        Bring the mirror in line with every deal and person listed by the API. Records
+        are staged as they arrive and replace the mirrored ones in one step at the end,
+        so lookups made meanwhile are answered from the previous data.
+
+        Args:
+            client (Client): The client used to perform the requests.
+            entities (tuple, optional): The entities to load. Default is ("deal", "person").
+            page_size (int, optional): Records fetched per request. Default is 500.
+
+        Returns:
+            dict: Number of records loaded per entity.
+        """
+        loaded = {}
+        for entity in self.__check_entities(entities):
+            started_at = time.time()
+            resource = client.deal if entity == "deal" else client.person
+            table = _TABLES[entity]
+            with self._write_lock:
+                self.__begin()
+                try:
+                    with self._lock:
+                        for statement in _STAGING:
+                            self._connection.execute(statement)
+                        self._connection.execute(f"DELETE FROM temp.staged_{table}")
+                        self._connection.execute("DELETE FROM temp.staged_search_terms")
+                    newest = Cursor()
+                    for record in resource.iter_all(page_size=page_size, prefetch=True):
+                        with self._lock:
+                            self.__upsert(entity, record, staged=True)
+                        if (record.get("update_time") or "", record["id"]) > newest.key():
+                            newest = Cursor(record["update_time"], record["id"])
+
+                    with self._lock:
+                        self._connection.execute("DELETE FROM search_terms WHERE entity = ?", (entity,))
+                        self._connection.execute("INSERT INTO search_terms SELECT * FROM temp.staged_search_terms")
+                        self._connection.execute(f"DELETE FROM {table}")
+                        self._connection.execute(f"INSERT INTO {table} SELECT * FROM temp.staged_{table}")
+                        loaded[entity] = self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                        # later syncs only ask for what changed after the newest record loaded
+                        self.__set_state(entity, started_at, newest)
+                        self._connection.execute(f"DELETE FROM temp.staged_{table}")
+                        self._connection.execute("DELETE FROM temp.staged_search_terms")
+                        self._connection.execute("COMMIT")
+                except BaseException:
+                    self.__rollback()
+                    raise
+        return loaded
+
+    def sync(self, client, entities: tuple = ENTITIES, page_size: int = 500):
+        """
+        Apply the changes made since the last load or sync, through a SyncEngine.
+
+        Args:
+            client (Client): The client used to perform the requests.
+            entities (tuple, optional): The entities to sync. Default is ("deal", "person").
+            page_size (int, optional): Changes fetched per request. Default is 500.
+
+        Returns:
+            dict: Number of upserted and deleted records.
+        """
+        engine = SyncEngine(client, self, page_size=page_size)
+        counts = {"upserted": 0, "deleted": 0}
+        for entity in self.__check_entities(entities):
+            started_at = time.time()
+            with self._write_lock:
+                self.__begin()
+                try:
+                    for event in engine.changes(entity):
+                        with self._lock:
+                            if event.op == DELETE:
+                                self.__delete(entity, event.id)
+                                counts["deleted"] += 1
+                            else:
+                                self.__upsert(entity, event.data)
+                                counts["upserted"] += 1
+                    with self._lock:
+                        self.__set_state(entity, started_at, self.get(entity) or Cursor())
+                        self._connection.execute("COMMIT")
+                except BaseException:
+                    self.__rollback()
+                    raise
+        return counts
+
+    def upsert(self, entity: str, record: dict):
+        """
+        Store one record, e.g. one received through a webhook or returned by an update.
+        """
+        self.__check_entities((entity,))
+        with self._write_lock, self._lock:
+            self._connection.execute("BEGIN")
+            self.__upsert(entity, record)
+            self._connection.execute("COMMIT")
+
+    def delete(self, entity: str, id: int):
+        self.__check_entities((entity,))
+        with self._write_lock, self._lock:
+            self._connection.execute("BEGIN")
+            self.__delete(entity, id)
+            self._connection.execute("COMMIT")
+
+    def get(self, entity: str):
+        """
+        CursorStore interface: the position of the last sync of an entity.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT update_time, id FROM mirror_state WHERE entity = ? AND update_time IS NOT NULL", (entity,)
+            ).fetchone()
+        return Cursor(*row) if row else None
+
+    def set(self, entity: str, cursor: Cursor):
+        """
+        CursorStore interface. Called by the SyncEngine once a page is consumed, so the
+        changes of that page are committed along with the cursor.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO mirror_state (entity, update_time, id) VALUES (?, ?, ?)"
+                " ON CONFLICT (entity) DO UPDATE SET update_time = excluded.update_time, id = excluded.id",
+                (entity, cursor.update_time, cursor.id),
+            )
+            if self._connection.in_transaction:
+                self._connection.execute("COMMIT")
+                self._connection.execute("BEGIN")
+
+    def get_deal(self, deal_id: int):
+        """
+        Returns:
+            dict: The mirrored deal, as returned by Deal.get_deal_by_id, or None.
+        """
+        return self.__record("deals", deal_id)
+
+    def get_person(self, person_id: int):
+        """
+        Returns:
+            dict: The mirrored person, as returned by Person.get_person_by_id, or None.
+        """
+        return self.__record("persons", person_id)
+
+    def find_deals(self, person_id: int = None, org_id: int = None, stage_id: int = None, status: str = None):
+        """
+        Return the mirrored deals matching every given filter, in id order.
+        """
+        filters = {"person_id": person_id, "org_id": org_id, "stage_id": stage_id, "status": status}
+        return self.__find("deals", filters)
+
+    def find_persons(self, email: str = None, phone: str = None, org_id: int = None):
+        """
+        Return the mirrored persons with this exact email or phone, in id order. Phones
+        are compared by their digits only.
+        """
+        ids = None
+        for field, value in (("email", email), ("phone", phone)):
+            if value is not None:
+                matching = self.__ids_with_token("person", field, _normalize(field, value))
+                ids = matching if ids is None else ids & matching
+        if ids is not None and not ids:
+            return []
+        return self.__find("persons", {"org_id": org_id}, ids)
+
+    def search_deals(
+        self,
+        term: str,
+        exact_match: bool = True,
+        person_id: int = None,
+        organization_id: int = None,
+        status: str = None,
+        include_fields: str = None,
+        start: int = None,
+        limit: int = None,
+        return_fields=None,
+    ):
+        """
+        Local counterpart of Deal.search_deals, searching titles. A term matches a title
+        exactly, ignoring case, or without exact_match when each of its words starts a
+        word of the title. include_fields is accepted for compatibility and ignored.
+
+        Returns:
+            dict: {"items": [...]}, as returned by Deal.search_deals.
+        """
+        filters = {"person_id": person_id, "org_id": organization_id, "status": status}
+        result = self.__search("deal", _SEARCH_FIELDS["deal"], term, exact_match, filters, start, limit)
+        return project(result, normalize_fields(return_fields))
+
+    def search_person(
+        self,
+        term: str,
+        fields: str = None,
+        exact_match: bool = False,
+        organization_id: int = None,
+        include_fields: str = None,
+        start: int = 0,
+        limit: int = None,
+        return_fields=None,
+    ):
+        """
+        Local counterpart of Person.search_person, searching names, emails and phones.
+        Without exact_match, a term matches a name when each of its words starts a word
+        of the name, an email or its domain when it starts it, and a phone when its
+        digits start or end it. include_fields is accepted for compatibility and ignored.
+
+        Returns:
+            dict: {"items": [...]}, as returned by Person.search_person.
+        """
+        searched = _SEARCH_FIELDS["person"]
+        if fields:
+            searched = tuple(field.strip() for field in fields.split(",") if field.strip() in searched)
+        filters = {"org_id": organization_id}
+        result = self.__search("person", searched, term, exact_match, filters, start, limit)
+        return project(result, normalize_fields(return_fields))
+
+    def staleness(self, entity: str = None):
+        """
+        Seconds since the last load or sync of an entity started. Changes made after that
+        moment may be missing from the mirror.
+
+        Args:
+            entity (str, optional): "deal" or "person". Default is None, the stalest of both.
+
+        Returns:
+            float: The age of the data, or None if the entity was never loaded.
+        """
+        entities = self.__check_entities((entity,) if entity else ENTITIES)
+        with self._lock:
+            rows = dict(self._connection.execute("SELECT entity, synced_at FROM mirror_state").fetchall())
+        synced = [rows.get(name) for name in entities]
+        if any(synced_at is None for synced_at in synced):
+            return None
+        return time.time() - min(synced)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Per entity, the number of records, the last sync cursor and the staleness in seconds.
+        """
+        stats = {}
+        for entity in ENTITIES:
+            with self._lock:
+                count = self._connection.execute(f"SELECT COUNT(*) FROM {_TABLES[entity]}").fetchone()[0]
+            stats[entity] = {"records": count, "cursor": self.get(entity), "staleness": self.staleness(entity)}
+        return stats
+
+    def close(self):
+        self._connection.close()
+
+    def __check_entities(self, entities: tuple):
+        for entity in entities:
+            if entity not in ENTITIES:
+                raise ValueError(f"Invalid entity {entity!r}. Allowed values are: {', '.join(ENTITIES)}.")
+        return entities
+
+    def __begin(self):
+        with self._lock:
+            self._connection.execute("BEGIN")
+
+    def __rollback(self):
+        with self._lock:
+            if self._connection.in_transaction:
+                self._connection.execute("ROLLBACK")
+
+    def __set_state(self, entity: str, synced_at: float, cursor: Cursor):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO mirror_state VALUES (?, ?, ?, ?)",
+            (entity, synced_at, cursor.update_time, cursor.id),
+        )
+
+    def __upsert(self, entity: str, record: dict, staged: bool = False):
+        record_id = record["id"]
+        table, terms = _TABLES[entity], "search_terms"
+        if staged:
+            table, terms = f"temp.staged_{table}", "temp.staged_search_terms"
+        self._connection.execute(f"DELETE FROM {terms} WHERE entity = ? AND record_id = ?", (entity, record_id))
+
+        body = json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+        if entity == "deal":
+            item = _deal_item(record)
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record_id,
+                    record.get("status"),
+                    _id_of(record.get("stage_id")),
+                    _id_of(record.get("person_id")),
+                    _id_of(record.get("org_id")),
+                    record.get("update_time"),
+                    body,
+                    json.dumps(item, separators=(",", ":"), ensure_ascii=False),
+                ),
+            )
+        else:
+            item = _person_item(record)
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?, ?)",
+                (
+                    record_id,
+                    _id_of(record.get("org_id")),
+                    record.get("update_time"),
+                    body,
+                    json.dumps(item, separators=(",", ":"), ensure_ascii=False),
+                ),
+            )
+
+        self._connection.executemany(
+            f"INSERT INTO {terms} VALUES (?, ?, ?, ?)",
+            [(entity, field, token, record_id) for field, token in _search_terms(entity, item)],
+        )
+
+    def __delete(self, entity: str, record_id: int):
+        self._connection.execute(f"DELETE FROM {_TABLES[entity]} WHERE id = ?", (record_id,))
+        self._connection.execute("DELETE FROM search_terms WHERE entity = ? AND record_id = ?", (entity, record_id))
+
+    def __record(self, table: str, record_id: int):
+        with self._lock:
+            row = self._connection.execute(f"SELECT record FROM {table} WHERE id = ?", (record_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __find(self, table: str, filters: dict, ids: set = None):
+        with self._lock:
+            rows = self.__select(f"SELECT id, record FROM {table}", filters, None if ids is None else list(ids))
+        rows.sort()
+        return [json.loads(record) for _, record in rows]
+
+    def __select(self, query: str, filters: dict, ids: list = None):
+        conditions = [f"{column} = ?" for column, value in filters.items() if value is not None]
+        values = [value for value in filters.values() if value is not None]
+        if ids is None:
+            where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+            return self._connection.execute(query + where, values).fetchall()
+
+        # sqlite caps the number of parameters of a statement, 999 before 3.32
+        rows = []
+        for index in range(0, len(ids), _MAX_IDS_PER_QUERY):
+            chunk = ids[index : index + _MAX_IDS_PER_QUERY]
+            where = " AND ".join(conditions + [f"id IN ({','.join('?' * len(chunk))})"])
+            rows.extend(self._connection.execute(f"{query} WHERE {where}", values + chunk).fetchall())
+        return rows
+
+    def __search(self, entity: str, fields: tuple, term: str, exact_match: bool, filters: dict, start, limit):
+        scores = {}
+        with self._lock:
+            for field in fields:
+                exact = self.__ids_with_token(entity, field, _normalize(field, term))
+                for record_id in exact:
+                    scores[record_id] = 1.0
+                if exact_match:
+                    continue
+                for record_id in self.__ids_starting_with(entity, field, term) - exact:
+                    scores.setdefault(record_id, 0.5)
+
+            if not scores:
+                return {"items": []}
+
+            rows = self.__select(f"SELECT id, item FROM {_TABLES[entity]}", filters, list(scores))
+
+        rows.sort(key=lambda row: (-scores[row[0]], row[0]))
+        start = start or 0
+        rows = rows[start : start + limit] if limit else rows[start:]
+        return {"items": [{"result_score": scores[record_id], "item": json.loads(item)} for record_id, item in rows]}
+
+    def __ids_with_token(self, entity: str, field: str, token: str):
+        if not token:
+            return set()
+        rows = self._connection.execute(
+            "SELECT record_id FROM search_terms WHERE entity = ? AND field = ? AND token = ?", (entity, field, token)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def __ids_with_prefix(self, entity: str, field: str, prefix: str, within: set = None, limit: int = -1):
+        query = "SELECT record_id FROM search_terms WHERE entity = ? AND field = ? AND token >= ? AND token < ?"
+        values = [entity, field, prefix, prefix + _TOKEN_END]
+        if within is None:
+            return {row[0] for row in self._connection.execute(f"{query} LIMIT ?", values + [limit]).fetchall()}
+
+        # the candidates are few, look their tokens up rather than every token with the prefix
+        query = query.replace("search_terms", "search_terms INDEXED BY search_terms_record", 1)
+        ids = list(within)
+        matching = set()
+        for index in range(0, len(ids), _MAX_IDS_PER_QUERY):
+            chunk = ids[index : index + _MAX_IDS_PER_QUERY]
+            rows = self._connection.execute(
+                f"{query} AND record_id IN ({','.join('?' * len(chunk))})", values + chunk
+            ).fetchall()
+            matching.update(row[0] for row in rows)
+        return matching
+
+    def __ids_starting_with(self, entity: str, field: str, term: str):
+        if field == "phone":
+            digits = _normalize("phone", term)
+            if not digits:
+                return set()
+            return self.__ids_with_prefix(entity, "phone", digits) | self.__ids_with_prefix(
+                entity, "phone:reversed", digits[::-1]
+            )
+
+        if field == "email":
+            prefix = _normalize("email", term)
+            if not prefix:
+                return set()
+            return self.__ids_with_prefix(entity, "email", prefix) | self.__ids_with_prefix(
+                entity, "email:domain", prefix
+            )
+
+        words = set(_WORD.findall(term.casefold()))
+        if not words:
+            return set()
+
+        # start from the word matching the fewest records, then only check the other words on those
+        field = f"{field}:word"
+        probes = {word: self.__ids_with_prefix(entity, field, word, limit=_MAX_CANDIDATES + 1) for word in words}
+        rarest = min(words, key=lambda word: len(probes[word]))
+        ids = probes[rarest]
+        if len(ids) > _MAX_CANDIDATES:
+            ids = self.__ids_with_prefix(entity, field, rarest)
+        for word in words - {rarest}:
+            if not ids:
+                break
+            if len(ids) <= _MAX_CANDIDATES:
+                ids = self.__ids_with_prefix(entity, field, word, within=ids)
+            else:
+                ids &= self.__ids_with_prefix(entity, field, word)
+        return ids
+
+
+def _normalize(field: str, value):
+    if value is None:
+        return ""
+    if field == "phone":
+        return _NOT_DIGIT.sub("", str(value))
+    return " ".join(str(value).casefold().split())
+
+
+def _search_terms(entity: str, item: dict):
+    for field in _SEARCH_FIELDS[entity]:
+        if field == "email":
+            for email in item.get("emails") or []:
+                email = _normalize("email", email)
+                if email:
+                    yield "email", email
+                    if "@" in email:
+                        yield "email:domain", email.rsplit("@", 1)[1]
+        elif field == "phone":
+            for phone in item.get("phones") or []:
+                digits = _normalize("phone", phone)
+                if digits:
+                    yield "phone", digits
+                    yield "phone:reversed", digits[::-1]
+        else:
+            value = _normalize(field, item.get(field))
+            if value:
+                yield field, value
+                for word in set(_WORD.findall(value)):
+                    yield f"{field}:word", word
+
+
+def _id_of(value):
+    if isinstance(value, dict):
+        return value.get("value", value.get("id"))
+    return value
+
+
+def _name_of(value, fallback=None):
+    if isinstance(value, dict):
+        return value.get("name", fallback)
+    return fallback
+
+
+def _values_of(entries):
+    if not isinstance(entries, list):
+        return []
+    return [entry.get("value") if isinstance(entry, dict) else entry for entry in entries if entry]
+
+
+def _deal_item(deal: dict):
+    person_id = _id_of(deal.get("person_id"))
+    org_id = _id_of(deal.get("org_id"))
+    return {
+        "id": deal["id"],
+        "type": "deal",
+        "title": deal.get("title"),
+        "value": deal.get("value"),
+        "currency": deal.get("currency"),
+        "status": deal.get("status"),
+        "visible_to": deal.get("visible_to"),
+        "owner": {"id": _id_of(deal.get("user_id"))},
+        "stage": {"id": _id_of(deal.get("stage_id")), "name": deal.get("stage_name")},
+        "person": {"id": person_id, "name": _name_of(deal.get("person_id"), deal.get("person_name"))}
+        if person_id
+        else None,
+        "organization": {"id": org_id, "name": _name_of(deal.get("org_id"), deal.get("org_name")), "address": None}
+        if org_id
+        else None,
+        "custom_fields": [],
+        "notes": [],
+    }
+
+
+def _person_item(person: dict):
+    org_id = _id_of(person.get("org_id"))
+    return {
+        "id": person["id"],
+        "type": "person",
+        "name": person.get("name"),
+        "phones": _values_of(person.get("phone")),
+        "emails": _values_of(person.get("email")),
+        "visible_to": person.get("visible_to"),
+        "owner": {"id": _id_of(person.get("owner_id"))},
+        "organization": {"id": org_id, "name": _name_of(person.get("org_id"), person.get("org_name")), "address": None}
+        if org_id
+        else None,
+        "custom_fields": [],
+        "notes": [],
+    }
@@ -0,0 +1,200 @@
+import json
+import re
+
+_CUSTOM_FIELD_KEY = re.compile(r"^[0-9a-f]{40}$")
+
+_compact_json = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+class Record:
+    """Record()
+
+    Compact, read-only view of an API record. The most used scalar fields live in
+    __slots__; everything else (nested objects, lists, custom fields) is kept as
+    one compact JSON string and only decoded when accessed. Unknown attributes and
+    item access fall back to those lazily decoded fields, so a record can be used
+    where the plain dict was used before.
+    """
+
+    __slots__ = ("_extra", "_field_lookup")
+
+    _fields = frozenset()
+    _references = frozenset()
+
+    def __init__(self, data: dict, field_lookup=None) -> None:
+        """
+        Args:
+            data (dict): The record as returned by the API.
+            field_lookup (callable, optional): Maps a custom field hash key to its field
+                definition, e.g. DealField.get_deal_field_by_key. Default is None.
+        """
+        fields = self._fields
+        references = self._references
+        for key in fields:
+            setattr(self, key, None)
+
+        extra = {}
+        for key, value in data.items():
+            if key in fields:
+                if key in references and isinstance(value, dict):
+                    # e.g. person_id: {"value": 1, "name": "..."}, keep the id and the object apart
+                    extra[key] = value
+                    value = value.get("value")
+                setattr(self, key, value)
+            else:
+                extra[key] = value
+
+        self._extra = _compact_json(extra) if extra else None
+        self._field_lookup = field_lookup
+
+    @property
+    def extra(self):
+        """
+        dict: The fields that are not kept in slots, decoded on every access.
+        """
+        return json.loads(self._extra) if self._extra is not None else {}
+
+    def related(self, key: str):
+        """
+        Return the nested object of a reference field, e.g. related("person_id")
+        returns the person name, email and phone sent along with a deal.
+        """
+        nested = self.extra.get(key)
+        return nested if isinstance(nested, dict) else None
+
+    @property
+    def custom_fields(self):
+        """
+        dict: The custom fields of the record, keyed by field name when a field_lookup
+            was given and by hash key otherwise.
+        """
+        result = {}
+        for key, value in self.extra.items():
+            if not _CUSTOM_FIELD_KEY.match(key):
+                continue
+            field = self._field_lookup(key) if self._field_lookup is not None else None
+            result[field.get("name") if field else key] = value
+        return result
+
+    def to_dict(self):
+        result = self.extra
+        for key in self._fields:
+            if key not in result:
+                result[key] = getattr(self, key)
+        return result
+
+    def get(self, key: str, default=None):
+        if key in self._fields:
+            return getattr(self, key)
+        return self.extra.get(key, default)
+
+    def __getitem__(self, key: str):
+        if key in self._fields:
+            return getattr(self, key)
+        return self.extra[key]
+
+    def __getattr__(self, name: str):
+        # only called for names that are neither set slots nor class attributes
+        if name.startswith("_") or name in self._fields:
+            raise AttributeError(name)
+        extra = self.extra
+        if name not in extra:
+            raise AttributeError(f"{type(self).__name__} has no field {name!r}")
+        return extra[name]
+
+    def __eq__(self, other):
+        if not isinstance(other, Record):
+            return NotImplemented
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r})"
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+
+class DealRecord(Record):
+    """DealRecord()
+
+    Compact deal returned by the Deal methods called with model=True.
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "value",
+        "currency",
+        "status",
+        "stage_id",
+        "pipeline_id",
+        "person_id",
+        "org_id",
+        "user_id",
+        "probability",
+        "expected_close_date",
+        "add_time",
+        "update_time",
+        "close_time",
+        "won_time",
+        "lost_time",
+        "active",
+        "deleted",
+        "visible_to",
+    )
+
+    _fields = frozenset(__slots__)
+    _references = frozenset(["person_id", "org_id", "user_id"])
+
+
+class PersonRecord(Record):
+    """PersonRecord()
+
+    Compact person returned by the Person methods called with model=True.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "first_name",
+        "last_name",
+        "org_id",
+        "owner_id",
+        "add_time",
+        "update_time",
+        "active_flag",
+        "visible_to",
+    )
+
+    _fields = frozenset(__slots__)
+    _references = frozenset(["org_id", "owner_id"])
+
+
+class ActivityRecord(Record):
+    """ActivityRecord()
+
+    Compact activity returned by the Activity methods called with model=True.
+    """
+
+    __slots__ = (
+        "id",
+        "subject",
+        "type",
+        "done",
+        "due_date",
+        "due_time",
+        "duration",
+        "deal_id",
+        "person_id",
+        "org_id",
+        "user_id",
+        "add_time",
+        "update_time",
+        "marked_as_done_time",
+    )
+
+    _fields = frozenset(__slots__)
+    _references = frozenset()
@@ -0,0 +1,113 @@
+from .constants import DEFAULT_PAGE_SIZE
+
+
+def iter_records(
+    client,
+    url_context: str,
+    params: dict = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    prefetch: bool = False,
+    record_factory=None,
+):
+    """
+    Lazily iterate over every record of a paginated endpoint, following
+    additional_data.pagination.next_start until the collection is exhausted.
+
+    Only one page is held in memory at a time (two when prefetching).
+
+    Args:
+        client (Client): The client used to perform the requests.
+        url_context (str): The endpoint path, e.g. "/deals" or "/deals/search".
+        params (dict, optional): Query parameters sent with every page request. Default is None.
+        page_size (int, optional): Number of records requested per page. Default is 500, the API maximum.
+        prefetch (bool, optional): Fetch the next page in a background thread while the
+            current one is being consumed. Default is False.
+        record_factory (callable, optional): Applied to every record before it is yielded,
+            e.g. to build a pipedrive.models.Record. Default is None.
+
+    Yields:
+        dict: The records of each page, one at a time. For search endpoints these are
+            the entries of data["items"].
+
+    """
+    params = dict(params or {})
+    params.setdefault("start", 0)
+    params["limit"] = page_size
+
+    if not prefetch:
+        while params is not None:
+            page = client.get_page(url_context, params)
+            yield from _records_of(page, record_factory)
+            params = _next_page_params(page, params)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(client.get_page, url_context, params)
+        while future is not None:
+            page = future.result()
+            params = _next_page_params(page, params)
+            future = executor.submit(client.get_page, url_context, params) if params is not None else None
+            yield from _records_of(page, record_factory)
+
+
+async def aiter_records(
+    client,
+    url_context: str,
+    params: dict = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    prefetch: bool = False,
+    record_factory=None,
+):
+    """
+    Async counterpart of iter_records, for use with AsyncClient.
+
+    Yields:
+        dict: The records of each page, one at a time.
+
+    """
+    import asyncio
+
+    params = dict(params or {})
+    params.setdefault("start", 0)
+    params["limit"] = page_size
+
+    task = asyncio.ensure_future(client.get_page(url_context, params))
+    try:
+        while task is not None:
+            page = await task
+            params = _next_page_params(page, params)
+            task = None
+            if params is not None:
+                next_page = client.get_page(url_context, params)
+                task = asyncio.ensure_future(next_page) if prefetch else next_page
+
+            for record in _records_of(page, record_factory):
+                yield record
+    finally:
+        if isinstance(task, asyncio.Future):
+            task.cancel()
+        elif task is not None:
+            task.close()
+
+
+def _records_of(page: dict, record_factory=None):
+    data = page.get("data") or []
+    if isinstance(data, dict):
+        data = data.get("items") or []
+    if record_factory is not None:
+        return map(record_factory, data)
+    return data
+
+
+def _next_page_params(page: dict, params: dict):
+    pagination = (page.get("additional_data") or {}).get("pagination") or {}
+    if not pagination.get("more_items_in_collection"):
+        return None
+
+    next_start = pagination.get("next_start")
+    if next_start is None:
+        next_start = params["start"] + params["limit"]
+
+    return {**params, "start": next_start}
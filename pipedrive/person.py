@@ -1,10 +1,12 @@
-from .util import Util
+from .constants import DEFAULT_MAX_WORKERS, DEFAULT_PAGE_SIZE
+from .models import PersonRecord
+from .util import SHARED_UTIL
 
 
 class Person:
     def __init__(self, client) -> None:
         self.client = client
-        self._util = Util()
+        self._util = SHARED_UTIL
 
     def create_person(
         self,
@@ -32,22 +34,41 @@ class Person:
             dict: The created person information as a dictionary.
 
         Raises:
-            Exception: If there is an error while creating the person.
+            ValidationError: If any field is invalid and the client validates payloads.
 
         """
         url_context = "/persons"
         body = {
             "name": name,
-            "email": [{"value": email}],
-            "phone": [{"value": phone}],
+            "email": [{"value": email}] if email is not None else None,
+            "phone": [{"value": phone}] if phone is not None else None,
             "owner_id": owner_id,
             "org_id": org_id,
             "visible_to": visible_to,
             "marketing_status": marketing_status,
         }
 
+        if self.client.validate_payloads:
+            self._util.validate_payload("person", body)
+
         return self.client.post(url_context, body)
 
+    def bulk_create(self, payloads, max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None):
+        """
+        Create many persons concurrently. A failing item does not abort the others.
+
+        Args:
+            payloads (Iterable[dict]): Keyword arguments of create_person for each person.
+            max_workers (int, optional): Number of concurrent requests. Default is 8.
+            on_progress (callable, optional): Called as on_progress(completed, failed, total) after each item.
+
+        Returns:
+            list[BulkItemResult]: One result per payload, in input order, holding either the created person
+                or the error.
+
+        """
+        return self.client.run_bulk(self.create_person, payloads, max_workers=max_workers, on_progress=on_progress)
+
     def search_person(
         self,
         term: str,
@@ -57,6 +78,7 @@ class Person:
         include_fields: str = None,
         start: int = 0,
         limit: int = None,
+        return_fields=None,
     ):
         """
         Search for persons based on the provided parameters.
@@ -69,6 +91,8 @@ class Person:
             include_fields (str, optional): Additional fields to include in the results.
             start (int, optional): Pagination start.
             limit (int, optional): Items shown per page.
+            return_fields (Iterable[str], optional): Only return these fields of each person found,
+                e.g. ("id", "name", "email"). Default is None, every field.
 
         Returns:
             dict: The search results as a dictionary.
@@ -77,7 +101,7 @@ class Person:
             Exception: If there is an error while searching for persons.
 
         """
-        url_context = "persons/search"
+        url_context = "/persons/search"
         params = {
             "term": term,
             "fields": fields,
@@ -88,14 +112,103 @@ class Person:
             "limit": limit,
         }
 
-        return self.client.get(url_context, params)
+        return self.client.get(url_context, params, fields=return_fields)
+
+    def iter_search(
+        self,
+        term: str,
+        fields: str = None,
+        exact_match: bool = False,
+        organization_id: int = None,
+        include_fields: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = False,
+        return_fields=None,
+    ):
+        """
+        Lazily iterate over every person matching the search, page by page.
+
+        Args:
+            term (str): The search term to look for.
+            fields (str, optional): The fields to perform the search from.
+            exact_match (bool, optional): Indicates whether to perform an exact match against the given term.
+            organization_id (int, optional): The ID of the organization to filter persons.
+            include_fields (str, optional): Additional fields to include in the results.
+            page_size (int, optional): Items fetched per request. Default is 500.
+            prefetch (bool, optional): Fetch the next page in the background. Default is False.
+            return_fields (Iterable[str], optional): Only return these fields of each person found,
+                e.g. ("id", "name", "email"). Default is None, every field.
+
+        Yields:
+            dict: Each search result item.
 
-    def get_person_by_id(self, person_id: int):
+        """
+        url_context = "/persons/search"
+        params = {
+            "term": term,
+            "fields": fields,
+            "exact_match": exact_match,
+            "organization_id": organization_id,
+            "include_fields": include_fields,
+        }
+
+        return self.client.iter_records(
+            url_context, params, page_size=page_size, prefetch=prefetch, fields=return_fields
+        )
+
+    def iter_all(
+        self,
+        user_id: int = None,
+        filter_id: int = None,
+        first_char: str = None,
+        sort: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = False,
+        model: bool = False,
+        return_fields=None,
+    ):
+        """
+        Lazily iterate over every person of the account, page by page.
+
+        Args:
+            user_id (int, optional): Only persons owned by this user.
+            filter_id (int, optional): The ID of the filter to use.
+            first_char (str, optional): Only persons whose name starts with this letter.
+            sort (str, optional): The field names and sorting mode, e.g. "update_time DESC".
+            page_size (int, optional): Items fetched per request. Default is 500.
+            prefetch (bool, optional): Fetch the next page in the background. Default is False.
+            model (bool, optional): Yield compact PersonRecord objects instead of dictionaries.
+            return_fields (Iterable[str], optional): Only return these fields of each person,
+                e.g. ("id", "name", "email"). Default is None, every field.
+
+        Yields:
+            dict: Each person.
+
+        """
+        url_context = "/persons"
+        params = {
+            "user_id": user_id,
+            "filter_id": filter_id,
+            "first_char": first_char,
+            "sort": sort,
+        }
+
+        return self.client.iter_records(
+            url_context,
+            params,
+            page_size=page_size,
+            prefetch=prefetch,
+            record_class=PersonRecord if model else None,
+            fields=return_fields,
+        )
+
+    def get_person_by_id(self, person_id: int, model: bool = False):
         """
         Retrieve a person by their ID.
 
         Args:
             person_id (int): The ID of the person to retrieve.
+            model (bool, optional): Return a compact PersonRecord instead of a dictionary.
 
         Returns:
             dict: The person information as a dictionary.
@@ -106,7 +219,24 @@ class Person:
         """
         url_context = f"/persons/{person_id}"
 
-        return self.client.get(url_context)
+        return self.client.get(url_context, record_class=PersonRecord if model else None)
+
+    def get_persons_by_ids(self, person_ids, max_workers: int = DEFAULT_MAX_WORKERS, model: bool = False):
+        """
+        Retrieve many persons by their IDs concurrently. Each distinct ID is requested once.
+
+        Args:
+            person_ids (Iterable[int]): The IDs of the persons to retrieve. Duplicates are allowed.
+            max_workers (int, optional): Number of concurrent requests. Default is 8.
+            model (bool, optional): Return compact PersonRecord objects instead of dictionaries.
+
+        Returns:
+            list: The persons in the order of person_ids, with None for persons that do not exist.
+
+        """
+        return self.client.fetch_by_ids(
+            self.get_person_by_id, "person_id", person_ids, max_workers=max_workers, model=model
+        )
 
     def update_person(
         self,
@@ -138,21 +268,12 @@ class Person:
             dict: The updated person information as a dictionary.
 
         Raises:
-            ValueError: If there are any validation errors for the fields.
+            ValueError: If email, phone, visible_to or marketing_status is invalid.
+            ValidationError: If any field is invalid and the client validates payloads.
 
         """
         url_context = f"/persons/{person_id}"
 
-        # Validate fields
-        if email is not None:
-            self._util.validate_email(email)
-        if phone is not None:
-            self._util.validate_phone(phone)
-        if visible_to is not None:
-            self._util.validate_visible_to(visible_to)
-        if marketing_status is not None:
-            self._util.validate_marketing_status(marketing_status)
-
         payload = {
             "name": name,
             "owner_id": owner_id,
@@ -164,4 +285,33 @@ class Person:
             "add_time": add_time,
         }
 
+        if self.client.validate_payloads:
+            self._util.validate_payload("person", payload, partial=True)
+        else:
+            # the checks update_person has always made, kept when payload validation is off
+            if email is not None:
+                self._util.validate_email(email)
+            if phone is not None:
+                self._util.validate_phone(phone)
+            if visible_to is not None:
+                self._util.validate_visible_to(visible_to)
+            if marketing_status is not None:
+                self._util.validate_marketing_status(marketing_status)
+
         return self.client.put(url_context, payload)
+
+    def bulk_update(self, payloads, max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None):
+        """
+        Update many persons concurrently. A failing item does not abort the others.
+
+        Args:
+            payloads (Iterable[dict]): Keyword arguments of update_person for each person, including person_id.
+            max_workers (int, optional): Number of concurrent requests. Default is 8.
+            on_progress (callable, optional): Called as on_progress(completed, failed, total) after each item.
+
+        Returns:
+            list[BulkItemResult]: One result per payload, in input order, holding either the updated person
+                or the error.
+
+        """
+        return self.client.run_bulk(self.update_person, payloads, max_workers=max_workers, on_progress=on_progress)
@@ -0,0 +1,194 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from logging import Logger
+
+from .client import Client
+from .rate_limit import RateLimiter
+from .transport import SessionTransport, Transport
+
+
+class _Tenant:
+    __slots__ = ("client", "last_used")
+
+    def __init__(self, client: Client, last_used: float) -> None:
+        self.client = client
+        self.last_used = last_used
+
+
+class ClientPool:
+    """ClientPool()
+
+    Registry of per-tenant clients for applications serving many Pipedrive
+    accounts. Each API token gets a lightweight Client with its own rate limit
+    budget. All of them send requests through one shared transport, so
+    keep-alive connections are reused across tokens. Tenants idle for longer
+    than idle_timeout are evicted, and so are the least recently used ones once
+    there are more than max_tenants.
+    """
+
+    def __init__(
+        self,
+        max_tenants: int = 1000,
+        idle_timeout: float = 900,
+        transport: Transport = None,
+        pool_size: int = 100,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        rate_limiter_factory=RateLimiter,
+        cache_factory=None,
+        entity_store_factory=None,
+        logger: Logger = logging,
+        base_url: str = "https://api.pipedrive.com/v1",
+        **client_options,
+    ) -> None:
+        """
+        Args:
+            max_tenants (int, optional): Maximum number of tenants kept at once. Default is 1000.
+            idle_timeout (float, optional): Seconds after which an unused tenant is evicted. None keeps
+                tenants until they are pushed out by max_tenants. Default is 900.
+            transport (Transport, optional): Transport shared by every tenant. When None, a SessionTransport
+                owned by the pool is created. Default is None.
+            pool_size (int, optional): Maximum number of keep-alive connections of the default transport.
+                Default is 100.
+            connect_timeout (float, optional): Connect timeout in seconds of the default transport. Default is 5.0.
+            read_timeout (float, optional): Read timeout in seconds of the default transport. Default is 30.0.
+            rate_limiter_factory (callable, optional): Called with no arguments to build the RateLimiter of each
+                tenant. Default is RateLimiter.
+            cache_factory (callable, optional): Called with the token to build the ResponseCache of each tenant,
+                or None for no caching. Cache keys do not include the token, so a cache must never be shared
+                between tenants. Default is None.
+            entity_store_factory (callable, optional): Called with the token to build the EntityStore of each
+                tenant, or None for no store. Stores are keyed by entity and id only, so like caches they must
+                never be shared between tenants. Default is None.
+            logger (Logger, optional): Logger of every tenant client. Default is the logging module.
+            base_url (str, optional): API root used by every tenant. Default is Pipedrive's v1 API.
+            **client_options: Other keyword arguments of Client, e.g. hooks or validate_payloads. They are
+                passed as they are to every tenant, so hooks see the requests of every tenant.
+
+        Raises:
+            ValueError: If client_options holds a cache or an entity_store, which every tenant would share.
+        """
+        shared = sorted(option for option in ("cache", "entity_store") if option in client_options)
+        if shared:
+            raise ValueError(
+                f"{', '.join(shared)} would be shared by every tenant, use cache_factory or entity_store_factory"
+            )
+
+        self.max_tenants = max_tenants
+        self.idle_timeout = idle_timeout
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = SessionTransport(
+                pool_maxsize=pool_size,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+            )
+        self.transport = transport
+        self.rate_limiter_factory = rate_limiter_factory
+        self.cache_factory = cache_factory
+        self.entity_store_factory = entity_store_factory
+        self.logger = logger
+        self.base_url = base_url
+        self.client_options = client_options
+        self._tenants = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"created": 0, "hits": 0, "evicted": 0}
+
+    def client(self, token: str):
+        """
+        Return the client of a tenant, creating it on first use.
+
+        Args:
+            token (str): The Pipedrive API token of the tenant.
+
+        Returns:
+            Client: A client sharing the pool's transport, with the tenant's own rate limit budget.
+
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.__evict_idle(now)
+
+            tenant = self._tenants.get(token)
+            if tenant is not None:
+                self._tenants.move_to_end(token)
+                tenant.last_used = now
+                self._stats["hits"] += 1
+                return tenant.client
+
+            client = self.__build_client(token)
+            self._tenants[token] = _Tenant(client, now)
+            self._stats["created"] += 1
+            while len(self._tenants) > self.max_tenants:
+                self._tenants.popitem(last=False)
+                self._stats["evicted"] += 1
+            return client
+
+    __getitem__ = client
+
+    def evict(self, token: str):
+        """
+        Forget a tenant, e.g. after its token was revoked.
+
+        Returns:
+            bool: Whether the tenant was in the pool.
+        """
+        with self._lock:
+            return self._tenants.pop(token, None) is not None
+
+    def stats(self):
+        """
+        Returns:
+            dict: Number of tenants held, created, served from the pool and evicted.
+        """
+        with self._lock:
+            return {"tenants": len(self._tenants), **self._stats}
+
+    def close(self):
+        """
+        Drop every tenant and release the connections of the transport, if this pool created it.
+        """
+        with self._lock:
+            self._tenants.clear()
+        if self._owns_transport:
+            self.transport.close()
+
+    def __contains__(self, token: str):
+        with self._lock:
+            return token in self._tenants
+
+    def __len__(self):
+        with self._lock:
+            return len(self._tenants)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __build_client(self, token: str):
+        client = Client(
+            token,
+            logger=self.logger,
+            transport=self.transport,
+            rate_limiter=self.rate_limiter_factory(),
+            cache=self.cache_factory(token) if self.cache_factory is not None else None,
+            entity_store=self.entity_store_factory(token) if self.entity_store_factory is not None else None,
+            **self.client_options,
+        )
+        client.base_url = self.base_url
+        return client
+
+    def __evict_idle(self, now: float):
+        if self.idle_timeout is None:
+            return
+        # tenants are kept in last use order, so the idle ones are all at the front
+        while self._tenants:
+            token, tenant = next(iter(self._tenants.items()))
+            if now - tenant.last_used < self.idle_timeout:
+                break
+            del self._tenants[token]
+            self._stats["evicted"] += 1
@@ -0,0 +1,65 @@
+"""
+Client side field projection. The v1 endpoints wrapped here always return
+whole records, so records requested with fields= are trimmed right after
+parsing, before they are cached, stored or handed to the caller.
+
+The resource methods take them as return_fields rather than fields, since
+search_person already uses fields for the fields searched.
+"""
+
+
+def project(data, fields):
+    """
+    Keep only the given fields of every record in data.
+
+    Args:
+        data: A record, a list of records, or the data of a search response, whose records
+            are under items[].item. Other values are returned unchanged.
+        fields (Iterable[str]): The fields to keep. None keeps every field.
+
+    Returns:
+        The projected data. Records are copied, data is not modified.
+    """
+    if fields is None or data is None:
+        return data
+    if isinstance(data, list):
+        return [project_record(record, fields) for record in data]
+    if isinstance(data, dict) and isinstance(data.get("items"), list):
+        return {**data, "items": [project_record(item, fields) for item in data["items"]]}
+    return project_record(data, fields)
+
+
+def project_record(record, fields):
+    """
+    Keep only the given fields of one record, or of the item of one search result.
+    """
+    if not isinstance(record, dict):
+        return record
+    if "result_score" in record and isinstance(record.get("item"), dict):
+        return {**record, "item": project_record(record["item"], fields)}
+    return {field: record[field] for field in fields if field in record}
+
+
+def projector(fields, record_factory=None):
+    """
+    Returns:
+        callable: A record factory projecting each record before applying record_factory,
+            or record_factory itself when fields is None.
+    """
+    if fields is None:
+        return record_factory
+    if record_factory is None:
+        return lambda record: project_record(record, fields)
+    return lambda record: record_factory(project_record(record, fields))
+
+
+def normalize_fields(fields):
+    """
+    Returns:
+        tuple: The fields in a canonical order, usable in cache keys, or None.
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    return tuple(sorted({field.strip() for field in fields if field.strip()}))
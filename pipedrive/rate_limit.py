@@ -0,0 +1,225 @@
+import random
+import threading
+import time
+
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+RETRYABLE_SERVER_ERRORS = frozenset([500, 502, 503, 504])
+
+
+class TokenBucket:
+    """TokenBucket()
+
+    Thread-safe token bucket. Callers reserve a token and get back how long they
+    must wait before using it, so the same bucket serves threads and coroutines.
+    """
+
+    def __init__(self, capacity: float, window: float) -> None:
+        """
+        Args:
+            capacity (float): Maximum burst size, in requests.
+            window (float): Time in seconds it takes to refill a full bucket.
+        """
+        self.capacity = capacity
+        self.window = window
+        self.rate = capacity / window
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take one token from the bucket.
+
+        Returns:
+            float: Seconds the caller has to wait before sending its request.
+        """
+        with self._lock:
+            self.__refill()
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def update(self, limit: int = None, remaining: int = None, reset: float = None):
+        """
+        Adapt the bucket to the budget reported by the server.
+
+        Args:
+            limit (int, optional): Requests allowed per window.
+            remaining (int, optional): Requests left in the current window.
+            reset (float, optional): Seconds until the current window resets.
+        """
+        with self._lock:
+            self.__refill()
+            if limit and limit != self.capacity:
+                self.capacity = limit
+                self.rate = limit / self.window
+            if remaining is None:
+                return
+            if remaining <= 0 and reset:
+                self._tokens = min(self._tokens, 1 - reset * self.rate)
+            else:
+                self._tokens = min(self._tokens, remaining)
+
+    def __refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
+def _shared(index: int):
+    return property(
+        lambda self: self._state[index],
+        lambda self, value: self._state.__setitem__(index, value),
+    )
+
+
+class SharedTokenBucket(TokenBucket):
+    """SharedTokenBucket()
+
+    Token bucket kept in shared memory, so every process it is handed to, e.g.
+    through the initializer of a process pool, draws from one budget.
+    """
+
+    capacity = _shared(0)
+    window = _shared(1)
+    rate = _shared(2)
+    _tokens = _shared(3)
+    _updated_at = _shared(4)
+
+    def __init__(self, capacity: float, window: float, context=None) -> None:
+        """
+        Args:
+            capacity (float): Maximum burst size, in requests, shared by every process.
+            window (float): Time in seconds it takes to refill a full bucket.
+            context (optional): The multiprocessing context the processes are started from.
+                Default is None, the default context.
+        """
+        import multiprocessing
+
+        context = context or multiprocessing.get_context()
+        # time.monotonic is system wide on the platforms with fork and spawn, so processes agree on it
+        self._state = context.Array("d", [capacity, window, capacity / window, capacity, time.monotonic()])
+        self._lock = self._state.get_lock()
+
+
+class RetryPolicy:
+    """RetryPolicy()
+
+    Jittered exponential backoff of 429 and 5xx responses to idempotent methods.
+    A POST is never sent again, even after a 429: nothing guarantees the first
+    one was not processed, so the caller gets TooManyRequests and decides.
+    """
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 30.0) -> None:
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def should_retry(self, method: str, status_code: int, attempt: int):
+        if attempt >= self.max_retries or method.upper() not in IDEMPOTENT_METHODS:
+            return False
+
+        return status_code == 429 or status_code in RETRYABLE_SERVER_ERRORS
+
+    def delay(self, attempt: int, retry_after: float = None):
+        backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        if retry_after is not None:
+            return max(retry_after, backoff)
+        return backoff
+
+
+class RateLimiter:
+    """RateLimiter()
+
+    Request scheduler used by Client and AsyncClient. It throttles outgoing
+    requests with a token bucket, adapts it to the x-ratelimit-* response
+    headers and decides when and how long to back off before a retry.
+    """
+
+    def __init__(
+        self,
+        requests_per_window: int = 80,
+        window: float = 2.0,
+        retry_policy: RetryPolicy = None,
+        bucket: TokenBucket = None,
+    ) -> None:
+        """
+        Args:
+            requests_per_window (int, optional): Burst budget per window. Default is 80.
+            window (float, optional): Length of Pipedrive's rate limit window in seconds. Default is 2.0.
+            retry_policy (RetryPolicy, optional): Backoff settings. Default is RetryPolicy().
+            bucket (TokenBucket, optional): The bucket to draw from, e.g. a SharedTokenBucket shared
+                with other processes. requests_per_window and window are then ignored. Default is None,
+                a bucket of this limiter only.
+        """
+        self.bucket = bucket if bucket is not None else TokenBucket(requests_per_window, window)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "delayed": 0, "throttled": 0, "retried": 0}
+
+    def acquire(self):
+        wait = self.__reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        import asyncio
+
+        wait = self.__reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def observe(self, status_code: int, headers):
+        """
+        Feed a response back into the scheduler.
+
+        Args:
+            status_code (int): The HTTP status code of the response.
+            headers (Mapping): The response headers.
+        """
+        if status_code == 429:
+            self.__increment("throttled")
+
+        self.bucket.update(
+            limit=_header_number(headers, "x-ratelimit-limit"),
+            remaining=_header_number(headers, "x-ratelimit-remaining"),
+            reset=_header_number(headers, "x-ratelimit-reset"),
+        )
+
+    def should_retry(self, method: str, status_code: int, attempt: int):
+        return self.retry_policy.should_retry(method, status_code, attempt)
+
+    def retry_delay(self, attempt: int, headers):
+        self.__increment("retried")
+        return self.retry_policy.delay(attempt, _header_number(headers, "retry-after"))
+
+    def stats(self):
+        """
+        Returns:
+            dict: Number of requests sent, delayed by the bucket, throttled by the server and retried.
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def __reserve(self):
+        wait = self.bucket.reserve()
+        with self._lock:
+            self._counters["requests"] += 1
+            if wait:
+                self._counters["delayed"] += 1
+        return wait
+
+    def __increment(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+
+def _header_number(headers, name: str):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
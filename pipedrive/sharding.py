@@ -0,0 +1,437 @@
+import json
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .export import ENTITIES
+from .pagination import DEFAULT_PAGE_SIZE
+from .projection import normalize_fields, project_record
+from .rate_limit import RateLimiter, SharedTokenBucket
+
+DEFAULT_SHARD_SIZE = 10000
+# records read before the boundary of two shards when checking the seam between them, and ids kept at both ends
+# of every shard in the checkpoint
+_SEAM_WINDOW = 50
+
+_PAGE = "page"
+_DONE = "done"
+_FAILED = "failed"
+
+# state of a worker process, set by _start_worker
+_worker = None
+
+
+class ShardFailed(Exception):
+    """ShardFailed()
+
+    Exception raised by ShardedRunner.run when a shard keeps failing. The
+    checkpoint holds the progress of every shard, so running the job again
+    resumes it.
+    """
+
+    def __init__(self, shard: int, error: str) -> None:
+        self.shard = shard
+        self.error = error
+        super().__init__(f"Shard {shard} failed: {error}")
+
+
+class ShardedRunner:
+    """ShardedRunner()
+
+    Crawl a whole /deals, /persons or /activities collection with a pool of
+    processes, so JSON decoding is spread over every core. The collection is
+    split into offset ranges of shard_size records. Each worker process has
+    its own Client, and all of them draw from one SharedTokenBucket, so the
+    job stays within one rate budget.
+
+    Workers send every page back as soon as it is read. run() merges them,
+    in arrival order, dropping records whose id was already yielded: offsets
+    shift when records are added or removed during the crawl. With a
+    checkpoint_path, the offset reached in every shard is saved after its
+    records are yielded. A failed shard is retried from there, and a job that
+    stopped is resumed by running it again.
+
+    A record deleted during the crawl moves the ones after it to a lower
+    offset, so a record at the start of a shard can end up in the previous
+    shard after that one was read. Deals and persons are listed by id, so once
+    every shard is done the seam between two shards is read again: the records
+    between the last id of a shard and the first id of the next are looked up
+    around their boundary, usually in one request per shard. Activities cannot
+    be listed by id, and neither can other entities given another sort, so
+    their crawl can miss a record when records are deleted meanwhile.
+
+    The checkpoint also keeps the ids of the first and last 50 records of
+    every shard and seam, so a resumed job does not yield again a record that
+    moved across a shard boundary. The rest of the ids seen are not kept. A
+    page is recorded as read once all of its records are yielded, so the
+    records of the page being yielded when the job stopped are yielded again
+    by the resumed job: for that page, delivery is at least once.
+    """
+
+    def __init__(
+        self,
+        token: str = None,
+        entity: str = "deal",
+        params: dict = None,
+        processes: int = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        fields=None,
+        transform=None,
+        checkpoint_path: str = None,
+        requests_per_window: int = 80,
+        window: float = 2.0,
+        max_shard_attempts: int = 3,
+        client_factory=None,
+        mp_context=None,
+    ) -> None:
+        """
+        Args:
+            token (str, optional): The Pipedrive API token of the default client of each worker.
+            entity (str, optional): One of "deal", "person" or "activity". Default is "deal".
+            params (dict, optional): Filters of the list endpoint, e.g. {"status": "open"}. Deals and
+                persons are sorted by id unless another sort is given, which keeps offsets stable
+                while records are added and lets the seams between shards be checked. Default is None.
+            processes (int, optional): Number of worker processes. Default is None, one per CPU.
+            shard_size (int, optional): Records per shard. Default is 10000.
+            page_size (int, optional): Records fetched per request. Default is 500.
+            fields (Iterable[str], optional): Only keep these fields of each record. Records are trimmed
+                in the workers, before they are sent back. Default is None, every field.
+            transform (callable, optional): Applied to each record in the workers, after fields, e.g.
+                pipedrive.export.flatten_record. Must be picklable. Default is None.
+            checkpoint_path (str, optional): JSON file holding the progress of the job. Default is None,
+                no checkpoint.
+            requests_per_window (int, optional): Burst budget per window shared by every worker. Default is 80.
+            window (float, optional): Length of the rate limit window in seconds. Default is 2.0.
+            max_shard_attempts (int, optional): Attempts of a shard before run() raises ShardFailed.
+                Default is 3.
+            client_factory (callable, optional): Called in each worker as client_factory(rate_limiter) to
+                build its Client. Must be picklable, e.g. a module level function. Default is None,
+                Client(token, rate_limiter=rate_limiter).
+            mp_context (optional): The multiprocessing context of the pool. Default is None, the default
+                context.
+        """
+        if entity not in ENTITIES:
+            raise ValueError(f"Invalid entity {entity!r}. Allowed values are: {', '.join(ENTITIES)}.")
+        if token is None and client_factory is None:
+            raise ValueError("Either token or client_factory is required")
+
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        if entity != "activity":
+            params.setdefault("sort", "id ASC")
+
+        self.token = token
+        self.entity = entity
+        self.params = params
+        self.processes = processes or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.page_size = min(page_size, shard_size)
+        self.fields = normalize_fields(fields)
+        self.transform = transform
+        self.checkpoint_path = checkpoint_path
+        self.requests_per_window = requests_per_window
+        self.window = window
+        self.max_shard_attempts = max_shard_attempts
+        self.client_factory = client_factory
+        self.mp_context = mp_context
+        self._stats = {}
+
+    def run(self):
+        """
+        Crawl the collection.
+
+        Yields:
+            The records, transformed when transform is given, each id once.
+
+        Raises:
+            ShardFailed: If a shard failed max_shard_attempts times.
+        """
+        import multiprocessing
+
+        context = self.mp_context or multiprocessing.get_context()
+        checkpoint = self.__load_checkpoint()
+        progress = {int(shard): offset for shard, offset in checkpoint["progress"].items()}
+        done = set(checkpoint["done"])
+        end = checkpoint["end"]
+        # the first and last id read by every shard, to check the seams between them once all are done
+        bounds = {int(shard): ids for shard, ids in checkpoint.get("bounds", {}).items()}
+        # the ids at both ends of every shard and seam, [first ids, last ids], which a resumed job must not yield again
+        edges = {_shard_key(shard): ids for shard, ids in checkpoint.get("edges", {}).items()}
+        seams = None
+        next_shard = max([*progress, *done], default=-1) + 1
+        retries = [shard for shard in sorted(progress) if shard not in done]
+        attempts = {}
+        seen = {record_id for head, tail in edges.values() for record_id in (*head, *tail)}
+        self._stats = {"shards": 0, "retried": 0, "seams": 0, "pages": 0, "records": 0, "duplicates": 0}
+        started_at = time.perf_counter()
+
+        pages = context.Queue(self.processes * 4)
+        stop = context.Event()
+        bucket = SharedTokenBucket(self.requests_per_window, self.window, context)
+        in_flight = {}
+
+        def start_pool():
+            return ProcessPoolExecutor(
+                self.processes,
+                mp_context=context,
+                initializer=_start_worker,
+                initargs=(self.client_factory, self.token, bucket, pages, stop),
+            )
+
+        executor = start_pool()
+
+        def submit(shard):
+            if seams is not None and shard in seams:
+                in_flight[shard] = executor.submit(
+                    _crawl_seam, shard, ENTITIES[self.entity], self.params, *seams[shard], self.fields, self.transform
+                )
+                return
+            # recorded before any page arrives, so a resumed job does not skip the shard
+            start = progress.setdefault(shard, shard * self.shard_size)
+            stop_offset = (shard + 1) * self.shard_size
+            in_flight[shard] = executor.submit(
+                _crawl_shard,
+                shard,
+                ENTITIES[self.entity],
+                self.params,
+                start,
+                stop_offset,
+                self.page_size,
+                self.fields,
+                self.transform,
+            )
+
+        def fail(shard, error):
+            attempts[shard] = attempts.get(shard, 0) + 1
+            if attempts[shard] >= self.max_shard_attempts:
+                raise ShardFailed(shard, error)
+            self._stats["retried"] += 1
+            retries.append(shard)
+
+        try:
+            while True:
+                while len(in_flight) < self.processes * 2:
+                    if retries:
+                        submit(retries.pop(0))
+                    elif end is None or next_shard * self.shard_size < end:
+                        submit(next_shard)
+                        next_shard += 1
+                    else:
+                        break
+                if not in_flight:
+                    if seams is None and self.params.get("sort") == "id ASC":
+                        seams = self.__seams(bounds)
+                        retries.extend(seams)
+                        continue
+                    break
+
+                try:
+                    message = pages.get(timeout=0.5)
+                except queue.Empty:
+                    # a worker that died, e.g. killed, never reports its shard and breaks the pool
+                    crashed = [shard for shard, future in in_flight.items() if future.done() and future.exception()]
+                    for shard in crashed:
+                        error = in_flight.pop(shard).exception()
+                        fail(shard, repr(error))
+                        if isinstance(error, BrokenProcessPool) and executor is not None:
+                            executor.shutdown(wait=False)
+                            executor = None
+                    if executor is None:
+                        executor = start_pool()
+                    continue
+
+                kind, shard = message[0], message[1]
+                if kind == _PAGE:
+                    _, _, offset, ids, records = message
+                    self._stats["pages"] += 1
+                    for record_id, record in zip(ids, records):
+                        if record_id is not None:
+                            if record_id in seen:
+                                self._stats["duplicates"] += 1
+                                continue
+                            seen.add(record_id)
+                        self._stats["records"] += 1
+                        yield record
+                    known = [record_id for record_id in ids if record_id is not None]
+                    if known:
+                        head, tail = edges.setdefault(shard, [[], []])
+                        head.extend(known[: _SEAM_WINDOW - len(head)])
+                        tail[:] = (tail + known)[-_SEAM_WINDOW:]
+                    if shard in progress:
+                        progress[shard] = max(progress[shard], offset)
+                        if known:
+                            low, high = bounds.get(shard, (known[0], known[0]))
+                            bounds[shard] = [min(low, *known), max(high, *known)]
+                elif kind == _DONE:
+                    in_flight.pop(shard, None)
+                    if shard in progress:
+                        done.add(shard)
+                        self._stats["shards"] += 1
+                    else:
+                        self._stats["seams"] += 1
+                    if message[2] is not None:
+                        end = message[2] if end is None else min(end, message[2])
+                else:
+                    in_flight.pop(shard, None)
+                    fail(shard, message[2])
+                self.__save_checkpoint(progress, done, end, bounds, edges)
+        finally:
+            self._stats["elapsed"] = time.perf_counter() - started_at
+            stop.set()
+            # workers may be blocked on a full queue, keep draining until they return
+            while any(not future.done() for future in in_flight.values()):
+                try:
+                    pages.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            if executor is not None:
+                executor.shutdown()
+
+        if self.checkpoint_path is not None and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Shards completed, shards retried, seams checked, pages and records received, duplicate
+                records dropped and seconds elapsed in the last run.
+        """
+        return dict(self._stats)
+
+    def __job(self):
+        return {"entity": self.entity, "params": self.params, "shard_size": self.shard_size}
+
+    def __seams(self, bounds: dict):
+        # after the last id of each shard, and before the first id of the next one that read any record
+        shards = sorted(bounds)
+        seams = {}
+        for index, shard in enumerate(shards):
+            before_id = bounds[shards[index + 1]][0] if index + 1 < len(shards) else None
+            seams[f"seam {shard}"] = ((shard + 1) * self.shard_size, bounds[shard][1], before_id, self.page_size)
+        return seams
+
+    def __load_checkpoint(self):
+        empty = {"job": self.__job(), "progress": {}, "done": [], "end": None, "bounds": {}, "edges": {}}
+        if self.checkpoint_path is None:
+            return empty
+        try:
+            with open(self.checkpoint_path) as file:
+                checkpoint = json.load(file)
+        except FileNotFoundError:
+            return empty
+        if checkpoint["job"] != json.loads(json.dumps(self.__job())):
+            raise ValueError(f"Checkpoint {self.checkpoint_path} belongs to another job: {checkpoint['job']}")
+        return checkpoint
+
+    def __save_checkpoint(self, progress: dict, done: set, end: int, bounds: dict, edges: dict):
+        if self.checkpoint_path is None:
+            return
+        checkpoint = {
+            "job": self.__job(),
+            "progress": progress,
+            "done": sorted(done),
+            "end": end,
+            "bounds": bounds,
+            "edges": edges,
+        }
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(checkpoint, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.checkpoint_path)
+
+
+def _shard_key(key: str):
+    # JSON keys are strings, shards are ints and seams are "seam <shard>"
+    return int(key) if key.isdigit() else key
+
+
+def _start_worker(client_factory, token: str, bucket: SharedTokenBucket, pages, stop):
+    global _worker
+    rate_limiter = RateLimiter(bucket=bucket)
+    if client_factory is not None:
+        client = client_factory(rate_limiter)
+    else:
+        from .client import Client
+
+        client = Client(token, rate_limiter=rate_limiter)
+    _worker = (client, pages, stop)
+
+
+def _crawl_shard(
+    shard: int, url_context: str, params: dict, start: int, stop_offset: int, page_size: int, fields, transform
+):
+    # runs in a worker: send each page of [start, stop_offset) back, then where the collection ended, if it did
+    client, pages, stop = _worker
+    try:
+        while start < stop_offset and not stop.is_set():
+            limit = min(page_size, stop_offset - start)
+            page = client.get_page(url_context, {**params, "start": start, "limit": limit})
+            data = page.get("data") or []
+            pagination = (page.get("additional_data") or {}).get("pagination") or {}
+
+            if not pagination.get("more_items_in_collection"):
+                _send_page(pages, shard, start + len(data), data, fields, transform)
+                pages.put((_DONE, shard, start + len(data)))
+                return
+
+            start = pagination.get("next_start", start + limit)
+            _send_page(pages, shard, start, data, fields, transform)
+    except Exception as error:
+        pages.put((_FAILED, shard, repr(error)))
+        return
+    pages.put((_DONE, shard, None))
+
+
+def _crawl_seam(
+    seam: str,
+    url_context: str,
+    params: dict,
+    offset: int,
+    after_id: int,
+    before_id: int,
+    page_size: int,
+    fields,
+    transform,
+):
+    # runs in a worker: the listing is sorted by id, send back the records after after_id and before before_id,
+    # which deletions made during the crawl may have moved before offset
+    client, pages, stop = _worker
+    try:
+        start = max(0, offset - _SEAM_WINDOW)
+        while True:
+            page = client.get_page(url_context, {**params, "start": start, "limit": page_size})
+            data = page.get("data") or []
+            if start == 0 or (data and data[0].get("id") <= after_id):
+                break
+            start = max(0, start - page_size)
+
+        while not stop.is_set():
+            pagination = (page.get("additional_data") or {}).get("pagination") or {}
+            missed = [record for record in data if record.get("id") > after_id]
+            if before_id is not None:
+                missed = [record for record in missed if record.get("id") < before_id]
+            _send_page(pages, seam, None, missed, fields, transform)
+
+            reached = before_id is not None and data and data[-1].get("id") >= before_id
+            if reached or not pagination.get("more_items_in_collection"):
+                break
+            start = pagination.get("next_start", start + len(data))
+            page = client.get_page(url_context, {**params, "start": start, "limit": page_size})
+            data = page.get("data") or []
+    except Exception as error:
+        pages.put((_FAILED, seam, repr(error)))
+        return
+    pages.put((_DONE, seam, None))
+
+
+def _send_page(pages, shard, offset: int, data: list, fields, transform):
+    ids = [record.get("id") for record in data]
+    if fields is not None:
+        data = [project_record(record, fields) for record in data]
+    if transform is not None:
+        data = [transform(record) for record in data]
+    pages.put((_PAGE, shard, offset, ids, data))
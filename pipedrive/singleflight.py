@@ -0,0 +1,76 @@
+import pickle
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "snapshot", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.snapshot = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """SingleFlight()
+
+    Deduplicates concurrent identical calls: while a call for a key is in
+    flight, other callers with the same key wait for it and share its outcome
+    instead of issuing their own request.
+
+    When anyone waits, the leader pickles its result once, before handing it
+    to its own caller, and each follower unpickles its own copy. No caller
+    can mutate what another one received, at a fraction of the cost of a
+    deep copy per caller. Results must be picklable, like parsed JSON.
+    """
+
+    def __init__(self) -> None:
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key, func):
+        """
+        Run func() unless a call with the same key is already in flight, in which
+        case wait for that call and return its result or raise its error.
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return pickle.loads(call.snapshot)
+
+        result = None
+        try:
+            result = func()
+            return result
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            if call.waiters and call.error is None:
+                # taken before the leader returns, as it may mutate its result right after
+                call.snapshot = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+            call.done.set()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Number of calls made and of calls that were served by another in-flight call.
+        """
+        with self._lock:
+            return dict(self._stats)
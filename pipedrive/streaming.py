@@ -0,0 +1,191 @@
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+_NUMBER_END = frozenset(",]} \t\n\r")
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class _Reader:
+    """
+    Incremental reader over an iterable of byte chunks, decoding one JSON
+    value at a time and only keeping the unconsumed part of the body.
+    """
+
+    def __init__(self, chunks) -> None:
+        self.chunks = iter(chunks)
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+
+        if self.position:
+            self.buffer = self.buffer[self.position :]
+            self.position = 0
+
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            self.buffer += self.text_decoder.decode(b"", final=True)
+            return False
+
+        self.buffer += self.text_decoder.decode(chunk)
+        return True
+
+    def peek(self):
+        while True:
+            self.position = _WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed JSON response: expected {char!r}, found {found!r}")
+        self.position += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+
+            # a number is only complete once a delimiter follows it, "12" or "1.5e" may continue in the next chunk
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and not self.eof:
+                if end == len(self.buffer) or self.buffer[end] not in _NUMBER_END:
+                    if self.fill():
+                        continue
+
+            self.position = end
+            return value
+
+
+def iter_data(chunks, others: dict):
+    """
+    Parse a Pipedrive response body incrementally and yield the elements of its
+    data list (or of data["items"] for search endpoints) as soon as each one is
+    complete. Every other member of the body, such as additional_data, is stored
+    in others once parsed.
+
+    Args:
+        chunks (Iterable[bytes]): The raw response body.
+        others (dict): Receives the members of the body that are not streamed.
+
+    Yields:
+        The elements of the data list, one at a time.
+
+    """
+    reader = _Reader(chunks)
+    reader.expect("{")
+
+    while reader.peek() != "}":
+        key = _member_key(reader)
+
+        if key != "data":
+            others[key] = reader.value()
+            continue
+
+        char = reader.peek()
+        if char == "[":
+            yield from _iter_array(reader)
+        elif char == "{":
+            data = others[key] = {}
+            reader.expect("{")
+            while reader.peek() != "}":
+                data_key = _member_key(reader)
+                if data_key == "items" and reader.peek() == "[":
+                    yield from _iter_array(reader)
+                else:
+                    data[data_key] = reader.value()
+            reader.expect("}")
+        else:
+            others[key] = reader.value()
+
+    reader.expect("}")
+
+
+def _member_key(reader: _Reader):
+    if reader.peek() == ",":
+        reader.position += 1
+    key = reader.value()
+    reader.expect(":")
+    return key
+
+
+def _iter_array(reader: _Reader):
+    reader.expect("[")
+    while reader.peek() != "]":
+        if reader.peek() == ",":
+            reader.position += 1
+        yield reader.value()
+    reader.expect("]")
+
+
+class StreamedResponse:
+    """StreamedResponse()
+
+    Iterable returned by Client.get(..., stream=True). Iterating it reads the
+    response body incrementally and yields each element of data as soon as it is
+    parsed, so peak memory is bounded by one record instead of one page.
+    additional_data is available once the iteration is over.
+    """
+
+    def __init__(self, response, record_factory=None, on_finish=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self.response = response
+        self.record_factory = record_factory
+        self.on_finish = on_finish
+        self.chunk_size = chunk_size
+        self.finished = False
+        self._others = {}
+        self._consumed = False
+
+    @property
+    def additional_data(self):
+        """
+        dict: The additional_data block of the response, or None until the data has been consumed.
+        """
+        return self._others.get("additional_data")
+
+    @property
+    def body(self):
+        """
+        dict: Every member of the response body except the streamed records.
+        """
+        return self._others
+
+    def __iter__(self):
+        if self._consumed:
+            raise RuntimeError("A StreamedResponse can only be iterated once")
+        self._consumed = True
+
+        try:
+            for item in iter_data(self.response.iter_content(chunk_size=self.chunk_size), self._others):
+                yield self.record_factory(item) if self.record_factory is not None else item
+            self.finished = True
+        finally:
+            self.close()
+
+    def close(self):
+        self.response.close()
+        if self.on_finish is not None:
+            on_finish, self.on_finish = self.on_finish, None
+            on_finish(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,124 @@
+import threading
+from importlib.util import find_spec
+
+_accept_encoding = None
+
+
+def accept_encoding():
+    """
+    Returns:
+        str: The Accept-Encoding header value of the content codings that requests and aiohttp
+            decode transparently here. Brotli is only offered when brotli or brotlicffi is installed.
+    """
+    global _accept_encoding
+    if _accept_encoding is None:
+        codings = ["gzip", "deflate"]
+        if find_spec("brotli") is not None or find_spec("brotlicffi") is not None:
+            codings.append("br")
+        _accept_encoding = ", ".join(codings)
+    return _accept_encoding
+
+
+class Transport:
+    """Transport()
+
+    Base class for the HTTP layer used by the Client. Subclasses must implement
+    request() and may override close() to release their resources.
+    """
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict = None,
+        params: dict = None,
+        json: dict = None,
+        stream: bool = False,
+    ):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SessionTransport(Transport):
+    """SessionTransport()
+
+    Transport backed by a persistent requests.Session, so TCP and TLS connections
+    are kept alive and reused between calls instead of being opened per request.
+    requests is only imported, and the session built, on the first request.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        pool_block: bool = False,
+    ) -> None:
+        """
+        Args:
+            pool_connections (int, optional): Number of host pools to cache. Default is 10.
+            pool_maxsize (int, optional): Maximum number of connections kept alive per host. Default is 10.
+            connect_timeout (float, optional): Seconds to wait for a connection to be established. Default is 5.0.
+            read_timeout (float, optional): Seconds to wait for the server to send data. Default is 30.0.
+            pool_block (bool, optional): Whether to block when no free connection is available
+                instead of opening a throwaway one. Default is False.
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self.__build_session()
+        return self._session
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict = None,
+        params: dict = None,
+        json: dict = None,
+        stream: bool = False,
+    ):
+        return self.session.request(
+            method=method,
+            url=url,
+            headers=headers,
+            params=params,
+            json=json,
+            stream=stream,
+            timeout=self.timeout,
+        )
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+    def __build_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize, pool_block=self.pool_block
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive"
+        return session
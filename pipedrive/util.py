@@ -1,4 +1,234 @@
 import re
+import threading
+
+from .exceptions import ValidationError
+
+_EMAIL = re.compile(r"[^@]+@[^@]+\.[^@]+")
+_PHONE = re.compile(r"\d+")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_HOUR_MINUTE = re.compile(r"^\d{2}:\d{2}$")
+_DATE_TIME = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+_CURRENCY = re.compile(r"^[A-Z]{3}$")
+
+VISIBLE_TO = frozenset(("1", "3", "5", "7"))
+MARKETING_STATUSES = frozenset(("no_consent", "unsubscribed", "subscribed", "archived"))
+DEAL_STATUSES = frozenset(("open", "won", "lost", "deleted"))
+
+
+def _check_email(email):
+    if not isinstance(email, list):
+        return "Email must be a list of email objects."
+    for email_obj in email:
+        if not isinstance(email_obj, dict) or "value" not in email_obj:
+            return "Email object must be a dictionary with 'value' field."
+        email_value = email_obj["value"]
+        if not isinstance(email_value, str) or _EMAIL.match(email_value) is None:
+            return "Invalid email address."
+    return None
+
+
+def _check_phone(phone):
+    if not isinstance(phone, list):
+        return "Phone must be a list of phone objects."
+    for phone_obj in phone:
+        if not isinstance(phone_obj, dict) or "value" not in phone_obj:
+            return "Phone object must be a dictionary with 'value' field."
+        phone_value = phone_obj["value"]
+        if not isinstance(phone_value, str) or _PHONE.match(phone_value) is None:
+            return "Invalid phone number."
+    return None
+
+
+def _check_visible_to(visible_to):
+    if str(visible_to) not in VISIBLE_TO:
+        return "Invalid value for visible_to. Allowed values are: 1, 3, 5, 7."
+    return None
+
+
+def _check_marketing_status(marketing_status):
+    if marketing_status not in MARKETING_STATUSES:
+        return "Invalid value for marketing_status. Allowed values are: no_consent, unsubscribed, subscribed, archived."
+    return None
+
+
+def _check_deal_status(status):
+    if status not in DEAL_STATUSES:
+        return "Invalid value for status. Allowed values are: open, won, lost, deleted."
+    return None
+
+
+def _pattern_check(pattern, message):
+    match = pattern.match
+
+    def check(value):
+        if not isinstance(value, str) or match(value) is None:
+            return message
+        return None
+
+    return check
+
+
+def _check_id(value):
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        return "Must be a positive integer id."
+    return None
+
+
+def _check_text(value):
+    if not isinstance(value, str) or not value.strip():
+        return "Must be a non-empty string."
+    return None
+
+
+def _check_amount(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return "Must be a number."
+    if isinstance(value, str):
+        try:
+            float(value)
+        except ValueError:
+            return "Must be a number."
+    return None
+
+
+def _check_probability(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 100:
+        return "Must be a number between 0 and 100."
+    return None
+
+
+def _check_flag(value):
+    if value not in (True, False):
+        return "Must be a boolean or 0/1."
+    return None
+
+
+def _check_participants(participants):
+    if not isinstance(participants, list):
+        return "participants must be a list"
+    for participant in participants:
+        if not isinstance(participant, dict) or "person_id" not in participant:
+            return "Invalid participant format. Expected format: [{'person_id': 1, 'primary_flag': True}]"
+    return None
+
+
+def _check_attendees(attendees):
+    if not isinstance(attendees, list):
+        return "attendees must be a list"
+    for attendee in attendees:
+        if not isinstance(attendee, dict) or "email_address" not in attendee:
+            return "Invalid attendee format. Expected format: [{'email_address': 'mail@example.org'}]"
+    return None
+
+
+_check_due_date = _pattern_check(_DATE, "Invalid due_date format. Expected format: YYYY-MM-DD")
+_check_due_time = _pattern_check(_HOUR_MINUTE, "Invalid due_time format. Expected format: HH:MM")
+_check_duration = _pattern_check(_HOUR_MINUTE, "Invalid duration format. Expected format: HH:MM")
+_check_date = _pattern_check(_DATE, "Invalid date format. Expected format: YYYY-MM-DD")
+_check_date_time = _pattern_check(_DATE_TIME, "Invalid date format. Expected format: YYYY-MM-DD HH:MM:SS")
+_check_currency = _pattern_check(_CURRENCY, "Invalid currency. Expected a 3-letter code, e.g. USD")
+
+
+class PayloadSchema:
+    """PayloadSchema()
+
+    Pre-built field table of one resource payload. Fields without a check, such
+    as custom fields, are accepted as they are; None values are skipped since
+    the client drops them before sending.
+    """
+
+    __slots__ = ("resource", "checks", "required")
+
+    def __init__(self, resource: str, checks: dict, required: tuple = ()) -> None:
+        self.resource = resource
+        self.checks = checks
+        self.required = required
+
+    def errors(self, payload: dict, partial: bool = False):
+        """
+        Args:
+            payload (dict): The payload to validate.
+            partial (bool, optional): Skip the required fields check, for updates. Default is False.
+
+        Returns:
+            list[tuple]: Every (field, message) problem of the payload, empty when it is valid.
+        """
+        if not isinstance(payload, dict):
+            return [(None, "Payload must be a dictionary.")]
+
+        errors = []
+        if not partial:
+            for field in self.required:
+                if payload.get(field) is None:
+                    errors.append((field, "This field is required."))
+
+        checks = self.checks
+        for field, value in payload.items():
+            if value is None:
+                continue
+            check = checks.get(field)
+            if check is not None:
+                message = check(value)
+                if message is not None:
+                    errors.append((field, message))
+        return errors
+
+
+SCHEMAS = {
+    "deal": PayloadSchema(
+        "deal",
+        {
+            "title": _check_text,
+            "value": _check_amount,
+            "currency": _check_currency,
+            "user_id": _check_id,
+            "person_id": _check_id,
+            "org_id": _check_id,
+            "pipeline_id": _check_id,
+            "stage_id": _check_id,
+            "status": _check_deal_status,
+            "expected_close_date": _check_date,
+            "probability": _check_probability,
+            "visible_to": _check_visible_to,
+            "add_time": _check_date_time,
+        },
+        required=("title",),
+    ),
+    "person": PayloadSchema(
+        "person",
+        {
+            "name": _check_text,
+            "email": _check_email,
+            "phone": _check_phone,
+            "owner_id": _check_id,
+            "org_id": _check_id,
+            "visible_to": _check_visible_to,
+            "marketing_status": _check_marketing_status,
+            "add_time": _check_date_time,
+        },
+        required=("name",),
+    ),
+    "activity": PayloadSchema(
+        "activity",
+        {
+            "due_date": _check_due_date,
+            "due_time": _check_due_time,
+            "duration": _check_duration,
+            "deal_id": _check_id,
+            "person_id": _check_id,
+            "project_id": _check_id,
+            "org_id": _check_id,
+            "user_id": _check_id,
+            "participants": _check_participants,
+            "attendees": _check_attendees,
+            "busy_flag": _check_flag,
+            "done": _check_flag,
+        },
+        required=("due_date",),
+    ),
+}
 
 
 class Util:
@@ -8,66 +238,102 @@ class Util:
     def check_values_of_dict(self, params: dict):
         return {key: value for key, value in params.items() if value is not None}
 
-    def validate_email(self, email):
-        if not isinstance(email, list):
-            raise ValueError("Email must be a list of email objects.")
+    def validate_payload(self, resource: str, payload: dict, partial: bool = False):
+        """
+        Validate a deal, person or activity payload, reporting every problem at once.
 
-        for email_obj in email:
-            if not isinstance(email_obj, dict) or "value" not in email_obj:
-                raise ValueError("Email object must be a dictionary with 'value' field.")
+        Args:
+            resource (str): One of "deal", "person" or "activity".
+            payload (dict): The payload to validate.
+            partial (bool, optional): Skip the required fields check, for updates. Default is False.
 
-            email_value = email_obj["value"]
-            if not isinstance(email_value, str) or not re.match(r"[^@]+@[^@]+\.[^@]+", email_value):
-                raise ValueError("Invalid email address.")
+        Raises:
+            ValidationError: If the payload has any invalid field.
 
-    def validate_phone(self, phone):
-        if not isinstance(phone, list):
-            raise ValueError("Phone must be a list of phone objects.")
+        """
+        errors = SCHEMAS[resource].errors(payload, partial)
+        if errors:
+            raise ValidationError(errors)
 
-        for phone_obj in phone:
-            if not isinstance(phone_obj, dict) or "value" not in phone_obj:
-                raise ValueError("Phone object must be a dictionary with 'value' field.")
+    def validate_many(self, resource: str, payloads, partial: bool = False):
+        """
+        Validate many payloads of one resource in a single pass, e.g. before a bulk import.
 
-            phone_value = phone_obj["value"]
-            if not isinstance(phone_value, str) or not re.match(r"\d+", phone_value):
-                raise ValueError("Invalid phone number.")
+        Args:
+            resource (str): One of "deal", "person" or "activity".
+            payloads (Iterable[dict]): The payloads to validate.
+            partial (bool, optional): Skip the required fields check, for updates. Default is False.
+
+        Returns:
+            dict: The (field, message) errors of each invalid payload, by its index. Valid payloads are left out.
+
+        """
+        errors_of = SCHEMAS[resource].errors
+        invalid = {}
+        for index, payload in enumerate(payloads):
+            errors = errors_of(payload, partial)
+            if errors:
+                invalid[index] = errors
+        return invalid
+
+    def validate_email(self, email):
+        _raise_on(_check_email(email))
+
+    def validate_phone(self, phone):
+        _raise_on(_check_phone(phone))
 
     def validate_visible_to(self, visible_to):
-        valid_values = ["1", "3", "5", "7"]
-        if visible_to not in valid_values:
-            raise ValueError("Invalid value for visible_to. Allowed values are: 1, 3, 5, 7.")
+        _raise_on(_check_visible_to(visible_to))
 
     def validate_marketing_status(self, marketing_status):
-        valid_values = ["no_consent", "unsubscribed", "subscribed", "archived"]
-        if marketing_status not in valid_values:
-            raise ValueError(
-                "Invalid value for marketing_status. Allowed values are: no_consent, unsubscribed, subscribed, archived."
-            )
+        _raise_on(_check_marketing_status(marketing_status))
 
     def validate_due_date(self, due_date):
-        if not re.match(r"^\d{4}-\d{2}-\d{2}$", due_date):
-            raise ValueError("Invalid due_date format. Expected format: YYYY-MM-DD")
+        _raise_on(_check_due_date(due_date))
 
     def validate_due_time(self, due_time):
-        if not re.match(r"^\d{2}:\d{2}$", due_time):
-            raise ValueError("Invalid due_time format. Expected format: HH:MM")
+        _raise_on(_check_due_time(due_time))
 
     def validate_duration(self, duration):
-        if not re.match(r"^\d{2}:\d{2}$", duration):
-            raise ValueError("Invalid duration format. Expected format: HH:MM")
+        _raise_on(_check_duration(duration))
 
     def validate_participants(self, participants):
-        if not isinstance(participants, list):
-            raise ValueError("participants must be a list")
-        for participant in participants:
-            if not isinstance(participant, dict) or "person_id" not in participant:
-                raise ValueError(
-                    "Invalid participant format. Expected format: [{'person_id': 1, 'primary_flag': True}]"
-                )
+        _raise_on(_check_participants(participants))
 
     def validate_attendees(self, attendees):
-        if not isinstance(attendees, list):
-            raise ValueError("attendees must be a list")
-        for attendee in attendees:
-            if not isinstance(attendee, dict) or "email_address" not in attendee:
-                raise ValueError("Invalid attendee format. Expected format: [{'email_address': 'mail@example.org'}]")
+        _raise_on(_check_attendees(attendees))
+
+
+# Util is stateless, every resource of every client uses this one instance
+SHARED_UTIL = Util()
+
+
+class lazy_attribute:
+    """lazy_attribute()
+
+    Decorator computing an attribute on first access and storing it on the
+    instance, so later reads are plain attribute lookups. Works like
+    functools.cached_property, which requires Python 3.8. The first access is
+    made under a lock, so threads sharing an instance all get the same value.
+    """
+
+    def __init__(self, factory) -> None:
+        self.factory = factory
+        self.name = factory.__name__
+        self.__doc__ = factory.__doc__
+        self.lock = threading.Lock()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with self.lock:
+            # another thread may have stored the value while this one was waiting
+            value = instance.__dict__.get(self.name, self)
+            if value is self:
+                value = instance.__dict__[self.name] = self.factory(instance)
+        return value
+
+
+def _raise_on(message):
+    if message is not None:
+        raise ValueError(message)
@@ -0,0 +1,515 @@
+"""
+Pipedrive webhooks for deals, persons and activities, applied to a local
+EntityStore.
+
+Limitation: records delivered by webhooks are never served as API responses.
+A v1 webhook carries related objects as bare ids, e.g. "person_id": 7, where
+GET /deals/{id} returns {"value": 7, "name": ..., "email": [...], ...}, and
+the name, emails and phones are not part of the payload, so the API shape
+cannot be rebuilt from it without fetching the related records. v2 webhooks
+use the field names of the v2 API. A Client given an EntityStore therefore
+only serves the records it fetched itself; a webhook event replaces such a
+record, and the next GET fetches it again. The webhook records stay
+available to handlers and through EntityStore.get(..., source="webhook").
+"""
+
+import base64
+import calendar
+import hmac
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from logging import Logger
+
+from .constants import API, WEBHOOK
+
+ENTITIES = ("deal", "person", "activity")
+
+CREATE = "create"
+CHANGE = "change"
+DELETE = "delete"
+
+# v1 actions are past tense verbs, v2 ones are already create, change and delete
+_ACTIONS = {"added": CREATE, "updated": CHANGE, "merged": CHANGE, "deleted": DELETE}
+
+
+class WebhookEvent:
+    """WebhookEvent()
+
+    One deal, person or activity webhook delivery, v1 or v2, reduced to what is
+    needed to apply it: the entity, the action ("create", "change" or
+    "delete"), the id, the record after the change, and the time of the change
+    in epoch seconds.
+    """
+
+    __slots__ = ("entity", "action", "id", "data", "previous", "timestamp", "key", "version")
+
+    def __init__(
+        self,
+        entity: str,
+        action: str,
+        id: int,
+        data: dict,
+        previous: dict,
+        timestamp: float,
+        key: tuple,
+        version: int,
+    ) -> None:
+        self.entity = entity
+        self.action = action
+        self.id = id
+        self.data = data
+        self.previous = previous
+        self.timestamp = timestamp
+        self.key = key
+        self.version = version
+
+    def __repr__(self):
+        return f"WebhookEvent(entity={self.entity!r}, action={self.action!r}, id={self.id!r})"
+
+
+def parse_event(payload: dict):
+    """
+    Parse a Pipedrive webhook payload, v1 or v2.
+
+    Args:
+        payload (dict): The decoded request body.
+
+    Returns:
+        WebhookEvent: The event, or None if it is not about a deal, a person or an activity.
+
+    Raises:
+        ValueError: If the payload is not a Pipedrive webhook.
+
+    """
+    meta = payload.get("meta") if isinstance(payload, dict) else None
+    if not isinstance(meta, dict):
+        raise ValueError("Invalid webhook payload, it has no meta block")
+
+    if "entity" in meta:
+        return _parse_v2(payload, meta)
+    return _parse_v1(payload, meta)
+
+
+def _parse_v1(payload: dict, meta: dict):
+    entity = meta.get("object")
+    if entity not in ENTITIES:
+        return None
+
+    data = payload.get("current") or None
+    previous = payload.get("previous") or None
+    action = _ACTIONS.get(meta.get("action"), CHANGE)
+    record_id = meta.get("id") or (data or previous or {}).get("id")
+    if meta.get("timestamp_micro"):
+        timestamp = int(meta["timestamp_micro"]) / 1e6
+    else:
+        timestamp = float(meta.get("timestamp") or 0)
+
+    if record_id is None:
+        raise ValueError(f"Invalid webhook payload, the {entity} has no id")
+
+    # v1 deliveries have no event id, but a retry repeats the same meta block
+    key = (entity, record_id, action, meta.get("timestamp_micro") or meta.get("timestamp"))
+    return WebhookEvent(entity, action, int(record_id), data, previous, timestamp, key, 1)
+
+
+def _parse_v2(payload: dict, meta: dict):
+    entity = meta.get("entity")
+    if entity not in ENTITIES:
+        return None
+
+    data = payload.get("data") or None
+    previous = payload.get("previous") or None
+    action = _ACTIONS.get(meta.get("action"), meta.get("action"))
+    record_id = meta.get("entity_id") or (data or previous or {}).get("id")
+    if record_id is None:
+        raise ValueError(f"Invalid webhook payload, the {entity} has no id")
+    timestamp = _iso_timestamp(meta.get("timestamp"))
+
+    key = meta.get("id") or (entity, record_id, action, meta.get("timestamp"))
+    return WebhookEvent(entity, action, int(record_id), data, previous, timestamp, key, 2)
+
+
+def _iso_timestamp(value: str):
+    if not value:
+        return 0.0
+    # datetime.fromisoformat only exists from Python 3.7 on, and does not accept the Z suffix before 3.11
+    value = value.replace("Z", "")
+    layout = "%Y-%m-%dT%H:%M:%S.%f" if "." in value else "%Y-%m-%dT%H:%M:%S"
+    return datetime.strptime(value[:26], layout).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _update_time(record: dict):
+    # update_time is "YYYY-MM-DD HH:MM:SS" in UTC
+    update_time = record.get("update_time")
+    if not update_time:
+        return 0.0
+    return float(calendar.timegm(time.strptime(update_time, "%Y-%m-%d %H:%M:%S")))
+
+
+class StoredRecord:
+    """StoredRecord()
+
+    A record kept by the EntityStore, serialized so callers can never mutate the
+    stored copy. A deleted record is kept as a tombstone with no body, so that
+    older events arriving late cannot bring it back.
+    """
+
+    __slots__ = ("body", "timestamp", "source", "version", "stored_at")
+
+    def __init__(self, body: bytes, timestamp: float, source: str, version: int) -> None:
+        self.body = body
+        self.timestamp = timestamp
+        self.source = source
+        self.version = version
+        self.stored_at = time.monotonic()
+
+
+class EntityStore:
+    """EntityStore()
+
+    Local copy of the deals, persons and activities an application follows,
+    kept current by webhook events instead of polling. A Client given the store
+    serves GETs of single records from it and fills it with the records it
+    fetches.
+
+    Each record remembers the time of the change it reflects. An event older
+    than the stored record is ignored, so events delivered out of order cannot
+    roll a record back.
+
+    Records are kept as delivered. v1 webhooks carry related objects such as
+    person_id as bare ids where the API returns objects, and v2 webhooks use the
+    field names of the v2 API, so the Client only serves the records it fetched
+    itself. A webhook event still replaces such a record, and the next GET
+    fetches the changed record again.
+    """
+
+    def __init__(self, max_age: float = 300) -> None:
+        """
+        Args:
+            max_age (float, optional): Seconds after which a record fetched from the API is no longer
+                served, in case a change was made without a webhook delivery. Records delivered by webhooks
+                are served until changed. None serves every record until changed. Default is 300.
+        """
+        self.max_age = max_age
+        self._records = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "applied": 0, "stale": 0, "filled": 0}
+
+    def get(self, entity: str, id: int, version: int = None, source: str = None):
+        """
+        Args:
+            entity (str): One of "deal", "person" or "activity".
+            id (int): The ID of the record.
+            version (int, optional): Only return the record if it came from the API or a
+                webhook of this version. Default is None, any.
+            source (str, optional): Only return the record if it came from this source, "api" or
+                "webhook". Default is None, any.
+
+        Returns:
+            dict: A copy of the record, or None if it is unknown, deleted, too old, of another version or
+            from another source.
+        """
+        with self._lock:
+            stored = self._records.get((entity, int(id)))
+            if stored is None or stored.body is None or not self.__servable(stored, version, source):
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+        return json.loads(stored.body)
+
+    def apply(self, event: WebhookEvent):
+        """
+        Apply a webhook event, unless the stored record is newer.
+
+        Returns:
+            bool: Whether the event was applied.
+        """
+        body = None
+        if event.action != DELETE and event.data is not None:
+            body = json.dumps(event.data, separators=(",", ":")).encode()
+        # a repeated delivery of the same change is applied again, since a handler may have failed on it
+        return self.__store(event.entity, event.id, body, event.timestamp, WEBHOOK, event.version)
+
+    def fill(self, entity: str, record: dict):
+        """
+        Store a record fetched from the API, unless a webhook already delivered a later change.
+
+        Returns:
+            bool: Whether the record was stored.
+        """
+        if not record or record.get("id") is None:
+            return False
+        body = json.dumps(record, separators=(",", ":")).encode()
+        stored = self.__store(entity, record["id"], body, _update_time(record), API, 1)
+        if stored:
+            with self._lock:
+                self._stats["filled"] += 1
+        return stored
+
+    def forget(self, entity: str, id: int):
+        """
+        Drop a record, tombstone included.
+        """
+        with self._lock:
+            self._records.pop((entity, int(id)), None)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hits, misses, applied and stale events, records filled from the API and current size.
+        """
+        with self._lock:
+            return {**self._stats, "size": len(self._records)}
+
+    def __contains__(self, key: tuple):
+        entity, id = key
+        with self._lock:
+            stored = self._records.get((entity, int(id)))
+            return stored is not None and stored.body is not None
+
+    def __len__(self):
+        return len(self._records)
+
+    def __store(self, entity: str, id: int, body: bytes, timestamp: float, source: str, version: int):
+        key = (entity, int(id))
+        with self._lock:
+            current = self._records.get(key)
+            if current is not None:
+                current_timestamp = current.timestamp
+                if source == API:
+                    # update_time only has second precision, so an API record replaces a webhook one of the same
+                    # second, otherwise the record changed by the webhook could never be served again
+                    current_timestamp = float(int(current_timestamp))
+                if timestamp < current_timestamp:
+                    if source == WEBHOOK:
+                        self._stats["stale"] += 1
+                    return False
+            self._records[key] = StoredRecord(body, timestamp, source, version)
+            if source == WEBHOOK:
+                self._stats["applied"] += 1
+        return True
+
+    def __servable(self, stored: StoredRecord, version: int, source: str):
+        if source is not None and stored.source != source:
+            return False
+        if version is not None and stored.source == WEBHOOK and stored.version != version:
+            return False
+        if stored.source == WEBHOOK or self.max_age is None:
+            return True
+        return time.monotonic() - stored.stored_at < self.max_age
+
+
+class WebhookReceiver:
+    """WebhookReceiver()
+
+    Receives Pipedrive webhooks for deals, persons and activities. Usable as a
+    WSGI application, or as an ASGI one through its asgi method, and directly
+    through handle() for payloads received by other means or recorded earlier.
+
+    Each event is parsed, dropped if it is a repeated delivery or older than the
+    stored record, applied to the EntityStore and then passed to the handlers
+    registered for it. When a handler fails the request is answered with a 500,
+    so Pipedrive delivers the event again.
+    """
+
+    def __init__(
+        self,
+        store: EntityStore = None,
+        username: str = None,
+        password: str = None,
+        max_seen_events: int = 10000,
+        logger: Logger = logging,
+    ) -> None:
+        """
+        Args:
+            store (EntityStore, optional): Where events are applied. Default is a new EntityStore.
+            username (str, optional): HTTP basic auth user configured on the webhook. Default is None, no auth.
+            password (str, optional): HTTP basic auth password configured on the webhook. Default is None.
+            max_seen_events (int, optional): Number of recent events remembered to drop repeated
+                deliveries. Default is 10000.
+            logger (Logger, optional): Logger used for event logs. Default is the logging module.
+        """
+        self.store = store if store is not None else EntityStore()
+        self.max_seen_events = max_seen_events
+        self.logger = logger
+        self._authorization = None
+        if username is not None:
+            credentials = base64.b64encode(f"{username}:{password or ''}".encode()).decode()
+            self._authorization = f"Basic {credentials}"
+        self._handlers = []
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"received": 0, "duplicates": 0, "stale": 0, "ignored": 0, "handled": 0, "failed": 0}
+
+    def on(self, entity: str = None, action: str = None):
+        """
+        Decorator registering a handler, called with each applied WebhookEvent.
+
+        Args:
+            entity (str, optional): Only events of this entity. Default is None, every entity.
+            action (str, optional): Only events of this action, "create", "change" or "delete".
+                Default is None, every action.
+        """
+
+        def register(handler):
+            self.add_handler(handler, entity, action)
+            return handler
+
+        return register
+
+    def add_handler(self, handler, entity: str = None, action: str = None):
+        self._handlers.append((entity, action, handler))
+
+    def handle(self, payload: dict):
+        """
+        Process one webhook payload.
+
+        Returns:
+            WebhookEvent: The applied event, or None if it was ignored, repeated or stale.
+
+        Raises:
+            ValueError: If the payload is not a Pipedrive webhook.
+
+        """
+        return self.__handle_event(parse_event(payload))
+
+    def __handle_event(self, event: WebhookEvent):
+        with self._lock:
+            self._stats["received"] += 1
+            if event is None:
+                self._stats["ignored"] += 1
+                return None
+            if event.key in self._seen:
+                self._stats["duplicates"] += 1
+                return None
+
+        if not self.store.apply(event):
+            self.logger.debug(
+                'Stale webhook event ignored', extra={'entity': event.entity, 'entity_id': event.id}
+            )
+            with self._lock:
+                self._stats["stale"] += 1
+            return None
+
+        try:
+            for entity, action, handler in self._handlers:
+                if (entity is None or entity == event.entity) and (action is None or action == event.action):
+                    handler(event)
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+
+        with self._lock:
+            # only remembered once handled, so a delivery that failed can be retried
+            self._seen[event.key] = True
+            while len(self._seen) > self.max_seen_events:
+                self._seen.popitem(last=False)
+            self._stats["handled"] += 1
+        return event
+
+    def replay(self, payloads):
+        """
+        Process recorded payloads in order, e.g. to rebuild the store or to test handlers.
+
+        Args:
+            payloads (Iterable[dict] | str): The payloads, or the path of a file with one JSON payload per line.
+
+        Returns:
+            list[WebhookEvent]: The applied events.
+        """
+        if isinstance(payloads, str):
+            with open(payloads, encoding="utf-8") as file:
+                payloads = [json.loads(line) for line in file if line.strip()]
+
+        events = []
+        for payload in payloads:
+            event = self.handle(payload)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def stats(self):
+        """
+        Returns:
+            dict: Events received, repeated, stale, of other entities, handled and whose handlers failed.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def __call__(self, environ, start_response):
+        body = b""
+        if environ.get("REQUEST_METHOD") == "POST":
+            try:
+                length = int(environ.get("CONTENT_LENGTH") or 0)
+            except ValueError:
+                length = 0
+            body = environ["wsgi.input"].read(length) if length else b""
+
+        status, reply = self.__respond(environ.get("REQUEST_METHOD"), environ.get("HTTP_AUTHORIZATION"), body)
+        start_response(status, [("Content-Type", "application/json"), ("Content-Length", str(len(reply)))])
+        return [reply]
+
+    async def asgi(self, scope, receive, send):
+        """
+        ASGI 3 application. Handlers run on the event loop, so they should not block.
+        """
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        headers = dict(scope.get("headers") or [])
+        authorization = headers.get(b"authorization")
+        status, reply = self.__respond(
+            scope.get("method"), authorization.decode("latin-1") if authorization else None, body
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": int(status.split(" ", 1)[0]),
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(reply)).encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": reply})
+
+    def __respond(self, method: str, authorization: str, body: bytes):
+        if method != "POST":
+            return "405 Method Not Allowed", b'{"success":false}'
+
+        if self._authorization is not None and not hmac.compare_digest(authorization or "", self._authorization):
+            return "401 Unauthorized", b'{"success":false}'
+
+        try:
+            event = parse_event(json.loads(body))
+        except ValueError:
+            self.logger.warning('Invalid webhook payload received')
+            return "400 Bad Request", b'{"success":false}'
+
+        try:
+            self.__handle_event(event)
+        except Exception:
+            self.logger.exception('Webhook handler failed')
+            return "500 Internal Server Error", b'{"success":false}'
+        return "200 OK", b'{"success":true}'
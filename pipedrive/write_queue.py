@@ -0,0 +1,424 @@
+import json
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+from .exceptions import BadRequest, Forbidden, NotFound, Unauthorized
+from .rate_limit import RetryPolicy
+from .util import SHARED_UTIL
+
+CREATE = "create"
+UPDATE = "update"
+
+PENDING = "pending"
+FAILED = "failed"
+
+# errors that will not go away by sending the same write again; anything else, e.g. a 429 the client
+# gave up on, a 5xx or a dropped connection, is retried
+PERMANENT_ERRORS = (BadRequest, Unauthorized, Forbidden, NotFound, TypeError, ValueError)
+
+
+class QueuedWrite:
+    """QueuedWrite()
+
+    One activity write waiting in, or delivered by, an ActivityWriteQueue.
+    Once delivered, result holds the API response; once given up on, error
+    holds the last exception.
+    """
+
+    __slots__ = ("id", "op", "activity_id", "payload", "attempts", "result", "error", "futures")
+
+    def __init__(self, id: int, op: str, activity_id: int, payload: dict, attempts: int = 0) -> None:
+        self.id = id
+        self.op = op
+        self.activity_id = activity_id
+        self.payload = payload
+        self.attempts = attempts
+        self.result = None
+        self.error = None
+        self.futures = []
+
+    def __repr__(self):
+        return f"QueuedWrite(id={self.id!r}, op={self.op!r}, activity_id={self.activity_id!r})"
+
+
+class ActivityWriteQueue:
+    """ActivityWriteQueue()
+
+    Write-behind queue for activity creations and updates. create() and
+    update() only validate the write and append it to a local sqlite journal,
+    then return a Future at once. Worker threads deliver the writes in the
+    background through the client, so they share its rate limiter, and retry
+    transient failures with backoff.
+
+    An update to an activity that still has an update waiting is merged into
+    it, so only one request carries both. Updates to the same activity are
+    delivered in order. Writes left in the journal by a previous process are
+    resumed on start. Delivery is at-least-once: a creation interrupted after
+    the server processed it is sent again.
+
+    Writes given up on stay in the journal as failed until they are sent
+    again with retry_failed() or dropped with purge_failed().
+    """
+
+    def __init__(
+        self,
+        client,
+        journal_path: str,
+        max_workers: int = 4,
+        retry_policy: RetryPolicy = None,
+        on_complete=None,
+    ) -> None:
+        """
+        Args:
+            client (Client): The client used to perform the requests.
+            journal_path (str): The sqlite file journaling the pending writes, so they survive a crash or
+                restart. ":memory:" gives a journal that is lost with the process.
+            max_workers (int, optional): Number of writes delivered concurrently. Default is 4.
+            retry_policy (RetryPolicy, optional): Attempts and backoff of transient failures.
+                Default is RetryPolicy(max_retries=5).
+            on_complete (callable, optional): Called with the QueuedWrite once it is delivered or given up on,
+                including writes resumed from the journal, which have no Future. Default is None.
+        """
+        self.client = client
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=5)
+        self.on_complete = on_complete
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._queue = queue.Queue()
+        self._waiting_updates = {}
+        self._in_flight_ids = set()
+        # writes with futures that are neither delivered nor given up on
+        self._unresolved = set()
+        self._unfinished = 0
+        self._closed = False
+        self._stopping = threading.Event()
+        self._stats = {"queued": 0, "merged": 0, "delivered": 0, "failed": 0, "retried": 0}
+
+        self._journal = sqlite3.connect(journal_path, check_same_thread=False, isolation_level=None)
+        self._journal.execute("PRAGMA journal_mode=WAL")
+        self._journal.execute(
+            "CREATE TABLE IF NOT EXISTS activity_writes ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, op TEXT NOT NULL, activity_id INTEGER, payload TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0, status TEXT NOT NULL, error TEXT)"
+        )
+        self.__resume()
+
+        self._workers = [
+            threading.Thread(target=self.__work, name=f"activity-write-{index}", daemon=True)
+            for index in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def create(self, **fields):
+        """
+        Queue the creation of an activity.
+
+        Args:
+            **fields: Keyword arguments of Activity.create_activity.
+
+        Returns:
+            Future: Resolves to the created activity, or to the error once the write is given up on.
+
+        Raises:
+            ValidationError: If any field is invalid and the client validates payloads.
+
+        """
+        if self.client.validate_payloads:
+            SHARED_UTIL.validate_payload("activity", fields)
+
+        with self._lock:
+            self.__check_open()
+            write = self.__journal(CREATE, None, fields)
+            future = Future()
+            write.futures.append(future)
+            self._unresolved.add(write)
+            self.__enqueue(write)
+        return future
+
+    def update(self, activity_id: int, **fields):
+        """
+        Queue an update of an activity, merged into its waiting update if there is one.
+
+        Fields set to None are left out, as update_activity does: they leave the field unchanged and
+        never erase a value merged from an earlier update.
+
+        Args:
+            activity_id (int): The ID of the activity to update.
+            **fields: Keyword arguments of Activity.update_activity.
+
+        Returns:
+            Future: Resolves to the updated activity, or to the error once the write is given up on.
+
+        Raises:
+            ValidationError: If any field is invalid and the client validates payloads.
+
+        """
+        if self.client.validate_payloads:
+            SHARED_UTIL.validate_payload("activity", fields, partial=True)
+        fields = {key: value for key, value in fields.items() if value is not None}
+
+        future = Future()
+        with self._lock:
+            self.__check_open()
+            write = self._waiting_updates.get(activity_id)
+            if write is not None:
+                write.payload.update(fields)
+                self._journal.execute(
+                    "UPDATE activity_writes SET payload = ? WHERE id = ?", (json.dumps(write.payload), write.id)
+                )
+                self._stats["merged"] += 1
+            else:
+                write = self.__journal(UPDATE, activity_id, fields)
+                self._waiting_updates[activity_id] = write
+                if activity_id not in self._in_flight_ids:
+                    self.__enqueue(write)
+                else:
+                    # queued once the update in flight is done, so updates of one activity stay in order
+                    self._unfinished += 1
+            write.futures.append(future)
+            self._unresolved.add(write)
+        return future
+
+    def flush(self, timeout: float = None):
+        """
+        Wait until every queued write is delivered or given up on.
+
+        Returns:
+            bool: False if the timeout expired first.
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def close(self, timeout: float = None):
+        """
+        Stop accepting writes, wait for the queued ones and stop the workers. Writes
+        still pending after the timeout stay in the journal, and the next queue opened
+        on it sends them again. Their futures are cancelled, since this queue will
+        not resolve them.
+        """
+        with self._lock:
+            self._closed = True
+        self.flush(timeout)
+        self._stopping.set()
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            # a worker stops retrying once stopping is set, so this only waits for requests in flight
+            worker.join()
+        self._journal.close()
+
+        with self._lock:
+            unresolved, self._unresolved = self._unresolved, set()
+        for write in unresolved:
+            for future in write.futures:
+                future.cancel()
+
+    def failed_writes(self):
+        """
+        Returns:
+            list[QueuedWrite]: The writes given up on, as kept in the journal, with their last error.
+        """
+        with self._lock:
+            rows = self.__failed_rows()
+        writes = []
+        for id, op, activity_id, payload, attempts, error in rows:
+            write = QueuedWrite(id, op, activity_id, json.loads(payload), attempts)
+            write.error = error
+            writes.append(write)
+        return writes
+
+    def retry_failed(self, ids=None):
+        """
+        Queue writes given up on again, with a fresh retry budget. A retried update is merged under
+        the waiting update of its activity, if there is one, so the newer values win.
+
+        Args:
+            ids (Iterable[int], optional): The ids of the QueuedWrites to retry. Default is None, every
+                failed write.
+
+        Returns:
+            int: Number of writes queued again. They have no Future, see on_complete.
+        """
+        with self._lock:
+            self.__check_open()
+            rows = self.__failed_rows(ids)
+            for id, op, activity_id, payload, _, _ in rows:
+                self._journal.execute(
+                    "UPDATE activity_writes SET status = ?, attempts = 0, error = NULL WHERE id = ?", (PENDING, id)
+                )
+                write = QueuedWrite(id, op, activity_id, json.loads(payload))
+                if op == UPDATE and activity_id in self._waiting_updates:
+                    self.__merge_under(self._waiting_updates[activity_id], write)
+                    continue
+                if op == UPDATE:
+                    self._waiting_updates[activity_id] = write
+                    if activity_id in self._in_flight_ids:
+                        self._unfinished += 1
+                        continue
+                self.__enqueue(write)
+        return len(rows)
+
+    def purge_failed(self, ids=None):
+        """
+        Delete writes given up on from the journal.
+
+        Args:
+            ids (Iterable[int], optional): The ids of the QueuedWrites to delete. Default is None, every
+                failed write.
+
+        Returns:
+            int: Number of writes deleted.
+        """
+        with self._lock:
+            rows = self.__failed_rows(ids)
+            self._journal.executemany("DELETE FROM activity_writes WHERE id = ?", [(row[0],) for row in rows])
+        return len(rows)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Number of writes queued, merged into a waiting update, delivered, failed and retried,
+                and of writes not finished yet.
+        """
+        with self._lock:
+            return {**self._stats, "pending": self._unfinished}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __check_open(self):
+        if self._closed:
+            raise RuntimeError("The write queue is closed")
+
+    def __failed_rows(self, ids=None):
+        rows = self._journal.execute(
+            "SELECT id, op, activity_id, payload, attempts, error FROM activity_writes WHERE status = ? ORDER BY id",
+            (FAILED,),
+        ).fetchall()
+        if ids is not None:
+            ids = set(ids)
+            rows = [row for row in rows if row[0] in ids]
+        return rows
+
+    def __merge_under(self, waiting: QueuedWrite, write: QueuedWrite):
+        # write is older than waiting, so the values of waiting win
+        waiting.payload = {**write.payload, **waiting.payload}
+        self._journal.execute("DELETE FROM activity_writes WHERE id = ?", (write.id,))
+        self._journal.execute(
+            "UPDATE activity_writes SET payload = ? WHERE id = ?", (json.dumps(waiting.payload), waiting.id)
+        )
+
+    def __journal(self, op: str, activity_id: int, payload: dict):
+        cursor = self._journal.execute(
+            "INSERT INTO activity_writes (op, activity_id, payload, status) VALUES (?, ?, ?, ?)",
+            (op, activity_id, json.dumps(payload), PENDING),
+        )
+        self._stats["queued"] += 1
+        return QueuedWrite(cursor.lastrowid, op, activity_id, dict(payload))
+
+    def __enqueue(self, write: QueuedWrite):
+        self._unfinished += 1
+        self._queue.put(write)
+
+    def __resume(self):
+        rows = self._journal.execute(
+            "SELECT id, op, activity_id, payload, attempts FROM activity_writes WHERE status = ? ORDER BY id",
+            (PENDING,),
+        ).fetchall()
+        for id, op, activity_id, payload, attempts in rows:
+            write = QueuedWrite(id, op, activity_id, json.loads(payload), attempts)
+            if op == UPDATE and activity_id in self._waiting_updates:
+                waiting = self._waiting_updates[activity_id]
+                waiting.payload.update(write.payload)
+                self._journal.execute("DELETE FROM activity_writes WHERE id = ?", (id,))
+                self._journal.execute(
+                    "UPDATE activity_writes SET payload = ? WHERE id = ?", (json.dumps(waiting.payload), waiting.id)
+                )
+                continue
+            if op == UPDATE:
+                self._waiting_updates[activity_id] = write
+            self.__enqueue(write)
+
+    def __work(self):
+        while True:
+            write = self._queue.get()
+            if write is None or self._stopping.is_set():
+                return
+
+            with self._lock:
+                if write.op == UPDATE:
+                    if self._waiting_updates.get(write.activity_id) is write:
+                        del self._waiting_updates[write.activity_id]
+                    self._in_flight_ids.add(write.activity_id)
+                payload = dict(write.payload)
+
+            self.__deliver(write, payload)
+
+            with self._lock:
+                if write.op == UPDATE:
+                    self._in_flight_ids.discard(write.activity_id)
+                    waiting = self._waiting_updates.get(write.activity_id)
+                    if waiting is not None:
+                        self._queue.put(waiting)
+                self._unfinished -= 1
+                self._idle.notify_all()
+
+    def __deliver(self, write: QueuedWrite, payload: dict):
+        activity = self.client.activity
+        while True:
+            write.attempts += 1
+            try:
+                if write.op == CREATE:
+                    write.result = activity.create_activity(**payload)
+                else:
+                    write.result = activity.update_activity(write.activity_id, **payload)
+            except Exception as error:
+                write.error = error
+                if isinstance(error, PERMANENT_ERRORS) or write.attempts > self.retry_policy.max_retries:
+                    self.__finish(write, FAILED)
+                    return
+                with self._lock:
+                    self._stats["retried"] += 1
+                    self._journal.execute(
+                        "UPDATE activity_writes SET attempts = ? WHERE id = ?", (write.attempts, write.id)
+                    )
+                if self._stopping.wait(self.retry_policy.delay(write.attempts)):
+                    # left pending in the journal for the next start
+                    return
+                continue
+
+            write.error = None
+            self.__finish(write, None)
+            return
+
+    def __finish(self, write: QueuedWrite, status: str):
+        with self._lock:
+            if status == FAILED:
+                self._stats["failed"] += 1
+                self._journal.execute(
+                    "UPDATE activity_writes SET status = ?, attempts = ?, error = ? WHERE id = ?",
+                    (FAILED, write.attempts, repr(write.error), write.id),
+                )
+            else:
+                self._stats["delivered"] += 1
+                self._journal.execute("DELETE FROM activity_writes WHERE id = ?", (write.id,))
+            self._unresolved.discard(write)
+            futures = list(write.futures)
+
+        for future in futures:
+            if write.error is not None:
+                future.set_exception(write.error)
+            else:
+                future.set_result(write.result)
+
+        if self.on_complete is not None:
+            try:
+                self.on_complete(write)
+            except Exception:
+                self.client.logger.exception('Write queue callback failed')
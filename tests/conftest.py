@@ -0,0 +1,59 @@
+import pytest
+
+from benchmarks.fake_server import FakePipedrive, FakeServer
+from pipedrive.client import Client
+from pipedrive.instrumentation import RequestHook
+from pipedrive.rate_limit import RateLimiter
+
+
+def _unthrottled():
+    return RateLimiter(requests_per_window=10**9, window=1.0)
+
+
+class RequestRecorder(RequestHook):
+    """RequestRecorder()
+
+    Records the requests a client sent to the server, leaving out those served from its cache.
+    """
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def after_response(self, event):
+        if not event.from_cache:
+            self.sent.append((event.method, event.url_context))
+
+    def on_error(self, event, error):
+        self.sent.append((event.method, event.url_context))
+
+
+@pytest.fixture
+def api():
+    return FakePipedrive(deals=50, persons=20, activities=30)
+
+
+@pytest.fixture
+def server(api):
+    with FakeServer(api=api) as server:
+        yield server
+
+
+@pytest.fixture
+def make_client(server):
+    clients = []
+
+    def make_client(token: str = "token", **options):
+        options.setdefault("rate_limiter", _unthrottled())
+        client = Client(token, **options)
+        client.base_url = server.base_url
+        clients.append(client)
+        return client
+
+    yield make_client
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client()
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from pipedrive.async_client import AsyncClient
+
+
+def test_stream_is_rejected():
+    async def run():
+        client = AsyncClient("token")
+        try:
+            with pytest.raises(ValueError):
+                await client.deal.get_activities_associated_with_deal(1, stream=True)
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+
+
+def test_deal_fields_are_read_past_the_first_page(api, server):
+    for index in range(150):
+        api.deal_fields.append({"id": 1000 + index, "key": f"extra{index}", "name": f"Extra {index}"})
+
+    async def run():
+        client = AsyncClient("token")
+        client.base_url = server.base_url
+        try:
+            return await client.deal_field.get_deal_field_by_key("extra149")
+        finally:
+            await client.close()
+
+    assert asyncio.run(run())["name"] == "Extra 149"
@@ -0,0 +1,16 @@
+def test_bulk_update_changes_only_the_given_fields(api, client):
+    api.activities[1]["done"] = 1
+    api.activities[2]["done"] = 1
+
+    results = client.activity.bulk_update(
+        [
+            {"activity_id": 1, "subject": "Call back"},
+            {"activity_id": 2, "done": False, "note": "Rescheduled"},
+        ]
+    )
+
+    assert [result.ok for result in results] == [True, True]
+    assert api.activities[1]["subject"] == "Call back"
+    assert api.activities[1]["done"] == 1
+    assert api.activities[2]["done"] == 0
+    assert api.activities[2]["note"] == "Rescheduled"
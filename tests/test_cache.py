@@ -0,0 +1,89 @@
+import pytest
+
+from pipedrive.cache import MemoryCache, ResponseCache, SQLiteCache
+
+from .conftest import RequestRecorder
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return ResponseCache(MemoryCache())
+    return ResponseCache(SQLiteCache(str(tmp_path / "cache.sqlite")))
+
+
+@pytest.fixture
+def recorder():
+    return RequestRecorder()
+
+
+@pytest.fixture
+def client(make_client, cache, recorder):
+    return make_client(cache=cache, hooks=[recorder])
+
+
+def _sent_after(recorder, action):
+    before = len(recorder.sent)
+    action()
+    return [url_context for method, url_context in recorder.sent[before:] if method == "GET"]
+
+
+def test_get_is_served_from_cache(client, recorder):
+    first = client.get("/deals/1")
+
+    assert _sent_after(recorder, lambda: client.get("/deals/1")) == []
+    assert client.get("/deals/1") == first
+
+
+def test_post_keeps_cached_records(client, recorder):
+    client.get("/deals/1")
+    client.get("/deals", {"limit": 10})
+    client.get("/deals/search", {"term": "Deal"})
+    client.post("/deals", {"title": "New deal"})
+
+    def read():
+        client.get("/deals/1")
+        client.get("/deals", {"limit": 10})
+        client.get("/deals/search", {"term": "Deal"})
+
+    assert _sent_after(recorder, read) == ["/deals", "/deals/search"]
+
+
+def test_put_evicts_record_listings_and_search(client, recorder):
+    client.get("/deals/1")
+    client.get("/deals/1/activities")
+    client.get("/deals/2")
+    client.get("/deals", {"limit": 10})
+    client.get("/deals/search", {"term": "Deal 1"})
+    client.put("/deals/1", {"title": "Renamed"})
+
+    def read():
+        client.get("/deals/2")
+        assert client.get("/deals/1")["title"] == "Renamed"
+        client.get("/deals/1/activities")
+        client.get("/deals", {"limit": 10})
+        client.get("/deals/search", {"term": "Deal 1"})
+
+    assert _sent_after(recorder, read) == ["/deals/1", "/deals/1/activities", "/deals", "/deals/search"]
+
+
+def test_activity_writes_evict_the_activities_of_their_deals(client, recorder):
+    before = client.deal.get_activities_associated_with_deal(1) or []
+    client.deal.get_activities_associated_with_deal(2)
+    client.deal.get_activities_associated_with_deal(3)
+
+    created = client.activity.create_activity("2024-01-01", subject="Call", deal_id=1)
+    after = client.deal.get_activities_associated_with_deal(1)
+    assert [activity["id"] for activity in after] == [activity["id"] for activity in before] + [created["id"]]
+
+    # the body does not name the deal, only the returned activity does
+    client.put(f"/activities/{created['id']}", {"done": 1})
+    assert _sent_after(recorder, lambda: client.deal.get_activities_associated_with_deal(1)) == ["/deals/1/activities"]
+
+    client.put(f"/activities/{created['id']}", {"deal_id": 2})
+
+    def read():
+        for deal_id in (2, 3):
+            client.deal.get_activities_associated_with_deal(deal_id)
+
+    assert _sent_after(recorder, read) == ["/deals/2/activities"]
@@ -0,0 +1,82 @@
+import logging
+import re
+import threading
+
+from pipedrive.exceptions import NotFound
+
+from .conftest import RequestRecorder
+
+THREADS = 8
+PER_THREAD = 25
+
+_DEAL_URL = re.compile(r"/deals/(\d+)\?")
+
+
+class StatusJournal(logging.Handler):
+    """StatusJournal()
+
+    Keeps the (deal id, status code) pair of every log record naming both.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(logging.DEBUG)
+        self.pairs = []
+
+    def emit(self, record):
+        status = getattr(record, "http_status_code", None)
+        match = _DEAL_URL.search(getattr(record, "request_url", ""))
+        if status is not None and match is not None:
+            self.pairs.append((int(match.group(1)), status))
+
+
+def test_one_client_shared_by_threads(api, server, make_client):
+    server.latency = 0.005
+    logger = logging.getLogger("tests.concurrency")
+    logger.setLevel(logging.INFO)
+    journal = StatusJournal()
+    logger.addHandler(journal)
+    recorder = RequestRecorder()
+    # no client.deal yet, the threads race to create it; every GET is sent, even when another thread asks
+    # for the same deal at the same time
+    client = make_client(logger=logger, hooks=[recorder], coalesce_requests=False)
+    barrier = threading.Barrier(THREADS)
+    errors = []
+    resources = set()
+
+    def work(offset):
+        barrier.wait()
+        resources.add(id(client.deal))
+        for index in range(PER_THREAD):
+            deal_id = (offset * PER_THREAD + index) % len(api.deals) + 1
+            try:
+                if index % 5 == 0:
+                    # a deal that does not exist
+                    client.deal.get_deal_by_id(deal_id + 10**6)
+                    errors.append(("found", deal_id + 10**6))
+                elif index % 5 == 1:
+                    title = f"Deal {deal_id} by thread {offset}"
+                    if client.deal.update_deal(deal_id, title=title)["title"] != title:
+                        errors.append(("updated", deal_id))
+                elif client.deal.get_deal_by_id(deal_id)["id"] != deal_id:
+                    errors.append(("fetched", deal_id))
+            except NotFound:
+                if index % 5 != 0:
+                    errors.append(("missing", deal_id))
+            except Exception as error:
+                errors.append((type(error).__name__, deal_id))
+
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in range(THREADS)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        logger.removeHandler(journal)
+
+    assert errors == []
+    assert len(resources) == 1
+    assert len(recorder.sent) == THREADS * PER_THREAD
+    # every log record carries the status of its own request
+    assert len(journal.pairs) == THREADS * PER_THREAD
+    assert all((status == 404) == (deal_id > 10**6) for deal_id, status in journal.pairs)
@@ -0,0 +1,98 @@
+import hashlib
+
+import pytest
+
+from benchmarks.data import CUSTOM_FIELD_KEYS
+from pipedrive.custom_fields import CustomFieldResolver
+from pipedrive.exceptions import ValidationError
+
+from .conftest import RequestRecorder
+
+ENUM_KEY = CUSTOM_FIELD_KEYS[1]
+SET_KEY = CUSTOM_FIELD_KEYS[3]
+
+
+def _key(name: str):
+    return hashlib.sha1(name.encode()).hexdigest()
+
+
+def _add_field(api, name: str, key: str = None):
+    key = key or _key(f"{name}-{len(api.deal_fields)}")
+    api.deal_fields.append({"id": 1000 + len(api.deal_fields), "key": key, "name": name, "field_type": "varchar"})
+    return key
+
+
+def test_schema_is_read_past_the_first_page(api, client):
+    for index in range(150):
+        last = _add_field(api, f"Extra {index}")
+
+    resolver = CustomFieldResolver(client)
+
+    assert resolver.to_api({"Extra 149": "x"}) == {last: "x"}
+    assert client.deal_field.get_deal_field_by_key(last)["name"] == "Extra 149"
+
+
+def test_enum_and_set_round_trip(client):
+    resolver = CustomFieldResolver(client)
+    payload = resolver.to_api({"Custom 1": "Option 2", "Custom 3": ["Option 1", "Option 5"]})
+    assert payload == {ENUM_KEY: 2, SET_KEY: "1,5"}
+
+    client.put("/deals/1", payload)
+    deal = resolver.from_api(client.deal.get_deal_by_id(1))
+
+    assert deal["Custom 1"] == "Option 2"
+    assert deal["Custom 3"] == ["Option 1", "Option 5"]
+    assert ENUM_KEY not in deal and SET_KEY not in deal
+
+
+def test_set_accepts_ids_and_comma_separated_labels(client):
+    resolver = CustomFieldResolver(client)
+
+    assert resolver.to_api({"Custom 3": "Option 1, Option 5"}) == {SET_KEY: "1,5"}
+    assert resolver.to_api({SET_KEY: [1, "5"]}) == {SET_KEY: "1,5"}
+
+
+def test_unknown_option_is_rejected(client):
+    resolver = CustomFieldResolver(client)
+
+    with pytest.raises(ValidationError) as error:
+        resolver.to_api({"Custom 1": "Option 42"})
+    assert error.value.errors == [("Custom 1", "Unknown option 'Option 42'.")]
+
+
+def test_name_shared_by_several_fields(api, client):
+    first = _add_field(api, "Region")
+    second = _add_field(api, "Region")
+    resolver = CustomFieldResolver(client)
+
+    with pytest.raises(ValidationError) as error:
+        resolver.to_api({"Region": "North"})
+    assert error.value.errors == [("Region", "Ambiguous deal field name, use its key.")]
+    assert resolver.to_api({first: "North"}) == {first: "North"}
+
+    deal = resolver.from_api({"id": 1, first: "North", second: "South", ENUM_KEY: "3"})
+    assert deal == {"id": 1, first: "North", second: "South", "Custom 1": "Option 3"}
+
+
+def test_one_schema_shared_with_deal_field(api, make_client):
+    recorder = RequestRecorder()
+    client = make_client(hooks=[recorder])
+    resolver = CustomFieldResolver(client, min_refresh_interval=0)
+
+    assert resolver.to_api({"Custom 1": "Option 2"}) == {ENUM_KEY: 2}
+    assert client.deal_field.get_label_of_deal_field_option(ENUM_KEY, 2) == "Option 2"
+    assert resolver.schema is client.deal_field.schema()
+    downloads = len(recorder.sent)
+
+    # a field unknown to the resolver refreshes the lookups of deal_field too
+    late = _add_field(api, "Late")
+    assert resolver.to_api({"Late": "x"}) == {late: "x"}
+    assert client.deal_field.get_deal_field_by_key(late)["name"] == "Late"
+    assert len(recorder.sent) == downloads * 2
+
+    # and dropping the cache of deal_field drops it for the resolver
+    client.deal_field.invalidate_cache()
+    api.deal_fields[-1]["name"] = "Renamed"
+    assert resolver.to_api({"Renamed": "y"}) == {late: "y"}
+    assert len(recorder.sent) == downloads * 3
+    assert resolver.stats()["refreshes"] == 3
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+from benchmarks.data import CUSTOM_FIELD_KEYS
+from pipedrive import deal_field as deal_field_module
+from pipedrive.deal_field import DealField
+
+from .conftest import RequestRecorder
+
+ENUM_KEY = CUSTOM_FIELD_KEYS[1]
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def recorder():
+    return RequestRecorder()
+
+
+@pytest.fixture
+def client(make_client, recorder):
+    return make_client(hooks=[recorder])
+
+
+def _downloads(recorder):
+    return sum(1 for _, url_context in recorder.sent if url_context == "/dealFields")
+
+
+def test_lookups_share_one_download(client, recorder):
+    fields = client.deal_field
+
+    assert fields.get_deal_field_by_key(ENUM_KEY)["name"] == "Custom 1"
+    assert fields.get_deal_field_by_key("title")["name"] == "Title"
+    assert fields.get_deal_field_by_key("missing") is None
+    assert _downloads(recorder) == 1
+    assert fields.cache_stats() == {"hits": 2, "misses": 1}
+
+
+def test_option_labels(client):
+    fields = client.deal_field
+
+    assert fields.get_label_of_deal_field_option(ENUM_KEY, 3) == "Option 3"
+    # deals return option ids as strings
+    assert fields.get_label_of_deal_field_option(ENUM_KEY, "3") == "Option 3"
+    assert fields.get_label_of_deal_field_option(ENUM_KEY, 42) is None
+    assert fields.get_label_of_deal_field_option("title", 3) is None
+
+
+def test_schema_expires_after_cache_ttl(monkeypatch, client, recorder, api):
+    clock = FakeTime()
+    monkeypatch.setattr(deal_field_module, "time", clock)
+    fields = DealField(client, cache_ttl=60)
+
+    fields.get_deal_field_by_key(ENUM_KEY)
+    api.deal_fields[4]["name"] = "Renamed"
+    clock.now += 59
+    assert fields.get_deal_field_by_key(ENUM_KEY)["name"] == "Custom 1"
+
+    clock.now += 1
+    assert fields.get_deal_field_by_key(ENUM_KEY)["name"] == "Renamed"
+    assert _downloads(recorder) == 2
+    assert fields.cache_stats() == {"hits": 1, "misses": 2}
+
+
+def test_invalidate_cache(client, recorder):
+    fields = client.deal_field
+    fields.get_deal_field_by_key(ENUM_KEY)
+    fields.invalidate_cache()
+    fields.get_deal_field_by_key(ENUM_KEY)
+
+    assert _downloads(recorder) == 2
+
+
+def test_concurrent_misses_download_once(server, client, recorder):
+    server.latency = 0.05
+    fields = client.deal_field
+    barrier = threading.Barrier(8)
+
+    def lookup():
+        barrier.wait()
+        fields.get_deal_field_by_key(ENUM_KEY)
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert _downloads(recorder) == 1
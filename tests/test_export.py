@@ -0,0 +1,137 @@
+import csv
+
+import pytest
+
+from benchmarks.data import CUSTOM_FIELD_KEYS
+from pipedrive.export import export_deals, export_records
+
+
+def _read(path: str, extension: str):
+    import pyarrow
+
+    if extension == "parquet":
+        import pyarrow.parquet
+
+        return pyarrow.parquet.read_table(path)
+    with open(path, "rb") as source:
+        return pyarrow.ipc.open_file(source).read_all()
+
+
+@pytest.fixture
+def parquet():
+    return pytest.importorskip("pyarrow.parquet")
+
+
+def test_export_deals_to_parquet(api, client, tmp_path, parquet):
+    path = str(tmp_path / "deals.parquet")
+
+    summary = export_deals(client, path, row_group_size=20, page_size=15)
+
+    table = parquet.read_table(path)
+    assert summary["rows"] == table.num_rows == 50
+    assert summary["row_groups"] == parquet.ParquetFile(path).num_row_groups == 3
+    assert table.column("id").to_pylist() == sorted(api.deals)
+    assert str(table.schema.field("value").type) == "double"
+    assert "Custom 0" in table.column_names
+    assert table.column("person_id_name")[0].as_py() == api.deals[1]["person_id"]["name"]
+
+
+def test_money_columns_of_deals_keep_their_fractions(tmp_path, parquet):
+    path = str(tmp_path / "deals.parquet")
+    records = [{"id": 1, "value": 100, "weighted_value": 50}, {"id": 2, "value": 99.5, "weighted_value": 49.75}]
+
+    export_records(None, "deal", path, records=records, row_group_size=1, resolve_custom_fields=False)
+
+    table = parquet.read_table(path)
+    assert table.column("value").to_pylist() == [100.0, 99.5]
+    assert table.column("weighted_value").to_pylist() == [50.0, 49.75]
+
+
+@pytest.mark.parametrize("extension", ["parquet", "arrow"])
+def test_fraction_after_the_first_row_group_widens_an_inferred_int_column(tmp_path, parquet, extension):
+    path = str(tmp_path / f"activities.{extension}")
+    records = [{"id": 1, "duration": 30}, {"id": 2, "duration": 60}, {"id": 3, "duration": 45.5}]
+
+    summary = export_records(None, "activity", path, records=records, row_group_size=1)
+
+    table = _read(path, extension)
+    assert summary["row_groups"] == 3
+    assert str(table.schema.field("duration").type) == "double"
+    assert table.column("duration").to_pylist() == [30.0, 60.0, 45.5]
+    assert table.column("id").to_pylist() == [1, 2, 3]
+
+
+def test_fraction_in_a_column_given_as_int_raises(tmp_path, parquet):
+    path = str(tmp_path / "activities.parquet")
+    records = [{"id": 1, "duration": 30}, {"id": 2, "duration": 45.5}]
+
+    with pytest.raises(ValueError, match="duration"):
+        export_records(None, "activity", path, records=records, row_group_size=1, column_types={"duration": "int"})
+
+
+def test_whole_floats_fit_an_inferred_int_column(tmp_path, parquet):
+    path = str(tmp_path / "activities.parquet")
+    records = [{"id": 1, "duration": 30}, {"id": 2, "duration": 45.0}]
+
+    export_records(None, "activity", path, records=records, row_group_size=1)
+
+    assert parquet.read_table(path).column("duration").to_pylist() == [30, 45]
+
+
+@pytest.mark.parametrize("extension", ["parquet", "arrow"])
+def test_column_first_seen_after_the_first_row_group_is_added(tmp_path, parquet, extension):
+    path = str(tmp_path / f"activities.{extension}")
+    records = [{"id": 1}, {"id": 2, "note": "Call back", "duration": 30}, {"id": 3, "duration": 7.5}]
+
+    export_records(None, "activity", path, records=records, row_group_size=1)
+
+    table = _read(path, extension)
+    assert table.column_names == ["id", "note", "duration"]
+    assert table.column("note").to_pylist() == [None, "Call back", None]
+    assert table.column("duration").to_pylist() == [None, 30.0, 7.5]
+
+    export_records(None, "activity", path, records=records, row_group_size=1, columns=["id", "note"])
+    assert _read(path, extension).column_names == ["id", "note"]
+
+
+def test_custom_field_columns_are_typed_after_their_deal_field(api, client, tmp_path, parquet):
+    number_key, person_key = CUSTOM_FIELD_KEYS[0], CUSTOM_FIELD_KEYS[2]
+    api.deal_fields[3]["field_type"] = "double"
+    api.deal_fields[5]["field_type"] = "people"
+    for deal in api.deals.values():
+        # whole amounts would be inferred as ints
+        deal[number_key] = deal["id"] * 10
+        deal[person_key] = {"value": deal["id"], "name": f"Person {deal['id']}"}
+    path = str(tmp_path / "deals.parquet")
+
+    export_deals(client, path, row_group_size=20)
+
+    schema = parquet.read_table(path).schema
+    assert str(schema.field("Custom 0").type) == "double"
+    assert str(schema.field("Custom 2").type) == "int64"
+    assert str(schema.field("Custom 2_name").type) == "string"
+    assert str(schema.field("Custom 1").type) == "string"
+
+
+def test_export_to_csv(tmp_path):
+    path = str(tmp_path / "persons.csv")
+    records = [{"id": 1, "name": "Ann", "email": [{"value": "ann@example.org", "primary": True}]}]
+
+    export_records(None, "person", path, records=records)
+
+    with open(path, newline="") as file:
+        assert list(csv.DictReader(file)) == [{"id": "1", "name": "Ann", "email": "ann@example.org"}]
+
+
+def test_column_first_seen_after_the_first_row_group_in_csv(tmp_path):
+    path = str(tmp_path / "persons.csv")
+    records = [{"id": 1, "name": "Ann"}, {"id": 2, "name": "Bob", "label": "vip"}]
+
+    summary = export_records(None, "person", path, records=records, row_group_size=1)
+
+    assert summary["columns"] == ["id", "name", "label"]
+    with open(path, newline="") as file:
+        assert list(csv.DictReader(file)) == [
+            {"id": "1", "name": "Ann", "label": ""},
+            {"id": "2", "name": "Bob", "label": "vip"},
+        ]
@@ -0,0 +1,121 @@
+import logging
+
+import pytest
+
+from pipedrive.cache import ResponseCache
+from pipedrive.exceptions import NotFound
+from pipedrive.instrumentation import MetricsAggregator, RequestHook, normalize_endpoint
+
+
+class Journal(RequestHook):
+    """Journal()
+
+    Appends (name, callback, event) to a list shared by several hooks, to check the order they run in.
+    """
+
+    def __init__(self, name: str, calls: list) -> None:
+        self.name = name
+        self.calls = calls
+
+    def before_request(self, event):
+        self.calls.append((self.name, "before_request", event))
+
+    def after_response(self, event):
+        self.calls.append((self.name, "after_response", event))
+
+    def on_error(self, event, error):
+        self.calls.append((self.name, "on_error", error))
+
+
+class Failing(RequestHook):
+    def before_request(self, event):
+        raise RuntimeError("broken hook")
+
+    def after_response(self, event):
+        raise RuntimeError("broken hook")
+
+
+def test_normalize_endpoint():
+    assert normalize_endpoint("/deals/42/activities") == "/deals/{id}/activities"
+    assert normalize_endpoint(f"/dealFields/{'a' * 40}") == "/dealFields/{id}"
+    assert normalize_endpoint("/deals/search") == "/deals/search"
+
+
+def test_hooks_run_in_registration_order(make_client):
+    calls = []
+    client = make_client(hooks=[Journal("first", calls)])
+    client.add_hook(Journal("second", calls))
+
+    client.deal.get_deal_by_id(1)
+
+    assert [(name, callback) for name, callback, _ in calls] == [
+        ("first", "before_request"),
+        ("second", "before_request"),
+        ("first", "after_response"),
+        ("second", "after_response"),
+    ]
+    # every hook sees the same event
+    assert len({id(event) for _, _, event in calls}) == 1
+
+
+def test_event_timings_and_sizes(server, make_client):
+    server.latency = 0.02
+    calls = []
+    client = make_client(hooks=[Journal("journal", calls)])
+
+    client.put("/deals/1", {"title": "Renamed"})
+
+    event = calls[-1][2]
+    assert (event.method, event.url_context, event.endpoint) == ("PUT", "/deals/1", "/deals/{id}")
+    assert (event.status_code, event.attempts, event.from_cache) == (200, 1, False)
+    assert event.wait >= 0.02
+    assert event.download >= 0 and event.parse >= 0
+    assert event.total >= event.wait + event.download + event.parse
+    assert event.request_bytes > 0 and event.response_bytes > 0
+    assert set(event.as_dict()) >= {"wait", "download", "parse", "total"}
+
+
+def test_errors_reach_on_error(make_client):
+    calls = []
+    client = make_client(hooks=[Journal("journal", calls)])
+
+    with pytest.raises(NotFound):
+        client.deal.get_deal_by_id(10**6)
+
+    assert [callback for _, callback, _ in calls] == ["before_request", "on_error"]
+    assert isinstance(calls[-1][2], NotFound)
+
+
+def test_failing_hook_does_not_fail_the_request(make_client, caplog):
+    calls = []
+    client = make_client(hooks=[Failing(), Journal("journal", calls)])
+
+    with caplog.at_level(logging.ERROR):
+        assert client.deal.get_deal_by_id(1)["id"] == 1
+
+    assert [callback for _, callback, _ in calls] == ["before_request", "after_response"]
+    assert sum("Request hook failed" in record.getMessage() for record in caplog.records) == 2
+
+
+def test_metrics_aggregator(make_client):
+    metrics = MetricsAggregator()
+    client = make_client(hooks=[metrics], cache=ResponseCache())
+
+    for deal_id in (1, 2, 1):
+        client.deal.get_deal_by_id(deal_id)
+    with pytest.raises(NotFound):
+        client.deal.get_deal_by_id(10**6)
+
+    stats = metrics.snapshot()["GET /deals/{id}"]
+    assert (stats["count"], stats["errors"], stats["cached"]) == (3, 1, 1)
+    assert stats["buckets"][float("inf")] == 3
+    assert stats["bytes"]["received"] > 0
+    assert metrics.percentile("GET", "/deals/{id}", 0.5) is not None
+    assert metrics.percentile("GET", "/persons/{id}", 0.5) is None
+
+    exposition = metrics.to_prometheus()
+    assert 'pipedrive_client_request_duration_seconds_count{method="GET",endpoint="/deals/{id}"} 3' in exposition
+    assert 'pipedrive_client_request_errors_total{method="GET",endpoint="/deals/{id}"} 1' in exposition
+
+    metrics.reset()
+    assert metrics.snapshot() == {}
@@ -0,0 +1,147 @@
+import logging
+import threading
+
+import pytest
+
+from pipedrive.exceptions import NotFound, TooManyRequests
+from pipedrive.logs import AsyncLogHandler, RequestLogger
+from pipedrive.rate_limit import RateLimiter, RetryPolicy
+
+LOGGER = "tests.logs"
+
+
+class Collector(logging.Handler):
+    """Collector()
+
+    Keeps the messages of the records it handles, optionally waiting for an event before each one.
+    """
+
+    def __init__(self, gate: threading.Event = None) -> None:
+        super().__init__(logging.DEBUG)
+        self.messages = []
+        self.gate = gate
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait()
+        self.messages.append(self.format(record))
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger(LOGGER)
+
+
+def _messages(caplog, message: str):
+    return [record for record in caplog.records if record.getMessage() == message]
+
+
+def test_successful_requests_are_sampled(make_client, logger, caplog):
+    client = make_client(logger=logger, log_sample_rate=4)
+
+    with caplog.at_level(logging.INFO, logger=LOGGER):
+        for deal_id in range(1, 9):
+            client.deal.get_deal_by_id(deal_id)
+
+    successful = _messages(caplog, "Successful request")
+    assert len(successful) == 2
+    assert len(_messages(caplog, "Sending request")) == 2
+    assert all(record.http_status_code == 200 and "/deals/" in record.request_url for record in successful)
+
+
+def test_errors_are_logged_even_when_not_sampled(make_client, logger, caplog):
+    client = make_client(logger=logger, log_sample_rate=1000)
+    client.deal.get_deal_by_id(1)
+
+    with caplog.at_level(logging.INFO, logger=LOGGER):
+        for deal_id in (10**6, 10**6 + 1):
+            with pytest.raises(NotFound):
+                client.deal.get_deal_by_id(deal_id)
+
+    errors = _messages(caplog, "Error when performing request, see extra for details")
+    assert [(record.levelno, record.http_status_code) for record in errors] == [(logging.ERROR, 404)] * 2
+    assert [record.request_url.split("?")[0].rsplit("/", 1)[1] for record in errors] == [str(10**6), str(10**6 + 1)]
+    assert _messages(caplog, "Successful request") == []
+
+
+def test_retries_are_logged_even_when_not_sampled(server, make_client, logger, caplog):
+    server.throttle_rate = 1.0
+    server.throttle_reset = 0.001
+    policy = RetryPolicy(max_retries=2, backoff_base=0.001, backoff_max=0.001)
+    limiter = RateLimiter(requests_per_window=10**9, window=1.0, retry_policy=policy)
+    client = make_client(logger=logger, log_sample_rate=1000, rate_limiter=limiter)
+
+    with caplog.at_level(logging.WARNING, logger=LOGGER):
+        with pytest.raises(TooManyRequests):
+            client.deal.get_deal_by_id(1)
+
+    retries = [record for record in caplog.records if record.getMessage().startswith("Retrying request in")]
+    assert [(record.attempt, record.http_status_code) for record in retries] == [(1, 429), (2, 429)]
+    assert all("/deals/1" in record.request_url for record in retries)
+
+
+def test_nothing_is_built_when_info_is_disabled(logger, caplog):
+    request_log = RequestLogger(logger)
+
+    with caplog.at_level(logging.WARNING, logger=LOGGER):
+        context = request_log.context("GET", "https://example.org/deals")
+        request_log.info("Sending request", context)
+        request_log.error("Failed", context, http_status_code=500)
+
+    assert context is None
+    assert [record.getMessage() for record in caplog.records] == ["Failed"]
+
+
+def test_debug_records_need_debug(logger, caplog):
+    request_log = RequestLogger(logger)
+
+    with caplog.at_level(logging.INFO, logger=LOGGER):
+        context = request_log.context("PUT", "https://example.org/deals/1")
+        request_log.debug("Body content at extras", context, body={"title": "Deal"})
+    with caplog.at_level(logging.DEBUG, logger=LOGGER):
+        request_log.debug("Body content at extras", context, body={"title": "Deal"})
+
+    assert [record.body for record in caplog.records] == [{"title": "Deal"}]
+
+
+def test_sample_rate_must_be_positive(logger):
+    with pytest.raises(ValueError):
+        RequestLogger(logger, sample_rate=0)
+
+
+def test_async_handler_flushes_on_close():
+    collector = Collector()
+    handler = AsyncLogHandler(collector)
+    logger = logging.getLogger(f"{LOGGER}.flush")
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        for index in range(200):
+            logger.warning("record %d", index)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    assert collector.messages == [f"record {index}" for index in range(200)]
+    assert handler.dropped == 0
+
+
+def test_async_handler_drops_records_when_full():
+    gate = threading.Event()
+    collector = Collector(gate)
+    handler = AsyncLogHandler(collector, queue_size=2)
+    logger = logging.getLogger(f"{LOGGER}.full")
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        # the handler is stuck on the first record, so the queue fills up and never blocks the caller
+        for index in range(10):
+            logger.warning("record %d", index)
+        assert handler.dropped > 0
+    finally:
+        gate.set()
+        logger.removeHandler(handler)
+        handler.close()
+
+    assert len(collector.messages) + handler.dropped == 10
+    assert collector.messages[0] == "record 0"
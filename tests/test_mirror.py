@@ -0,0 +1,72 @@
+import pytest
+
+from pipedrive.instrumentation import RequestHook
+from pipedrive.mirror import LocalMirror
+
+
+class _AfterResponse(RequestHook):
+    def __init__(self, url_context: str, callback) -> None:
+        self.url_context = url_context
+        self.callback = callback
+
+    def after_response(self, event):
+        if event.url_context == self.url_context:
+            self.callback()
+
+
+@pytest.fixture
+def mirror():
+    mirror = LocalMirror()
+    yield mirror
+    mirror.close()
+
+
+def test_load_mirrors_every_record(api, client, mirror):
+    assert mirror.load(client, page_size=7) == {"deal": len(api.deals), "person": len(api.persons)}
+
+    assert mirror.get_deal(3) == api.deals[3]
+    person_id = api.deals[3]["person_id"]["value"]
+    assert 3 in [deal["id"] for deal in mirror.find_deals(person_id=person_id)]
+    assert [item["item"]["id"] for item in mirror.search_deals(api.deals[3]["title"])["items"]] == [3]
+
+
+def test_lookups_during_a_load_see_the_previous_data(api, make_client, mirror):
+    mirror.load(make_client(), page_size=10)
+    title = api.deals[1]["title"]
+    api.update_deal({}, {"title": "Renamed"}, 1)
+    del api.deals[50]
+
+    seen = []
+    hook = _AfterResponse("/deals", lambda: seen.append((mirror.get_deal(1)["title"], mirror.get_deal(50) is not None)))
+    mirror.load(make_client(hooks=[hook]), entities=("deal",), page_size=10)
+
+    assert seen and set(seen) == {(title, True)}
+    assert mirror.get_deal(1)["title"] == "Renamed"
+    assert mirror.get_deal(50) is None
+    assert mirror.search_deals(title)["items"] == []
+
+
+def test_sync_applies_changes_since_the_load(api, client, mirror):
+    mirror.load(client)
+    client.put("/deals/3", {"title": "Renamed"})
+    client.put("/deals/4", {"status": "deleted"})
+
+    assert mirror.sync(client, entities=("deal",)) == {"upserted": 1, "deleted": 1}
+    assert mirror.get_deal(3)["title"] == "Renamed"
+    assert mirror.get_deal(4) is None
+
+
+def test_update_during_sync_does_not_skip_records(api, make_client, mirror):
+    updated = []
+
+    def update_delivered_deal():
+        if not updated:
+            # moves a delivered record to the end of /recents, shifting every later one down
+            first = min(api.deals.values(), key=lambda deal: (deal["update_time"], deal["id"]))
+            updated.append(api.update_deal({}, {"title": "Renamed"}, first["id"]))
+
+    client = make_client(hooks=[_AfterResponse("/recents", update_delivered_deal)])
+    mirror.sync(client, entities=("deal",), page_size=10)
+
+    assert updated
+    assert len(mirror.find_deals()) == len(api.deals)
@@ -0,0 +1,74 @@
+import pickle
+
+import pytest
+
+from benchmarks.data import CUSTOM_FIELD_KEYS, make_activity, make_deal, make_person
+from pipedrive.models import ActivityRecord, DealRecord, PersonRecord
+
+from .conftest import RequestRecorder
+
+
+def test_slots_and_extra_fields():
+    deal = DealRecord(make_deal(1))
+
+    assert (deal.id, deal.status) == (1, make_deal(1)["status"])
+    assert "cc_email" in deal.extra and "id" not in deal.extra
+    assert deal.cc_email == deal["cc_email"] == deal.get("cc_email") == "company+deal1@pipedrivemail.com"
+    assert deal.get("missing", "default") == "default"
+
+
+def test_references_keep_the_id_and_the_nested_object():
+    data = make_deal(1)
+    deal = DealRecord(data)
+
+    assert deal.person_id == data["person_id"]["value"]
+    assert deal.related("person_id") == data["person_id"]
+    assert deal.related("stage_id") is None
+    # activities send bare ids, which are kept as they are
+    assert ActivityRecord(make_activity(3)).person_id == make_activity(3)["person_id"]
+
+
+@pytest.mark.parametrize(
+    "record_class, data",
+    [(DealRecord, make_deal(2)), (PersonRecord, make_person(2)), (ActivityRecord, make_activity(2))],
+)
+def test_round_trip(record_class, data):
+    record = record_class(data)
+
+    assert {key: value for key, value in record.to_dict().items() if key in data} == data
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert record != record_class(dict(data, id=-1))
+
+
+def test_missing_fields():
+    deal = DealRecord({"id": 1})
+
+    assert deal.title is None and deal.extra == {}
+    with pytest.raises(KeyError):
+        deal["missing"]
+    with pytest.raises(AttributeError, match="DealRecord has no field 'missing'"):
+        deal.missing
+
+
+def test_custom_fields_without_a_lookup_keep_their_keys():
+    deal = DealRecord(make_deal(1))
+
+    assert set(deal.custom_fields) == set(CUSTOM_FIELD_KEYS)
+
+
+def test_deal_custom_fields_are_named_by_deal_fields(client):
+    deal = client.deal.get_deal_by_id(1, model=True)
+
+    assert isinstance(deal, DealRecord)
+    assert set(deal.custom_fields) == {f"Custom {index}" for index in range(len(CUSTOM_FIELD_KEYS))}
+
+
+def test_person_custom_fields_do_not_download_deal_fields(api, make_client):
+    recorder = RequestRecorder()
+    client = make_client(hooks=[recorder])
+    api.persons[1][CUSTOM_FIELD_KEYS[0]] = "person value"
+
+    person = client.person.get_person_by_id(1, model=True)
+
+    assert person.custom_fields == {CUSTOM_FIELD_KEYS[0]: "person value"}
+    assert recorder.sent == [("GET", "/persons/1")]
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from pipedrive.pagination import iter_records
+
+from .conftest import RequestRecorder
+
+
+class ScriptedClient:
+    """ScriptedClient()
+
+    Answers get_page with canned pages, recording the parameters of each call.
+    """
+
+    def __init__(self, pages: list) -> None:
+        self.pages = list(pages)
+        self.params = []
+
+    def get_page(self, url_context: str, params: dict):
+        self.params.append(dict(params))
+        return self.pages.pop(0)
+
+
+def _page(data, more: bool, next_start: int = None):
+    pagination = {"more_items_in_collection": more}
+    if next_start is not None:
+        pagination["next_start"] = next_start
+    return {"success": True, "data": data, "additional_data": {"pagination": pagination}}
+
+
+@pytest.fixture
+def recorder():
+    return RequestRecorder()
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_every_record_once_in_order(api, make_client, recorder, prefetch):
+    client = make_client(hooks=[recorder])
+    ids = [record["id"] for record in client.iter_records("/deals", page_size=7, prefetch=prefetch)]
+
+    assert ids == sorted(api.deals)
+    # stops on the page saying there are no more items, without asking for an empty one
+    assert len(recorder.sent) == 8
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_empty_collection(api, make_client, recorder, prefetch):
+    api.deals.clear()
+    client = make_client(hooks=[recorder])
+
+    assert list(client.iter_records("/deals", prefetch=prefetch)) == []
+    assert len(recorder.sent) == 1
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_next_start_is_followed(prefetch):
+    client = ScriptedClient([_page([{"id": 1}], True, next_start=10), _page([{"id": 2}], True), _page([], False)])
+
+    assert [record["id"] for record in iter_records(client, "/deals", page_size=5, prefetch=prefetch)] == [1, 2]
+    # without next_start, the next page starts one page further
+    assert [params["start"] for params in client.params] == [0, 10, 15]
+
+
+def test_empty_page_with_more_items_is_skipped():
+    client = ScriptedClient([_page([], True, next_start=5), _page([{"id": 6}], False)])
+
+    assert list(iter_records(client, "/deals", page_size=5)) == [{"id": 6}]
+
+
+def test_search_results_are_unwrapped(api, client):
+    items = list(client.iter_records("/deals/search", {"term": "deal"}, page_size=10))
+
+    assert len(items) == len(api.deals)
+    assert {item["item"]["id"] for item in items} == set(api.deals)
+
+
+def test_iter_all_filters(api, client):
+    open_ids = [deal["id"] for deal in client.deal.iter_all(status="open", page_size=9)]
+
+    assert open_ids == [deal["id"] for deal in api.deals.values() if deal["status"] == "open"]
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_async_iterator(api, server, prefetch):
+    pytest.importorskip("aiohttp")
+    from pipedrive.async_client import AsyncClient
+
+    async def run():
+        client = AsyncClient("token")
+        client.base_url = server.base_url
+        try:
+            every = [record["id"] async for record in client.iter_records("/deals", page_size=7, prefetch=prefetch)]
+            first = []
+            async for record in client.iter_records("/deals", page_size=7, prefetch=prefetch):
+                first.append(record["id"])
+                if len(first) == 3:
+                    # leaving early must not leave a pending page request behind
+                    break
+            return every, first
+        finally:
+            await client.close()
+
+    every, first = asyncio.run(run())
+    assert every == sorted(api.deals)
+    assert first == sorted(api.deals)[:3]
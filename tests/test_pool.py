@@ -0,0 +1,63 @@
+import pytest
+
+from pipedrive.cache import ResponseCache
+from pipedrive.pool import ClientPool
+from pipedrive.rate_limit import RateLimiter
+from pipedrive.webhooks import EntityStore
+
+
+def _unthrottled():
+    return RateLimiter(requests_per_window=10**9, window=1.0)
+
+
+@pytest.fixture
+def make_pool(server):
+    pools = []
+
+    def make_pool(**options):
+        pool = ClientPool(base_url=server.base_url, rate_limiter_factory=_unthrottled, **options)
+        pools.append(pool)
+        return pool
+
+    yield make_pool
+    for pool in pools:
+        pool.close()
+
+
+def test_tenants_share_the_transport_only(make_pool):
+    pool = make_pool()
+    first, second = pool.client("token-a"), pool.client("token-b")
+
+    assert pool.client("token-a") is first
+    assert first.transport is second.transport
+    assert first.rate_limiter is not second.rate_limiter
+    assert pool.stats() == {"tenants": 2, "created": 2, "hits": 1, "evicted": 0}
+
+
+@pytest.mark.parametrize("factory", ["cache_factory", "entity_store_factory"])
+def test_tenants_never_see_each_others_records(api, make_pool, factory):
+    build = (lambda token: ResponseCache()) if factory == "cache_factory" else (lambda token: EntityStore())
+    pool = make_pool(**{factory: build})
+
+    assert pool.client("token-a").deal.get_deal_by_id(1)["title"] == "Deal 1"
+    api.deals[1]["title"] = "Renamed"
+
+    assert pool.client("token-b").deal.get_deal_by_id(1)["title"] == "Renamed"
+    assert pool.client("token-a").deal.get_deal_by_id(1)["title"] == "Deal 1"
+
+
+@pytest.mark.parametrize("option", [{"cache": ResponseCache()}, {"entity_store": EntityStore()}])
+def test_shared_stores_are_rejected(option):
+    with pytest.raises(ValueError):
+        ClientPool(**option)
+
+
+def test_least_recently_used_tenants_are_evicted(make_pool):
+    pool = make_pool(max_tenants=2)
+    pool.client("token-a")
+    pool.client("token-b")
+    pool.client("token-a")
+    pool.client("token-c")
+
+    assert "token-a" in pool and "token-c" in pool and "token-b" not in pool
+    assert pool.stats()["evicted"] == 1
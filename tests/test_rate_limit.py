@@ -0,0 +1,136 @@
+import multiprocessing
+
+import pytest
+
+from pipedrive import rate_limit
+from pipedrive.exceptions import TooManyRequests
+from pipedrive.rate_limit import RateLimiter, RetryPolicy, SharedTokenBucket, TokenBucket
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def _fast_retries(max_retries: int = 3):
+    return RetryPolicy(max_retries=max_retries, backoff_base=0.001, backoff_max=0.001)
+
+
+def test_bucket_allows_a_burst_then_waits(clock):
+    bucket = TokenBucket(capacity=2, window=1.0)
+
+    assert [bucket.reserve(), bucket.reserve()] == [0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_bucket_refills_over_time(clock):
+    bucket = TokenBucket(capacity=2, window=1.0)
+    bucket.reserve()
+    bucket.reserve()
+
+    clock.now += 0.5
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+
+
+def test_bucket_adopts_the_rate_limit_headers(clock):
+    bucket = TokenBucket(capacity=80, window=2.0)
+
+    bucket.update(limit=10, remaining=4)
+    assert (bucket.capacity, bucket.rate) == (10, 5.0)
+    assert [bucket.reserve() for _ in range(5)][-1] == pytest.approx(0.2)
+
+    # an exhausted window makes the next request wait until it resets
+    bucket.update(remaining=0, reset=2.0)
+    assert bucket.reserve() == pytest.approx(2.0)
+
+
+def test_shared_bucket_is_drawn_from_by_other_processes():
+    context = multiprocessing.get_context("fork")
+    bucket = SharedTokenBucket(capacity=10, window=1000.0, context=context)
+
+    process = context.Process(target=lambda: [bucket.reserve() for _ in range(6)])
+    process.start()
+    process.join()
+
+    assert [bucket.reserve() for _ in range(4)] == [0.0] * 4
+    assert bucket.reserve() > 0
+
+
+@pytest.mark.parametrize(
+    "method, status_code, attempt, expected",
+    [
+        ("GET", 429, 0, True),
+        ("PUT", 503, 2, True),
+        ("GET", 404, 0, False),
+        ("GET", 429, 3, False),
+        ("POST", 429, 0, False),
+        ("POST", 500, 0, False),
+    ],
+)
+def test_retry_policy(method, status_code, attempt, expected):
+    assert RetryPolicy(max_retries=3).should_retry(method, status_code, attempt) is expected
+
+
+def test_retry_delay_honors_retry_after_and_backoff_max():
+    policy = RetryPolicy(backoff_base=1.0, backoff_max=4.0)
+
+    assert all(0 <= policy.delay(attempt) <= 4.0 for attempt in range(10))
+    assert RateLimiter(retry_policy=policy).retry_delay(0, {"retry-after": "7"}) >= 7
+
+
+def test_throttled_gets_are_retried(server, make_client):
+    server.throttle_rate = 0.5
+    server.throttle_reset = 0.001
+    limiter = RateLimiter(requests_per_window=10**9, window=1.0, retry_policy=_fast_retries(50))
+    client = make_client(rate_limiter=limiter)
+
+    for deal_id in range(1, 21):
+        assert client.deal.get_deal_by_id(deal_id)["id"] == deal_id
+
+    stats = limiter.stats()
+    assert stats["throttled"] > 0
+    assert stats["retried"] == stats["throttled"]
+    assert stats["requests"] == 20 + stats["retried"]
+
+
+def test_gives_up_after_max_retries(server, make_client):
+    server.throttle_rate = 1.0
+    server.throttle_reset = 0.001
+    limiter = RateLimiter(requests_per_window=10**9, window=1.0, retry_policy=_fast_retries(3))
+    client = make_client(rate_limiter=limiter)
+
+    with pytest.raises(TooManyRequests):
+        client.deal.get_deal_by_id(1)
+    stats = limiter.stats()
+    assert (stats["requests"], stats["throttled"], stats["retried"]) == (4, 4, 3)
+
+
+def test_throttled_post_is_not_sent_again(server, make_client):
+    server.throttle_rate = 1.0
+    server.throttle_reset = 0.001
+    limiter = RateLimiter(requests_per_window=10**9, window=1.0, retry_policy=_fast_retries(3))
+    client = make_client(rate_limiter=limiter)
+
+    with pytest.raises(TooManyRequests):
+        client.deal.create_deal(title="New deal")
+    assert limiter.stats()["requests"] == 1
+
+
+def test_limit_header_resizes_the_bucket(server, make_client):
+    server.rate_limit = 5
+    limiter = RateLimiter(requests_per_window=80, window=2.0)
+    make_client(rate_limiter=limiter).deal.get_deal_by_id(1)
+
+    assert limiter.bucket.capacity == 5
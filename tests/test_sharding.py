@@ -0,0 +1,79 @@
+import functools
+import multiprocessing
+
+import pytest
+
+from benchmarks.data import make_deal
+from pipedrive.client import Client
+from pipedrive.sharding import ShardedRunner
+
+SHARD_SIZE = 10
+
+
+def _client(base_url: str, rate_limiter):
+    client = Client("token", rate_limiter=rate_limiter)
+    client.base_url = base_url
+    return client
+
+
+@pytest.fixture
+def runner(server):
+    def runner(**options):
+        return ShardedRunner(
+            processes=1,
+            shard_size=SHARD_SIZE,
+            page_size=SHARD_SIZE,
+            requests_per_window=10**6,
+            window=1.0,
+            client_factory=functools.partial(_client, server.base_url),
+            mp_context=multiprocessing.get_context("fork"),
+            **options,
+        )
+
+    return runner
+
+
+def test_crawl_yields_every_record_once(api, runner):
+    records = list(runner().run())
+
+    assert sorted(record["id"] for record in records) == sorted(api.deals)
+
+
+def test_deletion_between_shards_does_not_lose_records(api, runner):
+    for index, (method, pattern, handler) in enumerate(api.routes):
+        if handler == api.list_deals:
+            break
+
+    def list_deals(query, body):
+        if int(query.get("start", 0)) == SHARD_SIZE and 1 in api.deals:
+            # the first shard was read: every later record moves down one offset, into it
+            del api.deals[1]
+        return handler(query, body)
+
+    api.routes[index] = (method, pattern, list_deals)
+    crawl = runner()
+    ids = {record["id"] for record in crawl.run()}
+
+    assert ids >= set(api.deals)
+    assert crawl.stats()["seams"] > 0
+
+
+def test_resumed_crawl_does_not_repeat_records_moved_across_shards(api, runner, tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    crawl = runner(checkpoint_path=checkpoint_path)
+    run = crawl.run()
+    # the first shard, then one record of the second before the job stops
+    first = [next(run)["id"] for _ in range(SHARD_SIZE + 1)]
+    run.close()
+
+    # a record added at the front moves the last record of the first shard into the second one
+    api.deals = {1000: make_deal(1000), **api.deals}
+    second = [record["id"] for record in runner(checkpoint_path=checkpoint_path).run()]
+
+    assert first == list(range(1, SHARD_SIZE + 2))
+    assert SHARD_SIZE not in second
+    # only the page being yielded when the job stopped is yielded again
+    assert sorted(set(first) & set(second)) == [SHARD_SIZE + 1]
+    # the added record itself is at an offset of the first shard, which is done
+    assert set(first) | set(second) >= set(api.deals) - {1000}
+    assert len(second) == len(set(second))
@@ -0,0 +1,64 @@
+import threading
+
+from pipedrive.singleflight import SingleFlight
+
+
+def _run_concurrently(flight, func, callers):
+    results = [None] * callers
+    started = threading.Barrier(callers)
+
+    def call(index):
+        started.wait()
+        results[index] = flight.do("key", func)
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_result_without_sharing_objects():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        release.wait(5)
+        return {"data": [{"id": 1, "person_id": {"value": 2}}]}
+
+    threading.Timer(0.2, release.set).start()
+    results = _run_concurrently(flight, func, 4)
+
+    assert len(calls) == 1
+    assert flight.stats() == {"calls": 4, "coalesced": 3}
+    results[0]["data"][0]["person_id"]["value"] = 3
+    assert [result["data"][0]["person_id"]["value"] for result in results[1:]] == [2, 2, 2]
+
+
+def test_followers_get_the_leaders_error():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def func():
+        release.wait(5)
+        raise KeyError("boom")
+
+    threading.Timer(0.2, release.set).start()
+    errors = []
+
+    def call():
+        try:
+            flight.do("key", func)
+        except KeyError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3
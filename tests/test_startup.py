@@ -0,0 +1,79 @@
+import json
+import subprocess
+import sys
+import threading
+import time
+
+from pipedrive.util import lazy_attribute
+
+DEFERRED = (
+    "requests",
+    "asyncio",
+    "sqlite3",
+    "concurrent.futures",
+    "logging.handlers",
+    "pipedrive.bulk",
+    "pipedrive.cache",
+    "pipedrive.custom_fields",
+    "pipedrive.instrumentation",
+    "pipedrive.logs",
+    "pipedrive.pagination",
+    "pipedrive.projection",
+    "pipedrive.rate_limit",
+    "pipedrive.singleflight",
+    "pipedrive.streaming",
+    "pipedrive.transport",
+    "pipedrive.webhooks",
+)
+
+
+def _loaded_after(code: str):
+    # a fresh interpreter, the test session has imported everything already
+    script = f"import json, sys\n{code}\nprint(json.dumps(sorted(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, check=True, text=True).stdout
+    return set(json.loads(output))
+
+
+def test_importing_the_client_defers_its_subsystems():
+    loaded = _loaded_after("import pipedrive.client")
+
+    assert "pipedrive.client" in loaded
+    assert loaded.isdisjoint(DEFERRED), sorted(loaded.intersection(DEFERRED))
+
+
+def test_resources_are_imported_on_first_access():
+    loaded = _loaded_after("from pipedrive.client import Client\nClient('token').deal")
+
+    assert "pipedrive.deal" in loaded
+    assert "pipedrive.person" not in loaded and "requests" not in loaded
+
+
+class Counted:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.barrier = threading.Barrier(8)
+
+    @lazy_attribute
+    def value(self):
+        self.calls += 1
+        time.sleep(0.01)
+        return object()
+
+
+def test_lazy_attribute_is_computed_once_across_threads():
+    instance = Counted()
+    values = []
+
+    def read():
+        instance.barrier.wait()
+        values.append(instance.value)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert instance.calls == 1
+    assert len({id(value) for value in values}) == 1
+    assert Counted.value.name == "value"
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from pipedrive.exceptions import NotFound
+from pipedrive.models import DealRecord
+from pipedrive.streaming import StreamedResponse, iter_data
+
+from .conftest import RequestRecorder
+
+
+class FakeResponse:
+    """FakeResponse()
+
+    Serves a body in chunks of a fixed size, the way requests does with stream=True.
+    """
+
+    def __init__(self, body: bytes, size: int) -> None:
+        self.body = body
+        self.size = size
+        self.closed = False
+
+    def iter_content(self, chunk_size: int = None):
+        for start in range(0, len(self.body), self.size):
+            yield self.body[start : start + self.size]
+
+    def close(self):
+        self.closed = True
+
+
+def _chunks(body: bytes, size: int):
+    return [body[start : start + size] for start in range(0, len(body), size)]
+
+
+def _parse(body: bytes, size: int):
+    others = {}
+    return list(iter_data(_chunks(body, size), others)), others
+
+
+BODY = {
+    "success": True,
+    "data": [
+        {"id": 1, "title": 'Quoted "deal" \\ with a backslash\nand a newline', "value": 1234567, "active": True},
+        {"id": 22, "title": "Ação, 日本語 and ☃", "value": -12.5e3, "probability": None},
+        {"id": 333, "title": "", "value": 0.125, "tags": [1, [2, 3], {"a": "}]"}]},
+    ],
+    "additional_data": {"pagination": {"start": 0, "limit": 3, "more_items_in_collection": False}},
+}
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 16])
+def test_every_chunk_boundary(size):
+    body = json.dumps(BODY, ensure_ascii=False).encode()
+
+    assert _parse(body, size) == (BODY["data"], {"success": True, "additional_data": BODY["additional_data"]})
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 4, 5])
+def test_numbers_at_the_edge_of_a_chunk(size):
+    # a number cut by the chunk boundary must not be yielded before its remaining digits arrive
+    body = b'{"data":[12345,-1.5e10,678,0.25],"success":true}'
+
+    assert _parse(body, size)[0] == [12345, -1.5e10, 678, 0.25]
+
+
+def test_search_items_are_streamed():
+    body = json.dumps({"success": True, "data": {"items": [{"id": 1}, {"id": 2}], "total": 2}}).encode()
+    items, others = _parse(body, 5)
+
+    assert items == [{"id": 1}, {"id": 2}]
+    assert others["data"] == {"total": 2}
+
+
+def test_null_data():
+    assert _parse(b'{"success": true, "data": null}', 4) == ([], {"success": True, "data": None})
+
+
+def test_truncated_body():
+    with pytest.raises(json.JSONDecodeError):
+        _parse(b'{"data": [{"id": 1}, {"id": 2', 4)
+
+
+def test_streamed_response():
+    finished = []
+    response = FakeResponse(json.dumps(BODY).encode(), 10)
+    streamed = StreamedResponse(response, record_factory=lambda item: item["id"], on_finish=finished.append)
+
+    assert streamed.additional_data is None
+    assert list(streamed) == [1, 22, 333]
+    assert streamed.finished and response.closed
+    assert streamed.additional_data == BODY["additional_data"]
+    assert finished == [streamed]
+    with pytest.raises(RuntimeError):
+        list(streamed)
+
+
+def test_leaving_early_closes_the_response():
+    response = FakeResponse(json.dumps(BODY).encode(), 10)
+    streamed = StreamedResponse(response)
+
+    with streamed:
+        assert next(iter(streamed))["id"] == 1
+
+    assert response.closed and not streamed.finished
+
+
+def test_streamed_get(api, client):
+    streamed = client.get("/deals", {"limit": 10}, stream=True, record_class=DealRecord)
+
+    deals = list(streamed)
+    assert [deal.id for deal in deals] == sorted(api.deals)[:10]
+    assert streamed.additional_data["pagination"]["more_items_in_collection"] is True
+
+
+def test_streamed_get_of_an_error_raises(make_client):
+    recorder = RequestRecorder()
+    client = make_client(hooks=[recorder])
+
+    # the error body is read whole and raised before anything is streamed
+    with pytest.raises(NotFound):
+        client.get(f"/deals/{10**6}", stream=True)
+    assert recorder.sent == [("GET", f"/deals/{10**6}")]
@@ -0,0 +1,53 @@
+import pytest
+
+from pipedrive.sync import DELETE, UPSERT, FileCursorStore, SQLiteCursorStore, SyncEngine
+
+
+@pytest.fixture(params=["sqlite", "file"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        store = SQLiteCursorStore(str(tmp_path / "cursors.sqlite"))
+        yield store
+        store.close()
+    else:
+        yield FileCursorStore(str(tmp_path / "cursors.json"))
+
+
+def test_full_sync_yields_every_record_once_in_order(api, client, store):
+    events = list(SyncEngine(client, store, page_size=7).changes("deal"))
+
+    assert sorted(event.id for event in events) == sorted(api.deals)
+    assert [event.key() for event in events] == sorted(event.key() for event in events)
+    assert {event.op for event in events} == {UPSERT}
+    assert store.get("deal").key() == events[-1].key()
+
+
+def test_resumed_sync_yields_only_new_changes(api, client, store):
+    list(SyncEngine(client, store, page_size=10).changes("deal"))
+    assert list(SyncEngine(client, store, page_size=10).changes("deal")) == []
+
+    client.put("/deals/3", {"title": "Renamed"})
+    client.put("/deals/4", {"status": "deleted"})
+    events = list(SyncEngine(client, store, page_size=10).changes("deal"))
+
+    assert [(event.id, event.op) for event in events] == [(3, UPSERT), (4, DELETE)]
+
+
+def test_update_during_sync_does_not_skip_records(api, client, store):
+    seen = []
+    for event in SyncEngine(client, store, page_size=10).changes("deal"):
+        seen.append(event.id)
+        if len(seen) == 10:
+            # moves a delivered record to the end of /recents, shifting every later one down
+            client.put(f"/deals/{seen[0]}", {"title": "Renamed"})
+
+    assert set(seen) == set(api.deals)
+
+
+def test_more_changes_within_one_second_than_a_page(api, client, store):
+    for deal in api.deals.values():
+        deal["update_time"] = "2023-06-01 12:00:00"
+
+    events = list(SyncEngine(client, store, page_size=10).changes("deal"))
+
+    assert sorted(event.id for event in events) == sorted(api.deals)
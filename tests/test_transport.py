@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from benchmarks.fake_server import FakePipedrive, FakeServer
+from pipedrive.transport import SessionTransport
+
+requests = pytest.importorskip("requests")
+
+
+@pytest.fixture
+def connections(server):
+    # one entry per TCP connection accepted by the server
+    accepted = []
+    handler = server.httpd.RequestHandlerClass
+
+    class CountingHandler(handler):
+        def setup(self):
+            accepted.append(self.client_address)
+            super().setup()
+
+    server.httpd.RequestHandlerClass = CountingHandler
+    return accepted
+
+
+def test_session_is_built_on_first_request(server):
+    transport = SessionTransport()
+    assert transport._session is None
+
+    transport.request("GET", f"{server.base_url}/deals/1")
+    assert transport._session is not None
+    transport.close()
+
+
+def test_sequential_requests_reuse_one_connection(server, connections):
+    with SessionTransport() as transport:
+        for deal_id in range(1, 21):
+            assert transport.request("GET", f"{server.base_url}/deals/{deal_id}").status_code == 200
+
+    assert len(connections) == 1
+
+
+def test_client_reuses_connections(client, connections):
+    for deal_id in range(1, 21):
+        client.deal.get_deal_by_id(deal_id)
+
+    assert len(connections) == 1
+
+
+def test_concurrent_requests_stay_within_the_pool(server, connections):
+    barrier = threading.Barrier(4)
+
+    with SessionTransport(pool_maxsize=4, pool_block=True) as transport:
+
+        def work():
+            barrier.wait()
+            for deal_id in range(1, 11):
+                transport.request("GET", f"{server.base_url}/deals/{deal_id}").raise_for_status()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert 1 <= len(connections) <= 4
+
+
+def test_read_timeout():
+    with FakeServer(latency=0.5, api=FakePipedrive(deals=1, persons=1, activities=1)) as server:
+        # the late reply hits a closed connection, which is expected here
+        server.httpd.handle_error = lambda request, client_address: None
+        with SessionTransport(read_timeout=0.05) as transport:
+            with pytest.raises(requests.exceptions.ReadTimeout):
+                transport.request("GET", f"{server.base_url}/deals/1")
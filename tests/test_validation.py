@@ -0,0 +1,47 @@
+import pytest
+
+from pipedrive.exceptions import ValidationError
+from pipedrive.util import SHARED_UTIL
+
+
+def test_payloads_are_not_validated_by_default(api, client):
+    deal = client.deal.create_deal("Deal", status="archived")
+
+    assert api.deals[deal["id"]]["status"] == "archived"
+
+
+def test_opt_in_validation_reports_every_invalid_field(api, make_client):
+    client = make_client(validate_payloads=True)
+
+    with pytest.raises(ValidationError) as raised:
+        client.deal.create_deal("Deal", status="archived", stage_id="first")
+
+    assert {field for field, _ in raised.value.errors} == {"status", "stage_id"}
+    assert len(api.deals) == 50
+
+
+def test_update_person_keeps_its_field_checks_without_validation(client):
+    with pytest.raises(ValueError):
+        client.person.update_person(1, email=[{"value": "not an email"}])
+
+
+def test_validate_many_reports_invalid_rows_by_index():
+    payloads = [{"name": "Ann"}, {"name": "Bob", "visible_to": "9"}, {"visible_to": "3"}]
+
+    errors = SHARED_UTIL.validate_many("person", payloads)
+
+    assert sorted(errors) == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "value, valid",
+    [("5511999990000", True), ("55 11 99999-0000", True), ("+55 11 99999", False), ("(11) 99999", False), ("", False)],
+)
+def test_validate_phone_keeps_its_original_check(value, valid):
+    # only numbers starting with a digit were ever accepted, schema validation uses the same check
+    if valid:
+        SHARED_UTIL.validate_phone([{"value": value}])
+        assert SHARED_UTIL.validate_payload("person", {"name": "Ann", "phone": [{"value": value}]}) is None
+    else:
+        with pytest.raises(ValueError, match="Invalid phone number."):
+            SHARED_UTIL.validate_phone([{"value": value}])
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from pipedrive.webhooks import EntityStore, parse_event
+
+from .conftest import RequestRecorder
+
+
+@pytest.fixture
+def recorder():
+    return RequestRecorder()
+
+
+def _v1_webhook(deal: dict):
+    # v1 payloads carry related objects as bare ids
+    current = {**deal, "person_id": deal["person_id"]["value"]}
+    meta = {"v": 1, "action": "updated", "object": "deal", "id": deal["id"], "timestamp_micro": int(time.time() * 1e6)}
+    return {"v": 1, "meta": meta, "current": current, "previous": None, "event": "updated.deal"}
+
+
+def test_get_is_served_from_the_store(make_client, recorder):
+    client = make_client(entity_store=EntityStore(), hooks=[recorder])
+    first = client.deal.get_deal_by_id(1)
+
+    assert client.deal.get_deal_by_id(1) == first
+    assert recorder.sent == [("GET", "/deals/1")]
+
+
+def test_webhook_record_is_not_served_with_another_shape(make_client, api, recorder):
+    store = EntityStore()
+    client = make_client(entity_store=store, hooks=[recorder])
+    client.deal.get_deal_by_id(1)
+
+    _, body = api.update_deal({}, {"title": "Renamed"}, 1)
+    person_id = body["data"]["person_id"]["value"]
+    assert store.apply(parse_event(_v1_webhook(body["data"])))
+    assert store.get("deal", 1)["person_id"] == person_id
+
+    deal = client.deal.get_deal_by_id(1)
+    assert deal["title"] == "Renamed"
+    assert deal["person_id"]["value"] == person_id
+    assert recorder.sent == [("GET", "/deals/1"), ("GET", "/deals/1")]
+
+    # the refetched record replaces the webhook one, although update_time has no fraction of a second
+    client.deal.get_deal_by_id(1)
+    assert len(recorder.sent) == 2
+
+
+def test_api_records_expire(make_client, recorder):
+    client = make_client(entity_store=EntityStore(max_age=0), hooks=[recorder])
+    client.deal.get_deal_by_id(1)
+    client.deal.get_deal_by_id(1)
+
+    assert recorder.sent == [("GET", "/deals/1"), ("GET", "/deals/1")]
+
+
+def test_webhook_records_do_not_expire():
+    store = EntityStore(max_age=0)
+    payload = _v1_webhook({"id": 1, "title": "Deal 1", "person_id": {"value": 1}})
+    store.apply(parse_event(payload))
+
+    assert store.get("deal", 1)["title"] == "Deal 1"
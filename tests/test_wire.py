@@ -0,0 +1,101 @@
+import pytest
+
+from pipedrive import transport
+from pipedrive.cache import ResponseCache
+from pipedrive.instrumentation import RequestHook
+from pipedrive.models import DealRecord
+from pipedrive.projection import project
+
+
+class Sizes(RequestHook):
+    """Sizes()
+
+    Keeps the response size on the wire of every request.
+    """
+
+    def __init__(self) -> None:
+        self.received = []
+
+    def after_response(self, event):
+        self.received.append(event.response_bytes)
+
+
+@pytest.fixture
+def no_accept_encoding(monkeypatch):
+    # accept_encoding() is computed once per process
+    monkeypatch.setattr(transport, "_accept_encoding", None)
+
+
+@pytest.mark.parametrize("installed, expected", [((), "gzip, deflate"), (("brotli",), "gzip, deflate, br")])
+def test_brotli_is_only_offered_when_installed(monkeypatch, no_accept_encoding, installed, expected):
+    monkeypatch.setattr(transport, "find_spec", lambda name: object() if name in installed else None)
+
+    assert transport.accept_encoding() == expected
+
+
+def test_gzip_responses_are_decoded(api, server, make_client):
+    sizes = Sizes()
+    client = make_client(hooks=[sizes])
+    plain = client.get("/deals", {"limit": 50})
+
+    server.compress = True
+    compressed = client.get("/deals", {"limit": 50})
+
+    assert "gzip" in client.headers["Accept-Encoding"]
+    assert compressed == plain
+    # response_bytes is the size on the wire, before decoding
+    assert sizes.received[1] * 4 < sizes.received[0]
+
+
+def test_brotli_responses_are_decoded(api, server, client):
+    pytest.importorskip("brotli")
+    server.compress = True
+
+    assert "br" in client.headers["Accept-Encoding"]
+    assert [deal["id"] for deal in client.get("/deals", {"limit": 50})] == sorted(api.deals)
+
+
+def test_project():
+    record = {"id": 1, "title": "Deal", "value": 10}
+    search = {"items": [{"result_score": 1.0, "item": record}]}
+
+    assert project(record, ("id", "value", "missing")) == {"id": 1, "value": 10}
+    assert project([record], ("id",)) == [{"id": 1}]
+    assert project(search, ("title",)) == {"items": [{"result_score": 1.0, "item": {"title": "Deal"}}]}
+    assert project(record, None) is record
+    assert record == {"id": 1, "title": "Deal", "value": 10}
+
+
+def test_return_fields_of_get(client):
+    deal = client.deal.get_deal_by_id(1, return_fields=("id", "title"))
+    model = client.deal.get_deal_by_id(1, model=True, return_fields=["id", "value"])
+
+    assert set(deal) == {"id", "title"}
+    assert isinstance(model, DealRecord)
+    assert model.to_dict()["value"] == client.deal.get_deal_by_id(1)["value"]
+    assert model.title is None
+
+
+def test_return_fields_of_list_and_search(api, client):
+    page = client.get("/deals", {"limit": 10}, fields="id,status")
+    found = client.deal.search_deals("Deal", return_fields=("id",))
+
+    assert [set(deal) for deal in page] == [{"id", "status"}] * 10
+    assert all(set(item["item"]) == {"id"} for item in found["items"])
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_return_fields_of_iter_records(api, client, prefetch):
+    deals = list(client.deal.iter_all(page_size=15, prefetch=prefetch, return_fields=("id", "stage_id")))
+
+    assert [deal["id"] for deal in deals] == sorted(api.deals)
+    assert all(set(deal) == {"id", "stage_id"} for deal in deals)
+
+
+def test_projected_responses_are_cached_apart(make_client):
+    client = make_client(cache=ResponseCache())
+
+    assert set(client.deal.get_deal_by_id(1, return_fields=("id",))) == {"id"}
+    # the whole record is not answered from the trimmed body, nor the other way around
+    assert "title" in client.deal.get_deal_by_id(1)
+    assert set(client.deal.get_deal_by_id(1, return_fields=("id",))) == {"id"}
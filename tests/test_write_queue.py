@@ -0,0 +1,67 @@
+import pytest
+
+from benchmarks.data import make_activity
+from pipedrive.rate_limit import RetryPolicy
+from pipedrive.write_queue import ActivityWriteQueue
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "journal.sqlite")
+
+
+def test_writes_are_delivered(api, client, journal_path):
+    with ActivityWriteQueue(client, journal_path) as writes:
+        created = writes.create(subject="Call", deal_id=1, due_date="2024-01-02")
+        updated = writes.update(1, subject="Follow up", done=True)
+        assert writes.flush(5)
+
+    assert api.activities[created.result()["id"]]["subject"] == "Call"
+    assert updated.result()["subject"] == "Follow up"
+    assert api.activities[1]["done"] == 1
+
+
+def test_pending_writes_survive_a_restart(api, make_client, journal_path):
+    offline = make_client()
+    offline.base_url = "http://127.0.0.1:9/v1"
+    policy = RetryPolicy(max_retries=100, backoff_base=0.01, backoff_max=0.01)
+
+    writes = ActivityWriteQueue(offline, journal_path, retry_policy=policy)
+    futures = [writes.update(1, subject="First")]
+    # waits behind the update in flight, so the next two are merged into it
+    futures.append(writes.update(1, note="Second"))
+    futures.append(writes.update(1, note=None, subject="Third"))
+    writes.close(timeout=0.2)
+
+    # this queue will not deliver them, the next one resumes them from the journal
+    assert all(future.cancelled() for future in futures)
+
+    with ActivityWriteQueue(make_client(), journal_path) as writes:
+        assert writes.flush(5)
+        # both journaled updates of the activity are merged into one request on resume
+        assert writes.stats()["delivered"] == 1
+
+    assert api.activities[1]["subject"] == "Third"
+    assert api.activities[1]["note"] == "Second"
+
+
+def test_failed_writes_are_retried_or_purged(api, client, journal_path):
+    with ActivityWriteQueue(client, journal_path) as writes:
+        writes.update(9998, subject="Missing")
+        writes.update(9999, subject="Missing too")
+        writes.flush(5)
+        failed = writes.failed_writes()
+        assert [write.activity_id for write in failed] == [9998, 9999]
+
+        api.activities[9998] = make_activity(9998)
+        assert writes.retry_failed([failed[0].id]) == 1
+        assert writes.flush(5)
+        assert api.activities[9998]["subject"] == "Missing"
+
+        assert writes.purge_failed() == 1
+        assert writes.failed_writes() == []
+
+
+def test_a_journal_path_is_required(client):
+    with pytest.raises(TypeError):
+        ActivityWriteQueue(client)